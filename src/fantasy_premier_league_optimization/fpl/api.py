@@ -1,22 +1,58 @@
 from __future__ import annotations
 
+import gzip
+import hashlib
 import json
 import os
+import threading
 import time
+from contextlib import contextmanager
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterator, Mapping, Optional, Sequence, Set, Tuple
 
-import requests
+from fantasy_premier_league_optimization.fpl.cache_index import CacheIndex, read_payload_bytes
 
+from fantasy_premier_league_optimization.fpl.columnar import (
+    ElementColumns,
+    compile_if_bootstrap,
+    load_element_columns,
+)
+from fantasy_premier_league_optimization.fpl.jsonstream import iter_section_items, read_sections
+from fantasy_premier_league_optimization.fpl.transport import FPL_BASE_URL, get_transport  # noqa: F401
 
-FPL_BASE_URL = "https://fantasy.premierleague.com/api"
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - non-POSIX: refreshes are not serialized across processes
+    fcntl = None  # type: ignore[assignment]
+
+
+_BACKGROUND_LOCK = threading.Lock()
+_BACKGROUND_REFRESHES: Set[Path] = set()
 
 
 @dataclass(frozen=True)
 class CacheConfig:
     cache_dir: Path
     ttl_seconds: int = 6 * 60 * 60  # 6 hours
+    # Past the TTL but within this extra window, serve the cached copy immediately and
+    # revalidate it in a background thread instead of blocking on the network.
+    stale_while_revalidate_seconds: int = 0
+    # Per-endpoint TTL overrides keyed by endpoint prefix, e.g. {"element-summary": 86400}.
+    endpoint_ttls: Optional[Mapping[str, int]] = None
+    # Total size cap for cached payloads; least-recently-used entries are evicted past it.
+    max_bytes: Optional[int] = None
+    # Store payloads gzip-compressed (`.json.gz`).
+    compress: bool = False
+
+    def ttl_for(self, endpoint: str) -> int:
+        key = endpoint.strip("/")
+        best: Optional[Tuple[int, int]] = None
+        for prefix, ttl in (self.endpoint_ttls or {}).items():
+            p = prefix.strip("/")
+            if (key == p or key.startswith(p + "/")) and (best is None or len(p) > best[0]):
+                best = (len(p), int(ttl))
+        return best[1] if best else self.ttl_seconds
 
 
 def _default_cache_dir() -> Path:
@@ -25,14 +61,50 @@ def _default_cache_dir() -> Path:
 
 
 def _read_json(path: Path) -> Any:
-    with path.open("r", encoding="utf-8") as f:
-        return json.load(f)
+    return json.loads(read_payload_bytes(path))
 
 
 def _write_json(path: Path, payload: Any) -> None:
+    # Write to a sibling temp file then rename, so concurrent readers never see partial JSON.
     path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("w", encoding="utf-8") as f:
-        json.dump(payload, f, ensure_ascii=False)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        opener = gzip.open if path.name.endswith(".gz") else open
+        with opener(tmp, "wt", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, path)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+
+def _mtime_ns(path: Path) -> Optional[int]:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+
+
+@contextmanager
+def _file_lock(path: Path, *, blocking: bool = True) -> Iterator[bool]:
+    """
+    Exclusive advisory lock on `path` shared across processes (and threads, since each
+    caller opens its own descriptor). Yields False if `blocking=False` and it is taken.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("a+") as fh:
+        if fcntl is None:
+            yield True
+            return
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
 
 
 def _is_fresh(path: Path, ttl_seconds: int) -> bool:
@@ -42,6 +114,202 @@ def _is_fresh(path: Path, ttl_seconds: int) -> bool:
     return age <= ttl_seconds
 
 
+def _meta_path(cache_path: Path) -> Path:
+    return cache_path.with_name(cache_path.name.split(".json", 1)[0] + ".meta.json")
+
+
+def _read_validators(cache_path: Path) -> Dict[str, str]:
+    """
+    ETag / Last-Modified stored next to the cached payload (only meaningful if the payload exists).
+    """
+    meta_path = _meta_path(cache_path)
+    if not cache_path.exists() or not meta_path.exists():
+        return {}
+    try:
+        meta = _read_json(meta_path)
+    except (OSError, ValueError):
+        return {}
+    return {k: str(v) for k, v in meta.items() if k in ("etag", "last_modified") and v}
+
+
+def _cache_name(endpoint: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    File-safe cache key. Query params are part of the key (as a short stable hash), so
+    different queries against one endpoint never share an entry.
+    """
+    name = endpoint.strip("/").replace("/", "__")
+    if params:
+        digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+        name = f"{name}__q{digest[:12]}"
+    return name
+
+
+def _cache_path(endpoint: str, cache: CacheConfig, params: Optional[Dict[str, Any]] = None) -> Path:
+    suffix = ".json.gz" if cache.compress else ".json"
+    return cache.cache_dir / f"{_cache_name(endpoint, params)}{suffix}"
+
+
+def cache_stats(cache: Optional[CacheConfig] = None) -> Dict[str, Any]:
+    """Hit/miss/eviction counters plus entry counts and sizes (overall and per endpoint)."""
+    cache = cache or CacheConfig(cache_dir=_default_cache_dir())
+    return CacheIndex(cache.cache_dir).stats()
+
+
+def _fetch_into_cache(
+    endpoint: str,
+    cache_path: Path,
+    *,
+    cache: CacheConfig,
+    params: Optional[Dict[str, Any]],
+    timeout_seconds: int,
+) -> Optional[Any]:
+    """
+    Revalidate/download `endpoint` into `cache_path`.
+
+    Returns the freshly downloaded payload, or None when upstream answered 304 (the cached
+    copy is still current and only its mtime is touched).
+    """
+    name = _cache_name(endpoint, params)
+    index = CacheIndex(cache.cache_dir)
+    resp = get_transport().fetch(
+        endpoint, params=params, validators=_read_validators(cache_path), timeout_seconds=timeout_seconds
+    )
+    if resp.status == 304 and cache_path.exists():
+        # Upstream unchanged: restart the TTL clock, keep the payload on disk as-is.
+        os.utime(cache_path, None)
+        index.touch(name, cache_path, endpoint=endpoint, params=params, counter="revalidations")
+        return None
+    payload = resp.payload
+    _write_json(cache_path, payload)
+    _write_json(
+        _meta_path(cache_path),
+        {"url": resp.url, "etag": resp.etag, "last_modified": resp.last_modified},
+    )
+    compile_if_bootstrap(cache_path, payload)
+    index.record(name, cache_path, endpoint=endpoint, params=params, max_bytes=cache.max_bytes)
+    return payload
+
+
+def _lock_path(cache_path: Path) -> Path:
+    return cache_path.with_name(cache_path.name + ".lock")
+
+
+def _single_flight_fetch(
+    endpoint: str,
+    cache_path: Path,
+    *,
+    cache: CacheConfig,
+    params: Optional[Dict[str, Any]],
+    timeout_seconds: int,
+    blocking: bool = True,
+) -> Optional[Any]:
+    """
+    Refresh `cache_path` with at most one fetcher at a time across processes. Callers that
+    had to wait for the lock reuse whatever the winner wrote instead of fetching again.
+    """
+    seen = _mtime_ns(cache_path)
+    with _file_lock(_lock_path(cache_path), blocking=blocking) as acquired:
+        if not acquired:
+            return None
+        if seen is not None and _mtime_ns(cache_path) != seen:
+            return None
+        if seen is None and cache_path.exists():
+            return None
+        return _fetch_into_cache(
+            endpoint, cache_path, cache=cache, params=params, timeout_seconds=timeout_seconds
+        )
+
+
+def _revalidate_in_background(
+    endpoint: str,
+    cache_path: Path,
+    *,
+    cache: CacheConfig,
+    params: Optional[Dict[str, Any]],
+    timeout_seconds: int,
+) -> None:
+    with _BACKGROUND_LOCK:
+        if cache_path in _BACKGROUND_REFRESHES:
+            return
+        _BACKGROUND_REFRESHES.add(cache_path)
+
+    def _worker() -> None:
+        try:
+            _single_flight_fetch(
+                endpoint,
+                cache_path,
+                cache=cache,
+                params=params,
+                timeout_seconds=timeout_seconds,
+                blocking=False,
+            )
+        except Exception:
+            pass  # the stale copy stays in place; the next caller past the window will retry
+        finally:
+            with _BACKGROUND_LOCK:
+                _BACKGROUND_REFRESHES.discard(cache_path)
+
+    threading.Thread(target=_worker, name=f"fpl-revalidate-{cache_path.stem}", daemon=True).start()
+
+
+def _refresh(
+    endpoint: str,
+    cache: CacheConfig,
+    *,
+    params: Optional[Dict[str, Any]],
+    force_refresh: bool,
+    timeout_seconds: int,
+) -> Tuple[Path, Optional[Any]]:
+    """
+    Shared freshness policy: fresh hit, stale-while-revalidate, or single-flight refresh.
+    Returns the cache path plus the payload if it was just downloaded (None otherwise).
+    Non-cacheable transports (replay) are served straight from their own files.
+    """
+    transport = get_transport()
+    name = _cache_name(endpoint, params)
+    if not transport.cacheable:
+        local = transport.local_path(name)
+        if local is None or not local.exists():
+            raise FileNotFoundError(f"No offline payload for endpoint '{endpoint}' (expected {local})")
+        return local, None
+
+    cache_path = _cache_path(endpoint, cache, params)
+    ttl = cache.ttl_for(endpoint)
+    payload: Optional[Any] = None
+    if not force_refresh and _is_fresh(cache_path, ttl):
+        CacheIndex(cache.cache_dir).touch(name, cache_path, endpoint=endpoint, params=params, counter="hits")
+    elif not force_refresh and cache.stale_while_revalidate_seconds > 0 and _is_fresh(
+        cache_path, ttl + cache.stale_while_revalidate_seconds
+    ):
+        CacheIndex(cache.cache_dir).touch(name, cache_path, endpoint=endpoint, params=params, counter="stale_hits")
+        _revalidate_in_background(endpoint, cache_path, cache=cache, params=params, timeout_seconds=timeout_seconds)
+    else:
+        payload = _single_flight_fetch(
+            endpoint, cache_path, cache=cache, params=params, timeout_seconds=timeout_seconds
+        )
+    transport.observe(name, endpoint, params, cache_path)
+    return cache_path, payload
+
+
+def ensure_cached(
+    endpoint: str,
+    *,
+    cache: Optional[CacheConfig] = None,
+    params: Optional[Dict[str, Any]] = None,
+    force_refresh: bool = False,
+    timeout_seconds: int = 20,
+) -> Path:
+    """
+    Make sure a current copy of `endpoint` is on disk and return its cache path,
+    without decoding the JSON on cache hits.
+    """
+    cache = cache or CacheConfig(cache_dir=_default_cache_dir())
+    cache_path, _ = _refresh(
+        endpoint, cache, params=params, force_refresh=force_refresh, timeout_seconds=timeout_seconds
+    )
+    return cache_path
+
+
 def get_json(
     endpoint: str,
     *,
@@ -52,26 +320,56 @@ def get_json(
 ) -> Any:
     """
     Fetch JSON from the official FPL API, with simple disk caching.
+
+    Once the TTL expires (or on `force_refresh`) the cached copy is revalidated with
+    ETag / Last-Modified; a 304 only touches the cache file instead of re-downloading it.
+    Concurrent refreshes of one endpoint (threads or processes) collapse into a single
+    download, and writes are atomic renames.
     """
     cache = cache or CacheConfig(cache_dir=_default_cache_dir())
-    safe_name = endpoint.strip("/").replace("/", "__")
-    cache_path = cache.cache_dir / f"{safe_name}.json"
-
-    if not force_refresh and _is_fresh(cache_path, cache.ttl_seconds):
-        return _read_json(cache_path)
-
-    url = f"{FPL_BASE_URL}/{endpoint.lstrip('/')}"
-    resp = requests.get(url, params=params, timeout=timeout_seconds)
-    resp.raise_for_status()
-    payload = resp.json()
-    _write_json(cache_path, payload)
-    return payload
+    cache_path, payload = _refresh(
+        endpoint, cache, params=params, force_refresh=force_refresh, timeout_seconds=timeout_seconds
+    )
+    return payload if payload is not None else _read_json(cache_path)
 
 
 def bootstrap_static(*, force_refresh: bool = False) -> Dict[str, Any]:
     return get_json("bootstrap-static/", force_refresh=force_refresh)
 
 
+def iter_bootstrap_elements(
+    *,
+    fields: Optional[Sequence[str]] = None,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Streaming variant of `bootstrap_static()["elements"]`: yields one element at a time
+    (optionally only `fields`) without materializing the rest of the document.
+    """
+    path = ensure_cached("bootstrap-static/", cache=cache, force_refresh=force_refresh)
+    yield from iter_section_items(path, "elements", fields=fields)
+
+
+def bootstrap_sections(
+    *sections: str,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+) -> Dict[str, Any]:
+    """Decode only the named top-level `bootstrap-static` sections (e.g. "teams", "events")."""
+    path = ensure_cached("bootstrap-static/", cache=cache, force_refresh=force_refresh)
+    return read_sections(path, sections)
+
+
+def bootstrap_columns(*, force_refresh: bool = False, cache: Optional[CacheConfig] = None) -> ElementColumns:
+    """
+    Typed per-field arrays for `bootstrap-static` elements, loaded lazily from the compiled
+    `.npz` next to the JSON cache instead of decoding the full JSON document.
+    """
+    path = ensure_cached("bootstrap-static/", cache=cache, force_refresh=force_refresh)
+    return load_element_columns(path)
+
+
 def fixtures(*, force_refresh: bool = False) -> Any:
     return get_json("fixtures/", force_refresh=force_refresh)
 
@@ -0,0 +1,224 @@
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.optimizer import (
+    ALLOWED_FORMATIONS,
+    pick_captains,
+    pick_starting_11_and_bench,
+)
+from fantasy_premier_league_optimization.fpl.stochastic import PointSamples, sample_points
+
+
+# Fewest outfield starters per position in any legal formation (DEF, MID, FWD)
+MIN_OUTFIELD = np.array([3, 2, 1])
+_OUTFIELD = ("DEF", "MID", "FWD")
+_CANDIDATE_BLOCK = 256  # (XI, bench order) candidates simulated per numpy pass
+
+
+@dataclass(frozen=True)
+class BenchPlan:
+    starting_11: List[Dict[str, Any]]
+    bench: List[Dict[str, Any]]  # GK first, then outfield in substitution priority
+    captain: Dict[str, Any]
+    vice_captain: Dict[str, Any]
+    expected_points: float  # XI + autosubs + captaincy (vice-captain when the captain misses)
+    expected_autosub_points: float
+    baseline_expected_points: float  # `pick_starting_11_and_bench` XI and bench, same rules
+    candidates: int  # (XI, bench order) pairs evaluated
+
+
+@dataclass(frozen=True)
+class _Lineups:
+    """Candidate lineups as squad indices; outfield starters in pitch order (DEF, MID, FWD)."""
+
+    gk: np.ndarray  # (C,)
+    bench_gk: np.ndarray  # (C,)
+    outfield: np.ndarray  # (C, 10)
+    outfield_pos: np.ndarray  # (C, 10) 0 = DEF, 1 = MID, 2 = FWD
+    bench: np.ndarray  # (C, 3) in substitution order
+    bench_pos: np.ndarray  # (C, 3)
+    counts: np.ndarray  # (C, 3) formation
+
+
+def enumerate_lineups(positions: Sequence[str], expected: Sequence[float]) -> _Lineups:
+    """Every legal XI of the squad with each of the 3! orders of its outfield bench."""
+    positions = list(positions)
+    order = np.argsort(-np.asarray(expected, dtype=float), kind="stable")
+    by_pos = {pos: [int(i) for i in order if positions[i] == pos] for pos in ("GK", *_OUTFIELD)}
+    if len(by_pos["GK"]) != 2:
+        raise ValueError("Squad must have exactly 2 GKs for starting XI selection.")
+
+    rows = []
+    for gk, bench_gk in (tuple(by_pos["GK"]), tuple(reversed(by_pos["GK"]))):
+        for formation in ALLOWED_FORMATIONS:
+            picks = [itertools.combinations(by_pos[pos], n) for pos, n in zip(_OUTFIELD, formation)]
+            for d, m, f in itertools.product(*picks):
+                starters = set(d) | set(m) | set(f)
+                spare = [i for pos in _OUTFIELD for i in by_pos[pos] if i not in starters]
+                if len(spare) != 3:
+                    continue
+                for bench in itertools.permutations(spare):
+                    rows.append((gk, bench_gk, d + m + f, bench, formation))
+    code = {pos: k for k, pos in enumerate(_OUTFIELD)}
+    pos_of = np.array([code.get(p, -1) for p in positions])
+    outfield = np.array([r[2] for r in rows])
+    bench = np.array([r[3] for r in rows])
+    return _Lineups(
+        gk=np.array([r[0] for r in rows]),
+        bench_gk=np.array([r[1] for r in rows]),
+        outfield=outfield,
+        outfield_pos=pos_of[outfield],
+        bench=bench,
+        bench_pos=pos_of[bench],
+        counts=np.array([r[4] for r in rows]),
+    )
+
+
+def autosub_points(lineups: _Lineups, points: np.ndarray, played: np.ndarray) -> np.ndarray:
+    """
+    Points the bench adds to each lineup in each scenario, (lineups, samples).
+
+    FPL rules: a starting GK who does not feature is replaced by the bench GK if that GK did.
+    Then each outfield starter who did not feature, in pitch order, is replaced by the first
+    bench player (in bench order) who featured, is still unused and keeps at least 3 DEF,
+    2 MID and 1 FWD in the XI. `points` / `played` are (samples, squad).
+    """
+    P, F = points.T, played.T  # (squad, samples)
+    n = len(lineups.gk)
+    gain = (~F[lineups.gk] & F[lineups.bench_gk]) * P[lineups.bench_gk]
+
+    rows = np.arange(n)[:, None]
+    counts = np.repeat(lineups.counts[:, :, None], P.shape[1], axis=2)  # (C, 3, samples)
+    used = np.zeros((n, 3, P.shape[1]), dtype=bool)
+    bench_played = F[lineups.bench]  # (C, 3, samples)
+    bench_points = P[lineups.bench]
+    for j in range(lineups.outfield.shape[1]):
+        q = lineups.outfield_pos[:, j]
+        waiting = ~F[lineups.outfield[:, j]]  # (C, samples)
+        for k in range(3):
+            pb = lineups.bench_pos[:, k]
+            keeps_shape = (q == pb)[:, None] | (counts[rows, q[:, None], :][:, 0] > MIN_OUTFIELD[q][:, None])
+            swap = waiting & ~used[:, k] & bench_played[:, k] & keeps_shape
+            used[:, k] |= swap
+            waiting &= ~swap
+            counts[np.arange(n), q] -= swap
+            counts[np.arange(n), pb] += swap
+            gain += swap * bench_points[:, k]
+    return gain
+
+
+def captaincy_values(points: np.ndarray, played: np.ndarray) -> np.ndarray:
+    """(squad, squad) expected extra points with captain i and vice j (vice doubles if i misses)."""
+    n = points.shape[0]
+    return points.mean(axis=0)[:, None] + ((~played).T.astype(np.float32) @ points) / n
+
+
+def best_bench_order(squad: Sequence[Dict[str, Any]], samples: PointSamples) -> BenchPlan:
+    """
+    XI, bench order, captain and vice maximizing expected points under `samples` (one
+    gameweek; `appearances` say who featured). Every legal XI x outfield bench order is
+    simulated through the autosub rules in batched numpy passes; captain and vice are the
+    best pair within each XI.
+    """
+    squad = list(squad)
+    ids = [p["id"] for p in squad]
+    points = samples.columns(ids).astype(np.float32)
+    played = samples.columns(ids, appearances=True) > 0
+    expected = points.mean(axis=0, dtype=np.float64)
+    lineups = enumerate_lineups([p["position"] for p in squad], expected)
+
+    gain = np.concatenate(
+        [
+            autosub_points(_take(lineups, slice(lo, lo + _CANDIDATE_BLOCK)), points, played).mean(axis=1)
+            for lo in range(0, len(lineups.gk), _CANDIDATE_BLOCK)
+        ]
+    )
+    xi = np.column_stack([lineups.gk, lineups.outfield])  # (C, 11)
+    captaincy = captaincy_values(points, played)
+    pairs = captaincy[xi[:, :, None], xi[:, None, :]]
+    pairs[:, np.arange(11), np.arange(11)] = -np.inf
+    best_pair = pairs.reshape(len(xi), -1).argmax(axis=1)
+    cap_value = pairs.reshape(len(xi), -1)[np.arange(len(xi)), best_pair]
+    total = expected[xi].sum(axis=1) + gain + cap_value
+
+    c = int(np.argmax(total))
+    cap_slot, vice_slot = divmod(int(best_pair[c]), 11)
+    starters = [squad[i] for i in xi[c]]
+    bench = [squad[lineups.bench_gk[c]]] + [squad[i] for i in lineups.bench[c]]
+    return BenchPlan(
+        starting_11=starters,
+        bench=bench,
+        captain=squad[xi[c, cap_slot]],
+        vice_captain=squad[xi[c, vice_slot]],
+        expected_points=float(total[c]),
+        expected_autosub_points=float(gain[c]),
+        baseline_expected_points=_baseline(squad, points, played),
+        candidates=len(total),
+    )
+
+
+def _take(lineups: _Lineups, rows: Any) -> _Lineups:
+    return _Lineups(**{f: getattr(lineups, f)[rows] for f in _Lineups.__dataclass_fields__})
+
+
+def _baseline(squad: Sequence[Dict[str, Any]], points: np.ndarray, played: np.ndarray) -> float:
+    """Expected points of the projection-sorted XI / bench / captains under the same rules."""
+    xi, bench = pick_starting_11_and_bench(squad)
+    captain, vice = pick_captains(xi)
+    index = {p["id"]: k for k, p in enumerate(squad)}
+    code = {pos: k for k, pos in enumerate(_OUTFIELD)}
+    pitch = sorted((p for p in xi if p["position"] != "GK"), key=lambda p: code[p["position"]])
+    counts = [sum(p["position"] == pos for p in xi) for pos in _OUTFIELD]
+    lineup = _Lineups(
+        gk=np.array([index[xi[0]["id"]]]),
+        bench_gk=np.array([index[bench[0]["id"]]]),
+        outfield=np.array([[index[p["id"]] for p in pitch]]),
+        outfield_pos=np.array([[code[p["position"]] for p in pitch]]),
+        bench=np.array([[index[p["id"]] for p in bench[1:]]]),
+        bench_pos=np.array([[code[p["position"]] for p in bench[1:]]]),
+        counts=np.array([counts]),
+    )
+    captaincy = captaincy_values(points, played)[index[captain["id"]], index[vice["id"]]]
+    expected = points.mean(axis=0, dtype=np.float64)
+    return float(
+        sum(expected[index[p["id"]]] for p in xi) + autosub_points(lineup, points, played).mean() + captaincy
+    )
+
+
+def plan_bench_order(
+    squad: Sequence[Dict[str, Any]],
+    elements: Iterable[Mapping[str, Any]],
+    *,
+    horizon_gameweeks: int = 1,
+    n_samples: int = 2_000,
+    seed: int = 0,
+) -> BenchPlan:
+    """
+    `best_bench_order` for an optimizer squad: one gameweek is sampled per player at
+    `projected_points / horizon_gameweeks` (see `sample_points`), so the minutes risk comes
+    from the same appearance model as the robust optimizer.
+    """
+    horizon = max(1, int(horizon_gameweeks))
+    one_week = [{**p, "projected_points": p["projected_points"] / horizon} for p in squad]
+    samples = sample_points(one_week, elements, horizon_gameweeks=1, n_samples=n_samples, seed=seed)
+    plan = best_bench_order(one_week, samples)
+    by_id: Dict[int, Dict[str, Any]] = {p["id"]: p for p in squad}
+
+    def back(ps: Sequence[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [by_id[p["id"]] for p in ps]
+
+    return BenchPlan(
+        starting_11=back(plan.starting_11),
+        bench=back(plan.bench),
+        captain=by_id[plan.captain["id"]],
+        vice_captain=by_id[plan.vice_captain["id"]],
+        expected_points=plan.expected_points,
+        expected_autosub_points=plan.expected_autosub_points,
+        baseline_expected_points=plan.baseline_expected_points,
+        candidates=plan.candidates,
+    )
@@ -0,0 +1,272 @@
+from __future__ import annotations
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, TextIO
+
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL
+from fantasy_premier_league_optimization.fpl.optimizer import (
+    SquadOptimizer,
+    build_player_pool,
+    prune_dominated_players,
+    resolve_must_include,
+)
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix, load_projection_rates
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot
+
+
+@dataclass(frozen=True)
+class Scenario:
+    horizon_gameweeks: int = 5
+    budget: float = 100.0
+    risk_profile: str = "template"
+    differential_weight: float = 0.12
+    max_from_team: int = 3
+    bench_weight: Optional[float] = 0.1
+    time_limit_seconds: Optional[float] = None
+    mip_gap: Optional[float] = None
+
+
+def scenario_grid(
+    *,
+    horizons: Sequence[int] = (5,),
+    budgets: Sequence[float] = (100.0,),
+    risk_profiles: Sequence[str] = ("template",),
+    differential_weights: Sequence[float] = (0.12,),
+    max_from_team: int = 3,
+    bench_weight: Optional[float] = 0.1,
+    time_limit_seconds: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+) -> List[Scenario]:
+    """
+    Cartesian product of the sweep axes. `differential_weight` only matters for the
+    differential profile, so template scenarios are emitted once per horizon/budget.
+    """
+    out: List[Scenario] = []
+    seen = set()
+    for h, b, risk, dw in itertools.product(horizons, budgets, risk_profiles, differential_weights):
+        risk = risk.strip().lower()
+        if risk != "differential":
+            dw = Scenario.differential_weight
+        scenario = Scenario(
+            int(h), float(b), risk, float(dw), int(max_from_team), bench_weight, time_limit_seconds, mip_gap
+        )
+        if scenario not in seen:
+            seen.add(scenario)
+            out.append(scenario)
+    return out
+
+
+@dataclass(frozen=True)
+class BatchPool:
+    """Everything the solves share: the eligible pool once, projections once per horizon."""
+
+    players: List[Dict[str, Any]]
+    points: Mapping[int, Mapping[int, float]]  # horizon -> element id -> projected points
+    must_include_groups: List[List[int]]
+
+
+def prepare_batch_pool(
+    horizons: Iterable[int],
+    *,
+    projection_model: str = DEFAULT_MODEL,
+    per_gameweek_fixtures: bool = False,
+    team_multipliers: Optional[Mapping[int, float]] = None,
+    must_include: Optional[Sequence[str]] = None,
+    avoid: Optional[Sequence[str]] = None,
+    allow_flagged_players: bool = False,
+    force_refresh: bool = False,
+) -> BatchPool:
+    snap = load_bootstrap_snapshot(force_refresh=force_refresh)
+    horizons = sorted({int(h) for h in horizons})
+    if per_gameweek_fixtures:
+        matrix = load_projection_matrix(model=projection_model, force_refresh=force_refresh, snap=snap)
+        points = {h: matrix.by_element(h) for h in horizons}
+    else:
+        rates = load_projection_rates(model=projection_model, snap=snap)
+        points = {h: rates.flat(h, team_multipliers) for h in horizons}
+
+    players = build_player_pool(
+        snap.elements,
+        horizon_gameweeks=horizons[-1],
+        avoid=avoid,
+        team_fixture_multiplier=dict(team_multipliers or {}),
+        allow_flagged_players=allow_flagged_players,
+        projected_points=points[horizons[-1]],
+        projection_model=projection_model,
+    )
+    return BatchPool(players=players, points=points, must_include_groups=resolve_must_include(players, must_include))
+
+
+def solve_scenario(pool: BatchPool, scenario: Scenario) -> Dict[str, Any]:
+    """Solve one scenario against the shared pool; returns a JSON-ready record."""
+    started = time.perf_counter()
+    points = pool.points[scenario.horizon_gameweeks]
+    players = [{**p, "projected_points": float(points.get(p["id"], p["projected_points"]))} for p in pool.players]
+    players, report = prune_dominated_players(
+        players,
+        max_from_team=scenario.max_from_team,
+        keep=[i for g in pool.must_include_groups for i in g],
+        risk_profile=scenario.risk_profile,
+        differential_weight=scenario.differential_weight,
+    )
+    optimizer = SquadOptimizer(
+        players,
+        budget=scenario.budget,
+        max_from_team=scenario.max_from_team,
+        risk_profile=scenario.risk_profile,
+        differential_weight=scenario.differential_weight,
+        bench_weight=scenario.bench_weight,
+        time_limit_seconds=scenario.time_limit_seconds,
+        mip_gap=scenario.mip_gap,
+    )
+    for group in pool.must_include_groups:
+        optimizer.force(group, any_of=True)
+    result = optimizer.solve()
+
+    def brief(p: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: p[k] for k in ("id", "name", "position", "team_id", "cost", "projected_points")}
+
+    return {
+        "total_cost": result.total_cost,
+        "total_projected_points": result.total_projected_points,
+        "lineup_projected_points": result.lineup_projected_points,
+        "objective": result.objective,
+        "captain": result.captain["id"],
+        "vice_captain": result.vice_captain["id"],
+        "starting_11": [p["id"] for p in result.starting_11],
+        "bench": [p["id"] for p in result.bench],
+        "squad": [brief(p) for p in result.squad],
+        "candidate_pool": {"total": report.total, "kept": report.kept},
+        "solver": asdict(result.stats) if result.stats is not None else None,
+        "solve_seconds": round(time.perf_counter() - started, 4),
+    }
+
+
+_WORKER_POOL: Optional[BatchPool] = None
+
+
+def _init_worker(pool: BatchPool) -> None:
+    global _WORKER_POOL
+    _WORKER_POOL = pool
+
+
+def _record(index: int, scenario: Scenario, pool: BatchPool) -> Dict[str, Any]:
+    try:
+        body = {"status": "ok", **solve_scenario(pool, scenario)}
+    except ValueError as exc:
+        body = {"status": "error", "error": str(exc)}
+    return {"index": index, "scenario": asdict(scenario), **body}
+
+
+def _worker_record(index: int, scenario: Scenario) -> Dict[str, Any]:
+    assert _WORKER_POOL is not None
+    return _record(index, scenario, _WORKER_POOL)
+
+
+def solve_scenarios(
+    scenarios: Sequence[Scenario],
+    *,
+    max_workers: Optional[int] = None,
+    **pool_kwargs: Any,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Solve `scenarios` and yield one record per scenario as each finishes (`index` gives the
+    input position). The pool is prepared once in this process and shipped to each worker
+    once via the pool initializer; scenarios fan out over `max_workers` processes
+    (default: CPU count). Infeasible scenarios yield `status: "error"` records.
+    """
+    scenarios = list(scenarios)
+    if not scenarios:
+        return
+    pool = prepare_batch_pool({s.horizon_gameweeks for s in scenarios}, **pool_kwargs)
+    workers = min(int(max_workers or os.cpu_count() or 1), len(scenarios))
+    if workers <= 1:
+        for index, scenario in enumerate(scenarios):
+            yield _record(index, scenario, pool)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pool,)) as executor:
+        futures = [executor.submit(_worker_record, i, s) for i, s in enumerate(scenarios)]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def write_jsonl(records: Iterable[Dict[str, Any]], out: TextIO) -> int:
+    """Write records as they arrive (flushed per line); returns the count."""
+    n = 0
+    for record in records:
+        out.write(json.dumps(record) + "\n")
+        out.flush()
+        n += 1
+    return n
+
+
+def load_scenarios(path: Path) -> List[Scenario]:
+    """Scenarios from a JSON list or JSONL file of `Scenario` field objects."""
+    text = Path(path).read_text(encoding="utf-8").strip()
+    rows = json.loads(text) if text.startswith("[") else [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [Scenario(**row) for row in rows]
+
+
+def _csv(cast):
+    return lambda s: [cast(x) for x in s.split(",") if x.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Solve a grid or list of squad scenarios; results stream as JSONL.")
+    parser.add_argument("--scenarios", type=Path, help="JSON/JSONL file of scenarios (overrides the grid axes).")
+    parser.add_argument("--horizons", type=_csv(int), default=[5])
+    parser.add_argument("--budgets", type=_csv(float), default=[100.0])
+    parser.add_argument("--risk-profiles", type=_csv(str), default=["template"])
+    parser.add_argument("--differential-weights", type=_csv(float), default=[0.12])
+    parser.add_argument("--max-from-team", type=int, default=3)
+    parser.add_argument("--time-limit", type=float, default=None, help="Per-scenario solve time limit (seconds).")
+    parser.add_argument("--mip-gap", type=float, default=None, help="Per-scenario relative optimality gap.")
+    parser.add_argument("--projection-model", default=DEFAULT_MODEL)
+    parser.add_argument("--per-gameweek-fixtures", action="store_true")
+    parser.add_argument("--must-include", type=_csv(str), default=[])
+    parser.add_argument("--avoid", type=_csv(str), default=[])
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--output", type=Path, help="JSONL output file (default: stdout).")
+    args = parser.parse_args(argv)
+
+    if args.scenarios:
+        scenarios = load_scenarios(args.scenarios)
+    else:
+        scenarios = scenario_grid(
+            horizons=args.horizons,
+            budgets=args.budgets,
+            risk_profiles=args.risk_profiles,
+            differential_weights=args.differential_weights,
+            max_from_team=args.max_from_team,
+            time_limit_seconds=args.time_limit,
+            mip_gap=args.mip_gap,
+        )
+    records = solve_scenarios(
+        scenarios,
+        max_workers=args.workers,
+        projection_model=args.projection_model,
+        per_gameweek_fixtures=args.per_gameweek_fixtures,
+        must_include=args.must_include,
+        avoid=args.avoid,
+    )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        with args.output.open("w", encoding="utf-8") as fh:
+            n = write_jsonl(records, fh)
+    else:
+        n = write_jsonl(records, sys.stdout)
+    print(f"Solved {n} scenarios.", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
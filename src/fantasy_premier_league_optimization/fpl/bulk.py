@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from fantasy_premier_league_optimization.fpl.api import (
+    CacheConfig,
+    _cache_path,
+    _default_cache_dir,
+    _is_fresh,
+    _read_json,
+    get_json,
+)
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot
+
+
+def element_summary_endpoint(element_id: int) -> str:
+    return f"element-summary/{int(element_id)}/"
+
+
+def element_summary(element_id: int, *, force_refresh: bool = False) -> Dict[str, Any]:
+    return get_json(element_summary_endpoint(element_id), force_refresh=force_refresh)
+
+
+class TokenBucket:
+    """
+    Async token bucket: at most `rate_per_second` acquisitions per second on average,
+    with bursts of up to `capacity`.
+    """
+
+    def __init__(self, rate_per_second: float, capacity: Optional[float] = None):
+        if rate_per_second <= 0:
+            raise ValueError("rate_per_second must be positive.")
+        self.rate = float(rate_per_second)
+        self.capacity = float(capacity if capacity is not None else max(1.0, self.rate))
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self.rate)
+
+
+@dataclass
+class BulkFetchResult:
+    payloads: Dict[int, Any] = field(default_factory=dict)
+    fetched: int = 0  # downloaded/revalidated over the network
+    from_cache: int = 0  # fresh cache hits or completed by an earlier (resumed) run
+    failed: Dict[int, str] = field(default_factory=dict)
+
+
+def _load_progress(path: Optional[Path]) -> Set[int]:
+    if path is None or not path.exists():
+        return set()
+    try:
+        return {int(x) for x in _read_json(path).get("completed", [])}
+    except (OSError, ValueError, AttributeError):
+        return set()
+
+
+def _save_progress(path: Optional[Path], completed: Set[int], failed: Dict[int, str]) -> None:
+    if path is None:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    tmp.write_text(json.dumps({"completed": sorted(completed), "failed": {str(k): v for k, v in failed.items()}}))
+    os.replace(tmp, path)
+
+
+async def fetch_element_summaries_async(
+    element_ids: Iterable[int],
+    *,
+    cache: Optional[CacheConfig] = None,
+    concurrency: int = 8,
+    rate_per_second: float = 15.0,
+    progress_path: Optional[Path] = None,
+    force_refresh: bool = False,
+    timeout_seconds: int = 20,
+) -> BulkFetchResult:
+    """
+    Fetch `element-summary/{id}/` for many players with bounded concurrency and a shared
+    rate limit. Every item goes through the normal `get_json` disk cache; fresh cache hits
+    skip the rate limiter entirely.
+
+    `progress_path` makes the run resumable: ids completed by an interrupted run are served
+    from their cache files even if the TTL has since lapsed. The file is removed once
+    every id has been fetched successfully.
+    """
+    cache = cache or CacheConfig(cache_dir=_default_cache_dir())
+    ids = list(dict.fromkeys(int(i) for i in element_ids))
+    completed = set() if force_refresh else _load_progress(progress_path)
+    result = BulkFetchResult()
+    bucket = TokenBucket(rate_per_second)
+    semaphore = asyncio.Semaphore(max(1, int(concurrency)))
+    save_every = 25
+
+    async def _one(element_id: int) -> None:
+        endpoint = element_summary_endpoint(element_id)
+        path = _cache_path(endpoint, cache)
+        if not force_refresh and path.exists() and (element_id in completed or _is_fresh(path, cache.ttl_for(endpoint))):
+            result.payloads[element_id] = await asyncio.to_thread(_read_json, path)
+            result.from_cache += 1
+            completed.add(element_id)
+            return
+        async with semaphore:
+            await bucket.acquire()
+            try:
+                payload = await asyncio.to_thread(
+                    get_json,
+                    endpoint,
+                    cache=cache,
+                    force_refresh=True,
+                    timeout_seconds=timeout_seconds,
+                )
+            except Exception as e:  # keep going; failures are reported + retried on resume
+                result.failed[element_id] = str(e)
+                return
+        result.payloads[element_id] = payload
+        result.fetched += 1
+        completed.add(element_id)
+        if result.fetched % save_every == 0:
+            _save_progress(progress_path, completed, result.failed)
+
+    await asyncio.gather(*(_one(i) for i in ids))
+
+    if progress_path is not None:
+        if result.failed:
+            _save_progress(progress_path, completed, result.failed)
+        elif progress_path.exists():
+            progress_path.unlink()
+    return result
+
+
+def fetch_element_summaries(
+    element_ids: Optional[Iterable[int]] = None,
+    **kwargs: Any,
+) -> BulkFetchResult:
+    """
+    Synchronous entry point; defaults to every player in the current bootstrap snapshot.
+    """
+    if element_ids is None:
+        element_ids = list(load_bootstrap_snapshot(cache=kwargs.get("cache")).players)
+    ids: List[int] = [int(i) for i in element_ids]
+    return asyncio.run(fetch_element_summaries_async(ids, **kwargs))
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import atexit
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+
+INDEX_FILENAME = "index.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    name TEXT PRIMARY KEY,
+    endpoint TEXT NOT NULL,
+    params TEXT NOT NULL,
+    path TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS counters (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+COUNTERS = ("hits", "stale_hits", "misses", "revalidations", "evictions")
+
+# An entry touched again within this many seconds only updates in-process tallies; they are
+# written with its next touch past the interval, by `stats()` or at exit, keeping cache hits off SQLite.
+TOUCH_INTERVAL_SECONDS = 30.0
+
+_LOCAL = threading.local()  # per-thread connections (sqlite3 connections are not shareable)
+_PENDING_LOCK = threading.Lock()
+_PENDING: Dict[Tuple[str, str], Dict[str, Any]] = {}  # (index path, entry name) -> unwritten touches
+
+
+def read_payload_bytes(path: Path) -> bytes:
+    """Raw JSON bytes of a cache file, transparently gunzipping `.json.gz` entries."""
+    raw = path.read_bytes()
+    return gzip.decompress(raw) if path.name.endswith(".gz") else raw
+
+
+def _sidecars(path: Path) -> List[Path]:
+    # not the `.lock` file: another process may hold a flock on it, and unlinking it would let
+    # a third process lock a fresh inode and break single-flight fetches
+    base = path.name.split(".json", 1)[0]
+    return [
+        path,
+        path.with_name(f"{base}.meta.json"),
+        path.with_name(f"{base}.npz"),
+    ]
+
+
+class CacheIndex:
+    """
+    SQLite manifest of the on-disk cache: one row per cache entry (endpoint + params),
+    its size and last access time, plus global hit/miss counters. Drives LRU eviction
+    when the cache is size-capped. Safe to share between processes.
+    """
+
+    def __init__(self, cache_dir: Path):
+        self.cache_dir = cache_dir
+        self.path = cache_dir / INDEX_FILENAME
+
+    def _connect(self) -> sqlite3.Connection:
+        """This thread's connection; opened and schema-checked once per process and index file."""
+        if getattr(_LOCAL, "pid", None) != os.getpid():
+            _LOCAL.pid, _LOCAL.connections = os.getpid(), {}  # never reuse a parent's connection
+        key = str(self.path)
+        conn = _LOCAL.connections.get(key)
+        if conn is not None and self.path.exists():
+            return conn
+        if conn is not None:
+            conn.close()  # index file deleted underneath us
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.executescript(_SCHEMA)
+        _LOCAL.connections[key] = conn
+        return conn
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, counter: str, by: int = 1) -> None:
+        conn.execute(
+            "INSERT INTO counters(key, value) VALUES(?, ?) ON CONFLICT(key) DO UPDATE SET value = value + ?",
+            (counter, by, by),
+        )
+
+    def touch(
+        self,
+        name: str,
+        path: Path,
+        *,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        counter: str,
+    ) -> None:
+        """
+        Register an access to an existing entry (rows are created for pre-existing files).
+        Repeat touches within `TOUCH_INTERVAL_SECONDS` are tallied in-process, not written.
+        """
+        now = time.time()
+        with _PENDING_LOCK:
+            pending = _PENDING.setdefault((str(self.path), name), {"written": 0.0, "hits": 0, "counters": {}})
+            pending.update(path=path, endpoint=endpoint, params=params, last_access=now)
+            pending["hits"] += 1
+            pending["counters"][counter] = pending["counters"].get(counter, 0) + 1
+            if now - pending["written"] < TOUCH_INTERVAL_SECONDS:
+                return
+            batch = self._take_pending(pending, now)
+        self._write_touches(self._connect(), name, batch)
+
+    @staticmethod
+    def _take_pending(pending: Dict[str, Any], now: float) -> Dict[str, Any]:
+        batch = dict(pending)
+        pending.update(written=now, hits=0, counters={})
+        return batch
+
+    def _write_touches(self, conn: sqlite3.Connection, name: str, batch: Dict[str, Any]) -> None:
+        path = batch["path"]
+        size = path.stat().st_size if path.exists() else 0
+        conn.execute(
+            "INSERT INTO entries(name, endpoint, params, path, size, stored_at, last_access, hits) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET last_access = MAX(last_access, excluded.last_access), "
+            "size = excluded.size, path = excluded.path, hits = hits + excluded.hits",
+            (
+                name,
+                batch["endpoint"],
+                json.dumps(batch["params"] or {}, sort_keys=True),
+                str(path),
+                size,
+                batch["last_access"],
+                batch["last_access"],
+                batch["hits"],
+            ),
+        )
+        for counter, n in batch["counters"].items():
+            self._bump(conn, counter, n)
+
+    def flush(self) -> None:
+        """Write this process's unwritten touches of this index."""
+        now = time.time()
+        with _PENDING_LOCK:
+            batches = [
+                (name, self._take_pending(pending, now))
+                for (index, name), pending in _PENDING.items()
+                if index == str(self.path) and pending["hits"]
+            ]
+        if batches:
+            conn = self._connect()
+            for name, batch in batches:
+                self._write_touches(conn, name, batch)
+
+    def record(
+        self,
+        name: str,
+        path: Path,
+        *,
+        endpoint: str,
+        params: Optional[Dict[str, Any]],
+        max_bytes: Optional[int],
+    ) -> None:
+        """Register a freshly written entry, then evict least-recently-used ones over `max_bytes`."""
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO entries(name, endpoint, params, path, size, stored_at, last_access, hits) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?, 0) "
+            "ON CONFLICT(name) DO UPDATE SET path = excluded.path, size = excluded.size, "
+            "stored_at = excluded.stored_at, last_access = excluded.last_access",
+            (name, endpoint, json.dumps(params or {}, sort_keys=True), str(path), path.stat().st_size, now, now),
+        )
+        self._bump(conn, "misses")
+        if max_bytes is not None:
+            self.flush()  # LRU order needs every tallied access
+            self._evict(conn, int(max_bytes), keep=name)
+
+    def _evict(self, conn: sqlite3.Connection, max_bytes: int, *, keep: str) -> None:
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= max_bytes:
+            return
+        rows = conn.execute(
+            "SELECT name, path, size FROM entries WHERE name != ? ORDER BY last_access ASC", (keep,)
+        ).fetchall()
+        for name, path, size in rows:
+            if total <= max_bytes:
+                break
+            for p in _sidecars(Path(path)):
+                p.unlink(missing_ok=True)
+            conn.execute("DELETE FROM entries WHERE name = ?", (name,))
+            self._bump(conn, "evictions")
+            total -= size
+
+    def stats(self) -> Dict[str, Any]:
+        self.flush()
+        conn = self._connect()
+        counters = dict(conn.execute("SELECT key, value FROM counters").fetchall())
+        entries, total = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries").fetchone()
+        rows = conn.execute("SELECT endpoint, size, hits FROM entries").fetchall()
+        by_endpoint: Dict[str, Dict[str, int]] = {}
+        for endpoint, size, hits in rows:
+            # group per-id endpoints (element-summary/1/, element-summary/2/, ...) together
+            family = by_endpoint.setdefault(endpoint.strip("/").split("/")[0], {"entries": 0, "bytes": 0, "hits": 0})
+            family["entries"] += 1
+            family["bytes"] += int(size)
+            family["hits"] += int(hits)
+        out: Dict[str, Any] = {k: int(counters.get(k, 0)) for k in COUNTERS}
+        out.update(entries=int(entries), total_bytes=int(total), by_endpoint=by_endpoint)
+        return out
+
+
+def flush_pending() -> None:
+    """Write every index's unwritten touches; runs at interpreter exit so short-lived processes keep theirs."""
+    with _PENDING_LOCK:
+        indexes = {index for (index, _), pending in _PENDING.items() if pending["hits"]}
+    for index in sorted(indexes):
+        cache_dir = Path(index).parent
+        if not cache_dir.is_dir():
+            continue  # cache removed meanwhile (e.g. a temp dir): nothing to keep
+        try:
+            CacheIndex(cache_dir).flush()
+        except sqlite3.Error:
+            pass  # best effort: losing a few hit counts beats failing at exit
+
+
+def _forget_parent_pending() -> None:
+    # a forked child must not write its parent's tallies a second time
+    global _PENDING_LOCK
+    _PENDING_LOCK = threading.Lock()
+    _PENDING.clear()
+
+
+atexit.register(flush_pending)
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_parent_pending)
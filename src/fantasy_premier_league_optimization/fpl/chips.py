@@ -0,0 +1,308 @@
+from __future__ import annotations
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.fixtures import infer_next_event
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL
+from fantasy_premier_league_optimization.fpl.optimizer import (
+    ALLOWED_FORMATIONS,
+    SquadOptimizer,
+    build_player_pool,
+    prune_dominated_players,
+)
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot
+
+
+CHIP_LABELS: Mapping[str, str] = {
+    "wildcard": "Wildcard",
+    "freehit": "Free Hit",
+    "bboost": "Bench Boost",
+    "3xc": "Triple Captain",
+}
+
+
+@dataclass(frozen=True)
+class Chip:
+    id: int
+    name: str  # bootstrap chip name: "wildcard", "freehit", "bboost" or "3xc"
+    start_event: int
+    stop_event: int
+
+    @property
+    def label(self) -> str:
+        return CHIP_LABELS.get(self.name, self.name)
+
+
+@dataclass(frozen=True)
+class ChipOption:
+    chip: Chip
+    event: int
+    gain: float  # projected points over holding the current squad without a chip
+    squad: Optional[List[int]] = None  # Wildcard / Free Hit squad
+
+
+@dataclass(frozen=True)
+class ChipPlan:
+    plays: List[ChipOption]  # at most one chip per gameweek, in gameweek order
+    total_gain: float
+    options: List[ChipOption]  # every (chip, gameweek) pair evaluated
+
+
+def available_chips(
+    chips: Iterable[Mapping[str, Any]],
+    *,
+    from_event: int,
+    played: Sequence[Tuple[str, int]] = (),
+) -> List[Chip]:
+    """
+    Bootstrap `chips` still playable from `from_event`. `played` lists (name, event) pairs as
+    in the entry history's `chips`; each uses up the instance whose window holds its event.
+    """
+    out = []
+    for c in chips:
+        chip = Chip(
+            id=int(c.get("id") or 0),
+            name=str(c.get("name") or ""),
+            start_event=int(c.get("start_event") or 1),
+            stop_event=int(c.get("stop_event") or 38),
+        )
+        if chip.stop_event < int(from_event) or chip.name not in CHIP_LABELS:
+            continue
+        if any(name == chip.name and chip.start_event <= int(ev) <= chip.stop_event for name, ev in played):
+            continue
+        out.append(chip)
+    return out
+
+
+def lineup_points(points: np.ndarray, positions: Sequence[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Best XI, captain and bench points of a fixed squad for every column of `points`
+    (players x gameweeks): the best legal formation per gameweek, captain = best starter.
+    """
+    positions = np.asarray(positions)
+    ranked = {}
+    for pos in ("GK", "DEF", "MID", "FWD"):
+        block = -np.sort(-points[positions == pos], axis=0)  # best first, per gameweek
+        ranked[pos] = np.vstack([np.zeros((1, points.shape[1])), np.cumsum(block, axis=0)])
+    xi = np.max(
+        [ranked["GK"][1] + ranked["DEF"][d] + ranked["MID"][m] + ranked["FWD"][f] for d, m, f in ALLOWED_FORMATIONS],
+        axis=0,
+    )
+    # the squad's best player always makes the best XI, so captains it
+    captain = points.max(axis=0)
+    return xi, captain, points.sum(axis=0) - xi
+
+
+@dataclass(frozen=True)
+class _ChipInputs:
+    players: List[Dict[str, Any]]
+    points: np.ndarray  # players x events, rows follow `players`
+    events: List[int]
+    budget: float
+    max_from_team: int
+    bench_weight: float
+    wildcard_horizon: int
+
+
+_WORKER: Dict[str, Any] = {}
+
+
+def _init_worker(inputs: _ChipInputs) -> None:
+    _WORKER.clear()
+    _WORKER["inputs"] = inputs
+
+
+def _squad_option(kind: str, t: int) -> Tuple[float, List[int]]:
+    """Wildcard / Free Hit from event index `t`: (points of the new squad, its ids)."""
+    inputs: _ChipInputs = _WORKER["inputs"]
+    if "optimizer" not in _WORKER:
+        # one model per worker; each option only swaps the objective
+        _WORKER["optimizer"] = SquadOptimizer(
+            [{**p, "projected_points": 0.0} for p in inputs.players],
+            budget=inputs.budget,
+            max_from_team=inputs.max_from_team,
+            bench_weight=inputs.bench_weight,
+        )
+    opt: SquadOptimizer = _WORKER["optimizer"]
+    stop = t + 1 if kind == "freehit" else min(t + inputs.wildcard_horizon, len(inputs.events))
+    window = inputs.points[:, t:stop]
+    opt.set_projections({p["id"]: float(v) for p, v in zip(inputs.players, window.sum(axis=1))})
+    # single gameweeks are full of ties (blanks score 0), so shrink the search to players
+    # some optimal squad can hold
+    opt.release()
+    kept, _ = prune_dominated_players(opt.players, max_from_team=inputs.max_from_team)
+    kept_ids = {p["id"] for p in kept}
+    opt.exclude(p["id"] for p in opt.players if p["id"] not in kept_ids)
+    squad = [p["id"] for p in opt.solve().squad]
+
+    picked = set(squad)
+    rows = [i for i, p in enumerate(inputs.players) if p["id"] in picked]
+    xi, captain, _ = lineup_points(window[rows], [inputs.players[i]["position"] for i in rows])
+    return float((xi + captain).sum()), squad
+
+
+def _evaluate(task: Tuple[str, int]) -> Tuple[str, int, float, List[int]]:
+    kind, t = task
+    value, squad = _squad_option(kind, t)
+    return kind, t, value, squad
+
+
+def _best_plan(options: Sequence[ChipOption], chips: Sequence[Chip], events: Sequence[int]) -> List[ChipOption]:
+    """Exact chip-to-gameweek assignment (one chip per gameweek) by DP over used-chip masks."""
+    by_event: Dict[int, List[Tuple[int, ChipOption]]] = {e: [] for e in events}
+    index = {c: k for k, c in enumerate(chips)}
+    for o in options:
+        if o.gain > 0:
+            by_event[o.event].append((index[o.chip], o))
+
+    best: Dict[int, Tuple[float, Tuple[ChipOption, ...]]] = {0: (0.0, ())}
+    for e in events:
+        nxt = dict(best)
+        for mask, (value, plays) in best.items():
+            for k, o in by_event[e]:
+                if mask >> k & 1:
+                    continue
+                cand = (value + o.gain, plays + (o,))
+                if cand[0] > nxt.get(mask | 1 << k, (-np.inf,))[0]:
+                    nxt[mask | 1 << k] = cand
+        best = nxt
+    return list(max(best.values(), key=lambda item: item[0])[1])
+
+
+def plan_chips(
+    players: Sequence[Dict[str, Any]],
+    points: Mapping[int, Sequence[float]],
+    *,
+    events: Sequence[int],
+    chips: Sequence[Chip],
+    current_squad: Sequence[int],
+    bank: float,
+    selling_prices: Optional[Mapping[int, float]] = None,
+    max_from_team: int = 3,
+    bench_weight: float = 0.1,
+    wildcard_horizon: int = 5,
+    max_workers: Optional[int] = None,
+) -> ChipPlan:
+    """
+    When to play each of `chips` over `events`, given per-gameweek projections
+    (`points[id][t]`) and the current squad.
+
+    Every (chip, gameweek) pair is scored against holding the current squad with no chip:
+    Bench Boost adds the bench, Triple Captain the captain once more, Free Hit is the best
+    one-week squad (budget = squad value + bank) and Wildcard the best squad over the next
+    `wildcard_horizon` gameweeks (each gameweek with its own XI and captain). Squad chips
+    re-solve one `SquadOptimizer` per worker with new projections and fan out over
+    `max_workers` processes (default: CPU count). Gains are independent of one another
+    (a Wildcard's squad does not feed later baselines); the plan then assigns at most one
+    chip per gameweek, each within its window, maximizing the total gain.
+    """
+    events = [int(e) for e in events]
+    if not events:
+        raise ValueError("events must be non-empty.")
+    owned = [int(i) for i in current_squad]
+    by_id = {p["id"]: p for p in players}
+    missing = [i for i in owned if i not in by_id]
+    if missing:
+        raise ValueError(f"Current squad players not in the player pool: {missing}")
+    if len(set(owned)) != 15:
+        raise ValueError("current_squad must list 15 distinct players.")
+
+    def row(i: int) -> np.ndarray:
+        series = np.zeros(len(events))
+        values = list(points.get(i, ()))[: len(events)]
+        series[: len(values)] = values
+        return series
+
+    matrix = np.array([row(p["id"]) for p in players])
+    index = {p["id"]: k for k, p in enumerate(players)}
+    current = matrix[[index[i] for i in owned]]
+    xi, captain, bench = lineup_points(current, [by_id[i]["position"] for i in owned])
+    baseline = xi + captain
+    value = sum(float((selling_prices or {}).get(i, by_id[i]["cost"])) for i in owned)
+
+    options: List[ChipOption] = []
+    tasks: List[Tuple[str, int]] = []
+    windows = {c.name: [] for c in chips}
+    for c in chips:
+        windows[c.name].append(c)
+    for t, e in enumerate(events):
+        for c in chips:
+            if not c.start_event <= e <= c.stop_event:
+                continue
+            if c.name == "bboost":
+                options.append(ChipOption(chip=c, event=e, gain=float(bench[t])))
+            elif c.name == "3xc":
+                options.append(ChipOption(chip=c, event=e, gain=float(captain[t])))
+            elif (c.name, t) not in tasks:
+                tasks.append((c.name, t))
+
+    inputs = _ChipInputs(
+        players=list(players),
+        points=matrix,
+        events=events,
+        budget=round(value + float(bank), 1),
+        max_from_team=int(max_from_team),
+        bench_weight=float(bench_weight),
+        wildcard_horizon=max(1, int(wildcard_horizon)),
+    )
+    workers = min(int(max_workers or os.cpu_count() or 1), len(tasks))
+    if workers <= 1:
+        _init_worker(inputs)
+        results = [_evaluate(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(inputs,)) as executor:
+            results = list(executor.map(_evaluate, tasks))
+
+    for kind, t, new_value, squad in results:
+        stop = t + 1 if kind == "freehit" else min(t + inputs.wildcard_horizon, len(events))
+        gain = new_value - float(baseline[t:stop].sum())
+        for c in windows[kind]:
+            if c.start_event <= events[t] <= c.stop_event:
+                options.append(ChipOption(chip=c, event=events[t], gain=gain, squad=squad))
+
+    options.sort(key=lambda o: (o.event, o.chip.id))
+    plays = _best_plan(options, chips, events)
+    return ChipPlan(plays=plays, total_gain=float(sum(o.gain for o in plays)), options=options)
+
+
+def plan_chips_for_snapshot(
+    current_squad: Sequence[int],
+    *,
+    bank: float,
+    played_chips: Sequence[Tuple[str, int]] = (),
+    projection_model: str = DEFAULT_MODEL,
+    allow_flagged_players: bool = False,
+    force_refresh: bool = False,
+    **kwargs: Any,
+) -> ChipPlan:
+    """`plan_chips` from the snapshot's next unplayed gameweek to the end of the season."""
+    snap = load_bootstrap_snapshot(force_refresh=force_refresh)
+    from_event = infer_next_event(snap.events)
+    matrix = load_projection_matrix(
+        model=projection_model, from_event=from_event, force_refresh=force_refresh, snap=snap
+    )
+    from_event = from_event or int(matrix.events[0])
+    chips = available_chips(snap.get("chips", ()), from_event=from_event, played=played_chips)
+    points = {int(i): row.tolist() for i, row in zip(matrix.element_ids, matrix.points)}
+
+    owned = {int(i) for i in current_squad}
+    pool = [
+        p
+        for p in build_player_pool(snap.elements, horizon_gameweeks=1, allow_flagged_players=True)
+        if allow_flagged_players or p["status"] == "available" or p["id"] in owned
+    ]
+    return plan_chips(
+        pool,
+        points,
+        events=[int(e) for e in matrix.events],
+        chips=chips,
+        current_squad=current_squad,
+        bank=bank,
+        **kwargs,
+    )
@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Mapping, Sequence
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.cache_index import read_payload_bytes
+
+
+COLUMNAR_FORMAT_VERSION = 1
+
+# Numeric fields the projection/optimization paths actually read, with their on-disk dtype.
+# Missing / null values become 0 for integer columns and NaN for float columns.
+NUMERIC_COLUMNS: Mapping[str, Any] = {
+    "id": np.int32,
+    "element_type": np.int8,
+    "team": np.int16,
+    "now_cost": np.int16,
+    "total_points": np.int16,
+    "minutes": np.int32,
+    "starts": np.int16,
+    "ep_next": np.float32,
+    "ep_this": np.float32,
+    "form": np.float32,
+    "points_per_game": np.float32,
+    "selected_by_percent": np.float32,
+    "ict_index": np.float32,
+    "influence": np.float32,
+    "creativity": np.float32,
+    "threat": np.float32,
+    "chance_of_playing_next_round": np.float32,
+}
+
+# Text fields, stored as int32 codes into one shared string table.
+STRING_COLUMNS: Sequence[str] = ("first_name", "second_name", "web_name", "status")
+
+
+def columnar_path(json_path: Path) -> Path:
+    # bootstrap-static.json / bootstrap-static.json.gz -> bootstrap-static.npz
+    return json_path.with_name(json_path.name.split(".json", 1)[0] + ".npz")
+
+
+def _numeric(values: Iterable[Any], dtype: Any) -> np.ndarray:
+    is_float = np.issubdtype(np.dtype(dtype), np.floating)
+    out: List[float] = []
+    for v in values:
+        try:
+            out.append(float(v) if v is not None else (np.nan if is_float else 0.0))
+        except (TypeError, ValueError):
+            out.append(np.nan if is_float else 0.0)
+    return np.asarray(out, dtype=np.float64).astype(dtype)
+
+
+def write_element_columns(payload: Mapping[str, Any], path: Path, *, source_sha1: str) -> None:
+    """
+    Compile `payload["elements"]` into typed column arrays + a string table at `path` (.npz).
+    """
+    elements = list(payload.get("elements", []))
+    arrays: Dict[str, np.ndarray] = {}
+    for name, dtype in NUMERIC_COLUMNS.items():
+        arrays[name] = _numeric((e.get(name) for e in elements), dtype)
+
+    table: Dict[str, int] = {}
+    for name in STRING_COLUMNS:
+        codes = [table.setdefault(str(e.get(name) or ""), len(table)) for e in elements]
+        arrays[f"{name}__codes"] = np.asarray(codes, dtype=np.int32)
+    arrays["strings"] = np.asarray(list(table), dtype=str)
+
+    meta = {"version": COLUMNAR_FORMAT_VERSION, "source_sha1": source_sha1, "rows": len(elements)}
+    arrays["__meta__"] = np.asarray(json.dumps(meta))
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+
+class ElementColumns:
+    """
+    Lazily loaded column view over a compiled `.npz` snapshot: each column is read from
+    disk on first access only, so touching a handful of fields never decodes the rest.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self._npz = np.load(path, allow_pickle=False)
+        self._loaded: Dict[str, np.ndarray] = {}
+        self.meta: Dict[str, Any] = json.loads(str(self._npz["__meta__"]))
+
+    def __len__(self) -> int:
+        return int(self.meta.get("rows", 0))
+
+    def __contains__(self, name: object) -> bool:
+        return name in NUMERIC_COLUMNS or name in STRING_COLUMNS
+
+    @property
+    def columns(self) -> List[str]:
+        return list(NUMERIC_COLUMNS) + list(STRING_COLUMNS)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        if name not in self._loaded:
+            if name in STRING_COLUMNS:
+                if "strings" not in self._loaded:
+                    self._loaded["strings"] = self._npz["strings"]
+                self._loaded[name] = self._loaded["strings"][self._npz[f"{name}__codes"]]
+            elif name in NUMERIC_COLUMNS:
+                self._loaded[name] = self._npz[name]
+            else:
+                raise KeyError(name)
+        return self._loaded[name]
+
+    def select(self, names: Sequence[str]) -> Dict[str, np.ndarray]:
+        return {n: self[n] for n in names}
+
+    def close(self) -> None:
+        self._npz.close()
+
+
+def _sha1_file(path: Path) -> str:
+    h = hashlib.sha1()
+    with path.open("rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_element_columns(json_path: Path) -> ElementColumns:
+    """
+    Open the compiled snapshot next to `json_path`, (re)building it from the JSON cache
+    only when it is missing or was compiled from different content.
+    """
+    npz_path = columnar_path(json_path)
+    digest: str | None = None
+    if npz_path.exists():
+        cols = ElementColumns(npz_path)
+        if cols.meta.get("version") == COLUMNAR_FORMAT_VERSION:
+            if npz_path.stat().st_mtime_ns >= json_path.stat().st_mtime_ns:
+                return cols
+            digest = _sha1_file(json_path)
+            if cols.meta.get("source_sha1") == digest:
+                os.utime(npz_path, None)  # JSON was only touched (e.g. 304 revalidation)
+                return cols
+        cols.close()
+
+    digest = digest or _sha1_file(json_path)
+
+    payload = json.loads(read_payload_bytes(json_path))
+    write_element_columns(payload, npz_path, source_sha1=digest)
+    return ElementColumns(npz_path)
+
+
+def compile_if_bootstrap(cache_path: Path, payload: Any) -> None:
+    """Hook used by `fpl.api` right after a fresh `bootstrap-static` payload hits disk."""
+    if not cache_path.name.startswith("bootstrap-static.json") or not isinstance(payload, Mapping):
+        return
+    write_element_columns(payload, columnar_path(cache_path), source_sha1=_sha1_file(cache_path))
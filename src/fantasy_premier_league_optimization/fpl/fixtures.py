@@ -1,7 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -46,33 +48,296 @@ def upcoming_fixtures_for_team(
     return res
 
 
+def _difficulty_multiplier(avg_difficulty: np.ndarray) -> np.ndarray:
+    # map avg difficulty 1..5 to multiplier ~1.15..0.85
+    mult = 1.15 - ((avg_difficulty - 1.0) * (0.30 / 4.0))
+    return np.clip(mult, 0.80, 1.20)
+
+
+@dataclass(frozen=True)
+class OutlookWindow:
+    """Per-team fixture aggregates for one `[from_event, from_event + horizon)` window."""
+
+    team_ids: np.ndarray
+    fixture_count: np.ndarray
+    avg_difficulty: np.ndarray
+    good: np.ndarray
+    bad: np.ndarray
+    has_double: np.ndarray
+    multiplier: np.ndarray
+
+
+class FixtureIndex:
+    """
+    Dense team x event fixture counts, split by difficulty (1..5; 0 = unknown), built in one
+    pass over the fixtures payload. Prefix sums along events turn any `(from_event, horizon)`
+    window into O(teams) array arithmetic instead of a rescan of every fixture per team.
+    """
+
+    def __init__(
+        self,
+        fixtures_payload: Iterable[Dict[str, Any]],
+        team_ids: Optional[Iterable[int]] = None,
+        *,
+        key: str = "",
+    ):
+        self.key = key  # content hash of the source payloads, when known (used for memo keys)
+        fixtures_list = [fx for fx in fixtures_payload if fx.get("event") is not None]
+        ids = sorted(
+            set(team_ids)
+            if team_ids is not None
+            else {int(t) for fx in fixtures_list for t in (fx.get("team_h"), fx.get("team_a")) if t is not None}
+        )
+        self.team_ids = np.asarray(ids, dtype=np.int64)
+        self.team_row: Dict[int, int] = {int(t): i for i, t in enumerate(ids)}
+        self.max_event = max((int(fx["event"]) for fx in fixtures_list), default=0)
+
+        counts = np.zeros((len(ids), self.max_event + 1, 6), dtype=np.int32)
+        slotted: List[Tuple[int, int, int, int]] = []
+        for fx in sorted(fixtures_list, key=lambda x: (x["event"], x.get("kickoff_time") or "")):
+            ev = int(fx["event"])
+            for team_key, diff_key in (("team_h", "team_h_difficulty"), ("team_a", "team_a_difficulty")):
+                row = self.team_row.get(int(fx.get(team_key) or 0))
+                if row is None:
+                    continue
+                d = fx.get(diff_key)
+                level = int(d) if d is not None and 1 <= int(d) <= 5 else 0
+                slotted.append((row, ev, int(counts[row, ev].sum()), level))
+                counts[row, ev, level] += 1
+        self.counts = counts
+
+        # slots[team, event, k] = difficulty of the team's k-th fixture that event
+        # (NaN = no such fixture, 0 = difficulty unknown). Blanks have no slot, doubles two.
+        n_slots = max(2, max((k + 1 for _, _, k, _ in slotted), default=0))
+        self.slots = np.full((len(ids), self.max_event + 1, n_slots), np.nan)
+        for row, ev, k, level in slotted:
+            self.slots[row, ev, k] = level
+
+        # prefix[:, k] = totals over events < k, so a window [lo, hi) is prefix[:, hi] - prefix[:, lo].
+        zeros = np.zeros((len(ids), 1, 6), dtype=np.int32)
+        self._prefix = np.concatenate([zeros, counts.cumsum(axis=1)], axis=1)
+        doubles = (counts.sum(axis=2) >= 2).astype(np.int32)
+        self._double_prefix = np.concatenate([np.zeros((len(ids), 1), np.int32), doubles.cumsum(axis=1)], axis=1)
+
+    def _bounds(self, from_event: Optional[int], horizon_events: int) -> Tuple[int, int]:
+        if from_event is None:
+            return 0, self.max_event + 1
+        lo = min(max(int(from_event), 0), self.max_event + 1)
+        hi = min(max(int(from_event) + int(horizon_events), lo), self.max_event + 1)
+        return lo, hi
+
+    def fixture_vectors(self, *, from_event: int, horizon_events: int) -> "FixtureVectors":
+        """Per-team, per-gameweek fixtures for `[from_event, from_event + horizon_events)`."""
+        events = np.arange(int(from_event), int(from_event) + int(horizon_events))
+        inside = (events >= 0) & (events <= self.max_event)
+        difficulty = np.full((len(self.team_ids), len(events), self.slots.shape[2]), np.nan)
+        difficulty[:, inside, :] = self.slots[:, events[inside], :]
+        played = ~np.isnan(difficulty)
+        # each fixture contributes its own difficulty multiplier; unknown difficulty is neutral
+        per_fixture = np.where(difficulty > 0, _difficulty_multiplier(np.nan_to_num(difficulty)), 1.0)
+        return FixtureVectors(
+            team_ids=self.team_ids,
+            events=events,
+            fixture_count=played.sum(axis=2),
+            difficulty=difficulty,
+            multiplier=np.where(played, per_fixture, 0.0).sum(axis=2),
+        )
+
+    def _aggregate(self, lo: Any, hi: Any, good_threshold: int, bad_threshold: int) -> OutlookWindow:
+        # lo/hi may be scalars or equally-shaped index arrays; results gain their shape after the team axis
+        by_diff = self._prefix[:, hi, :] - self._prefix[:, lo, :]
+        known = by_diff[..., 1:].sum(axis=-1)
+        avg = (by_diff * np.arange(6)).sum(axis=-1) / np.maximum(1, known)
+        return OutlookWindow(
+            team_ids=self.team_ids,
+            fixture_count=by_diff.sum(axis=-1),
+            avg_difficulty=avg,
+            good=by_diff[..., 1 : good_threshold + 1].sum(axis=-1),
+            bad=by_diff[..., max(1, bad_threshold) :].sum(axis=-1),
+            has_double=(self._double_prefix[:, hi] - self._double_prefix[:, lo]) > 0,
+            multiplier=_difficulty_multiplier(avg),
+        )
+
+    def window(
+        self,
+        *,
+        from_event: Optional[int],
+        horizon_events: int,
+        good_threshold: int = 2,
+        bad_threshold: int = 4,
+    ) -> OutlookWindow:
+        lo, hi = self._bounds(from_event, horizon_events)
+        return self._aggregate(lo, hi, good_threshold, bad_threshold)
+
+    def sweep(
+        self,
+        *,
+        from_events: Sequence[int],
+        horizons: Sequence[int],
+        good_threshold: int = 2,
+        bad_threshold: int = 4,
+    ) -> "FixtureSweep":
+        """Outlook for every `(from_event, horizon)` pair at once, as `[from_event, horizon, team]` arrays."""
+        starts = np.asarray([int(e) for e in from_events], dtype=np.int64)
+        spans = np.asarray([int(h) for h in horizons], dtype=np.int64)
+        if starts.size == 0 or spans.size == 0:
+            raise ValueError("from_events and horizons must be non-empty.")
+        if (spans < 1).any():
+            raise ValueError("horizons must be >= 1.")
+        lo = np.clip(starts, 0, self.max_event + 1)[:, None] + np.zeros_like(spans)[None, :]
+        hi = np.clip(starts[:, None] + spans[None, :], lo, self.max_event + 1)
+        win = self._aggregate(lo, hi, good_threshold, bad_threshold)
+
+        def _axes(a: np.ndarray) -> np.ndarray:
+            return np.moveaxis(a, 0, -1)  # (T, F, H) -> (F, H, T)
+
+        count = _axes(win.fixture_count)
+        empty = count == 0
+        return FixtureSweep(
+            team_ids=self.team_ids,
+            from_events=starts,
+            horizons=spans,
+            fixture_count=count,
+            score=np.where(empty, 99.0, np.round(_axes(win.avg_difficulty), 2)),
+            good=_axes(win.good),
+            bad=_axes(win.bad),
+            has_double=_axes(win.has_double),
+            multiplier=np.where(empty, 1.0, _axes(win.multiplier)),
+        )
+
+
+@dataclass(frozen=True)
+class FixtureVectors:
+    """
+    Gameweek-by-gameweek fixtures per team, indexed `[team_idx, gameweek_idx]`.
+    `multiplier` sums one difficulty multiplier per fixture, so a blank gameweek is 0.0 and
+    a double is roughly 2.0; `sum(multiplier)` replaces `horizon * averaged multiplier`.
+    """
+
+    team_ids: np.ndarray
+    events: np.ndarray
+    fixture_count: np.ndarray
+    difficulty: np.ndarray  # [team_idx, gameweek_idx, slot], NaN where there is no fixture
+    multiplier: np.ndarray
+
+    def for_team(self, team_id: int) -> np.ndarray:
+        rows = np.flatnonzero(self.team_ids == int(team_id))
+        if rows.size == 0:
+            return np.zeros(len(self.events))
+        return self.multiplier[int(rows[0])]
+
+    def by_team(self) -> Dict[int, np.ndarray]:
+        return {int(t): self.multiplier[i] for i, t in enumerate(self.team_ids)}
+
+
+@dataclass(frozen=True)
+class FixtureSweep:
+    """
+    Fixture outlook over a grid of start events x horizons. Every array is indexed
+    `[from_event_idx, horizon_idx, team_idx]`; `score` / `multiplier` follow
+    `compute_fixture_outlook` (99.0 / 1.0 for teams with no fixtures in the window).
+    """
+
+    team_ids: np.ndarray
+    from_events: np.ndarray
+    horizons: np.ndarray
+    fixture_count: np.ndarray
+    score: np.ndarray
+    good: np.ndarray
+    bad: np.ndarray
+    has_double: np.ndarray
+    multiplier: np.ndarray
+
+    def multipliers(self, from_event: int, horizon: int) -> Dict[int, float]:
+        """Per-team multipliers for one cell, in the `compute_fixture_outlook` shape."""
+        fi = int(np.flatnonzero(self.from_events == int(from_event))[0])
+        hi = int(np.flatnonzero(self.horizons == int(horizon))[0])
+        return {int(t): float(m) for t, m in zip(self.team_ids, self.multiplier[fi, hi])}
+
+    def to_compact(self, *, decimals: int = 4) -> Dict[str, Any]:
+        """JSON-ready nested lists (`[from_event][horizon][team]`) with shared axis labels."""
+        return {
+            "team_ids": self.team_ids.tolist(),
+            "from_events": self.from_events.tolist(),
+            "horizons": self.horizons.tolist(),
+            "multiplier": np.round(self.multiplier, decimals).tolist(),
+            "score": self.score.tolist(),
+            "good": self.good.tolist(),
+            "bad": self.bad.tolist(),
+            "double": self.has_double.astype(int).tolist(),
+        }
+
+
+def compute_fixture_sweep(
+    *,
+    teams: Mapping[int, Mapping[str, Any]],
+    fixtures_payload: Iterable[Dict[str, Any]],
+    from_events: Sequence[int],
+    horizons: Sequence[int],
+    good_threshold: int = 2,
+    bad_threshold: int = 4,
+    index: Optional[FixtureIndex] = None,
+) -> FixtureSweep:
+    """`compute_fixture_outlook` for many `(from_event, horizon)` pairs from one pass over the fixtures."""
+    index = index or FixtureIndex(fixtures_payload, team_ids=teams.keys())
+    return index.sweep(
+        from_events=from_events,
+        horizons=horizons,
+        good_threshold=good_threshold,
+        bad_threshold=bad_threshold,
+    )
+
+
+def infer_from_event(events: Iterable[Mapping[str, Any]]) -> Optional[int]:
+    """Current gameweek from bootstrap `events`, falling back to the next one."""
+    events = list(events)
+    current = next((e for e in events if e.get("is_current")), None)
+    if current and current.get("id"):
+        return int(current["id"])
+    nxt = next((e for e in events if e.get("is_next")), None)
+    return int(nxt["id"]) if nxt and nxt.get("id") else None
+
+
+def infer_next_event(events: Iterable[Mapping[str, Any]]) -> Optional[int]:
+    """First gameweek still to be played: the `is_next` event, else the first unfinished one."""
+    events = list(events)
+    nxt = next((e for e in events if e.get("is_next")), None)
+    if nxt and nxt.get("id"):
+        return int(nxt["id"])
+    pending = next((e for e in events if e.get("id") and not e.get("finished")), None)
+    return int(pending["id"]) if pending else None
+
+
 def compute_fixture_outlook(
     *,
-    teams: Dict[int, Dict[str, Any]],
+    teams: Mapping[int, Mapping[str, Any]],
     fixtures_payload: Iterable[Dict[str, Any]],
     from_event: Optional[int],
     horizon_events: int,
     good_threshold: int = 2,
     bad_threshold: int = 4,
+    index: Optional[FixtureIndex] = None,
 ) -> Tuple[List[FixtureOutlookRow], Dict[int, float]]:
     """
     Returns:
       - rows for reporting
       - per-team outlook multiplier in [~0.85..1.15] (lower difficulty => higher multiplier)
+
+    Pass a prebuilt `index` to answer several windows without rescanning the fixtures.
     """
+    index = index or FixtureIndex(fixtures_payload, team_ids=teams.keys())
+    win = index.window(
+        from_event=from_event,
+        horizon_events=horizon_events,
+        good_threshold=good_threshold,
+        bad_threshold=bad_threshold,
+    )
     rows: List[FixtureOutlookRow] = []
     multipliers: Dict[int, float] = {}
 
     for team_id, team in teams.items():
-        upcoming = upcoming_fixtures_for_team(
-            fixtures_payload, team_id, from_event=from_event, horizon_events=horizon_events
-        )
-        diffs: List[int] = []
-        good = 0
-        bad = 0
-        notes: List[str] = []
-
-        if len(upcoming) == 0:
+        row = index.team_row.get(int(team_id))
+        if row is None or win.fixture_count[row] == 0:
             rows.append(
                 FixtureOutlookRow(
                     team=team.get("name", str(team_id)),
@@ -85,32 +350,15 @@ def compute_fixture_outlook(
             multipliers[team_id] = 1.0
             continue
 
-        events = [fx.get("event") for fx in upcoming if fx.get("event") is not None]
-        # naive DGW/BGW detection within horizon (duplicate/missing events)
-        if len(set(events)) < len(events):
-            notes.append("Potential DGW in horizon")
-
-        for fx in upcoming:
-            d = _fixture_team_difficulty(fx, team_id)
-            if d is None:
-                continue
-            diffs.append(int(d))
-            if d <= good_threshold:
-                good += 1
-            if d >= bad_threshold:
-                bad += 1
-
-        avg = sum(diffs) / max(1, len(diffs))
-        # map avg difficulty 1..5 to multiplier ~1.15..0.85
-        mult = 1.15 - ((avg - 1.0) * (0.30 / 4.0))
-        multipliers[team_id] = float(max(0.80, min(1.20, mult)))
-
+        # naive DGW detection within horizon (an event with 2+ fixtures)
+        notes = ["Potential DGW in horizon"] if win.has_double[row] else []
+        multipliers[team_id] = float(win.multiplier[row])
         rows.append(
             FixtureOutlookRow(
                 team=team.get("name", str(team_id)),
-                fixture_difficulty_score=float(round(avg, 2)),
-                number_of_good_fixtures=good,
-                number_of_bad_fixtures=bad,
+                fixture_difficulty_score=float(round(float(win.avg_difficulty[row]), 2)),
+                number_of_good_fixtures=int(win.good[row]),
+                number_of_bad_fixtures=int(win.bad[row]),
                 special_notes=", ".join(notes) if notes else "",
             )
         )
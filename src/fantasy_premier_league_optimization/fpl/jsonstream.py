@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import gzip
+import json
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, TextIO
+
+
+class JsonStream:
+    """
+    Minimal incremental JSON reader over a text file handle.
+
+    Only the values a caller asks for are materialized: `members()` walks an object's keys,
+    `items()` yields array entries one at a time, and `skip()` discards a value while holding
+    at most one array item / object member in memory. Scalars and leaf containers are
+    decoded with the C `json` scanner.
+    """
+
+    def __init__(self, fh: TextIO, *, chunk_size: int = 1 << 16):
+        self._fh = fh
+        self._chunk = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buf = ""
+        self._pos = 0
+        self._offset = 0  # absolute position of _buf[0] in the stream
+        self._eof = False
+
+    def _more(self, size: int) -> bool:
+        if self._eof:
+            return False
+        if self._pos > self._chunk and self._pos * 2 > len(self._buf):
+            self._offset += self._pos
+            self._buf = self._buf[self._pos :]
+            self._pos = 0
+        data = self._fh.read(size)
+        if not data:
+            self._eof = True
+            return False
+        self._buf += data
+        return True
+
+    def _peek(self) -> str:
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in " \t\r\n":
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._more(self._chunk):
+                return ""
+
+    def _expect(self, ch: str) -> None:
+        got = self._peek()
+        if got != ch:
+            raise ValueError(f"Expected '{ch}' at offset {self._offset + self._pos}, got {got!r}")
+        self._pos += 1
+
+    def _tell(self) -> int:
+        return self._offset + self._pos
+
+    def value(self) -> Any:
+        """Decode the next complete value."""
+        self._peek()
+        need = self._chunk
+        while True:
+            try:
+                val, end = self._decoder.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if not self._more(need):
+                    raise
+                need *= 2  # geometric growth keeps re-scans of large values linear overall
+                continue
+            if end >= len(self._buf) and self._more(need):
+                continue  # a number / literal may continue in the next chunk
+            self._pos = end
+            return val
+
+    def skip(self) -> None:
+        ch = self._peek()
+        if ch == "[":
+            for _ in self.items():
+                pass
+        elif ch == "{":
+            for _ in self.members():
+                pass
+        else:
+            self.value()
+
+    def items(self) -> Iterator[Any]:
+        """Yield the entries of the array at the current position one at a time."""
+        self._expect("[")
+        if self._peek() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self.value()
+            ch = self._peek()
+            self._pos += 1
+            if ch == "]":
+                return
+            if ch != ",":
+                raise ValueError(f"Malformed array at offset {self._tell() - 1}")
+
+    def members(self) -> Iterator[str]:
+        """
+        Yield the keys of the object at the current position. After each key the caller may
+        consume the value (`value()` / `items()` / `skip()`); unconsumed values are skipped.
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            key = self.value()
+            self._expect(":")
+            before = self._tell()
+            yield key
+            if self._tell() == before:
+                self.skip()
+            ch = self._peek()
+            self._pos += 1
+            if ch == "}":
+                return
+            if ch != ",":
+                raise ValueError(f"Malformed object at offset {self._tell() - 1}")
+
+
+@contextmanager
+def open_stream(path: Path) -> Iterator[JsonStream]:
+    opener = gzip.open if path.name.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8") as fh:
+        yield JsonStream(fh)
+
+
+def iter_section_items(
+    path: Path,
+    section: str,
+    *,
+    fields: Optional[Sequence[str]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the entries of top-level array `section` (e.g. bootstrap `elements`), optionally
+    keeping only `fields` of each entry. Other sections are skipped without being built.
+    """
+    wanted = tuple(fields) if fields else None
+    with open_stream(path) as stream:
+        for key in stream.members():
+            if key != section:
+                continue
+            for item in stream.items():
+                if wanted is not None and isinstance(item, dict):
+                    item = {f: item.get(f) for f in wanted}
+                yield item
+            return
+
+
+def read_sections(path: Path, sections: Sequence[str]) -> Dict[str, Any]:
+    """Decode only the requested top-level sections of a JSON object file."""
+    wanted = set(sections)
+    out: Dict[str, Any] = {}
+    with open_stream(path) as stream:
+        for key in stream.members():
+            if key in wanted:
+                out[key] = stream.value()
+                if len(out) == len(wanted):
+                    break
+    return out
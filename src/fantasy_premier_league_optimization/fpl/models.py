@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+
+# (one-gameweek base rate, availability weight) per player
+Components = Tuple[np.ndarray, np.ndarray]
+
+
+@dataclass(frozen=True)
+class ProjectionModel:
+    """
+    A named way of turning element columns into per-player projection components.
+    Bump `version` whenever a model's formula changes (it is part of every memo key).
+    """
+
+    name: str
+    version: int
+    fields: Sequence[str]  # element columns `components` reads
+    components: Callable[[Mapping[str, Any]], Components]
+    description: str = ""
+
+
+DEFAULT_MODEL = "heuristic"
+
+_REGISTRY: Dict[str, ProjectionModel] = {}
+
+
+def register_model(model: ProjectionModel) -> ProjectionModel:
+    _REGISTRY[model.name] = model
+    return model
+
+
+def get_model(name: str | None) -> ProjectionModel:
+    key = (name or DEFAULT_MODEL).strip().lower()
+    if key not in _REGISTRY:
+        raise ValueError(f"Unknown projection model {name!r}. Available: {', '.join(available_models())}")
+    return _REGISTRY[key]
+
+
+def available_models() -> List[str]:
+    return sorted(_REGISTRY)
+
+
+def _col(columns: Mapping[str, Any], name: str) -> np.ndarray:
+    return np.nan_to_num(np.asarray(columns[name], dtype=np.float64))
+
+
+def _minutes_availability(columns: Mapping[str, Any]) -> np.ndarray:
+    # Reliability proxy: minutes share (downweight low-minute players)
+    return 0.65 + np.minimum(0.35, _col(columns, "minutes") / 1800.0)  # after ~20 matches, near full weight
+
+
+def _heuristic(columns: Mapping[str, Any]) -> Components:
+    ep_next = _col(columns, "ep_next")
+    ppg = _col(columns, "points_per_game")
+    form = _col(columns, "form")
+    return np.maximum(ep_next, 0.55 * ppg + 0.45 * form), _minutes_availability(columns)
+
+
+def _ep_next_only(columns: Mapping[str, Any]) -> Components:
+    # FPL's own expected points already price minutes and flags, so no extra availability weight.
+    ep_next = _col(columns, "ep_next")
+    return np.maximum(ep_next, 0.0), np.ones_like(ep_next)
+
+
+ICT_FEATURES: Sequence[str] = ("ict_index", "influence", "creativity", "threat")
+ICT_MIN_MINUTES = 450.0
+
+
+def _ict_regression(columns: Mapping[str, Any]) -> Components:
+    """
+    Per-position least squares of points-per-90 on ICT/influence/creativity/threat per 90,
+    fitted on the current snapshot's regulars. Predictions are shrunk towards the position
+    mean for low-minute players before being used as the one-gameweek base rate.
+    """
+    minutes = _col(columns, "minutes")
+    per90 = 90.0 / np.maximum(minutes, 1.0)
+    target = _col(columns, "total_points") * per90
+    features = np.column_stack([_col(columns, f) * per90 for f in ICT_FEATURES] + [np.ones_like(minutes)])
+    positions = _col(columns, "element_type").astype(np.int64)
+
+    predicted = np.zeros_like(minutes)
+    for pos in np.unique(positions):
+        rows = positions == pos
+        fit = rows & (minutes >= ICT_MIN_MINUTES)
+        prior = float(target[fit].mean()) if fit.any() else 0.0
+        if fit.sum() > features.shape[1]:
+            coef, *_ = np.linalg.lstsq(features[fit], target[fit], rcond=None)
+            raw = features[rows] @ coef
+        else:
+            raw = np.full(int(rows.sum()), prior)
+        weight = minutes[rows] / (minutes[rows] + ICT_MIN_MINUTES)
+        predicted[rows] = weight * raw + (1.0 - weight) * prior
+    return np.maximum(predicted, 0.0), _minutes_availability(columns)
+
+
+register_model(
+    ProjectionModel(
+        name="heuristic",
+        version=1,
+        fields=("team", "ep_next", "points_per_game", "form", "minutes"),
+        components=_heuristic,
+        description="max(ep_next, 0.55*ppg + 0.45*form), weighted by minutes played.",
+    )
+)
+register_model(
+    ProjectionModel(
+        name="ep_next",
+        version=1,
+        fields=("team", "ep_next"),
+        components=_ep_next_only,
+        description="FPL's official expected points for the next gameweek only.",
+    )
+)
+register_model(
+    ProjectionModel(
+        name="ict_regression",
+        version=1,
+        fields=("team", "element_type", "minutes", "total_points", *ICT_FEATURES),
+        components=_ict_regression,
+        description="Per-position regression of points per 90 on ICT components per 90.",
+    )
+)
@@ -1,18 +1,40 @@
 from __future__ import annotations
 
+import heapq
+import itertools
+import os
+import re
+import tempfile
+import time
 from collections import Counter, defaultdict
-from dataclasses import dataclass
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Sequence, Set, Tuple
 
+import numpy as np
 import pulp
 
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL, get_model
 from fantasy_premier_league_optimization.fpl.scoring import (
     player_cost_millions,
     player_name,
-    player_projection_points,
+    columns_from_elements,
     position_short,
+    project_points_batch,
     status_label,
 )
+from fantasy_premier_league_optimization.fpl.squad_search import NodeLimitReached, search_squad
+
+
+@dataclass(frozen=True)
+class SolverStats:
+    backend: str  # "bnb" or "cbc"
+    status: str  # "optimal", "gap_limit" (within `mip_gap`) or "time_limit" (incumbent)
+    wall_seconds: float
+    nodes: Optional[int] = None
+    lp_iterations: Optional[int] = None  # CBC only
+    best_bound: Optional[float] = None  # proven upper bound on the objective
+    gap: Optional[float] = None  # (best_bound - objective) / |objective|
 
 
 @dataclass(frozen=True)
@@ -24,7 +46,47 @@ class OptimizedSquad:
     vice_captain: Dict[str, Any]
     total_cost: float
     total_projected_points: float
+    lineup_projected_points: Optional[float] = None  # XI + captain's extra share (joint model)
+    pruning: Optional["PruneReport"] = None
+    objective: Optional[float] = None  # solver objective (differential bonus, bench weight included)
+    gap_to_best: Optional[float] = None  # top-K results: objective shortfall vs the best squad
+    stats: Optional[SolverStats] = None
+
+
+# Element fields read by `optimize_squad_ilp`; pass as `fields=` to `iter_bootstrap_elements`
+# to stream only what the optimizer needs.
+OPTIMIZER_FIELDS: Sequence[str] = (
+    "id",
+    "element_type",
+    "team",
+    "status",
+    "first_name",
+    "second_name",
+    "web_name",
+    "now_cost",
+    "ep_next",
+    "form",
+    "points_per_game",
+    "minutes",
+    "total_points",
+    "selected_by_percent",
+    "ict_index",
+    "influence",
+    "creativity",
+    "threat",
+)
+
 
+SQUAD_QUOTAS: Mapping[str, int] = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+
+SOLVERS: Sequence[str] = ("auto", "bnb", "cbc")
+# "auto" hands models with more must-include alternatives than this to CBC
+MAX_GROUP_COMBINATIONS = 16
+# In-process search nodes before giving up: "auto" falls back to CBC early (tie-heavy
+# single-gameweek objectives and tight club caps can need millions of nodes where CBC needs
+# milliseconds); an explicit "bnb" has no CBC to fall back to, so it runs to the end.
+AUTO_NODE_LIMIT = 20_000
+BNB_NODE_LIMIT: Optional[int] = None
 
 ALLOWED_FORMATIONS: Sequence[Tuple[int, int, int]] = (
     (3, 4, 3),
@@ -40,25 +102,21 @@ def _normalize_name(s: str) -> str:
     return " ".join(s.strip().lower().split())
 
 
-def optimize_squad_ilp(
+def build_player_pool(
     elements: Iterable[Dict[str, Any]],
     *,
     horizon_gameweeks: int,
-    budget: float = 100.0,
-    max_from_team: int = 3,
-    must_include: Optional[Sequence[str]] = None,
     avoid: Optional[Sequence[str]] = None,
     team_fixture_multiplier: Optional[Dict[int, float]] = None,
     allow_flagged_players: bool = False,
-    risk_profile: str = "template",
-    differential_weight: float = 0.12,
-) -> OptimizedSquad:
-    must_include = must_include or []
-    avoid = avoid or []
-    must_set = {_normalize_name(x) for x in must_include if x and x.strip()}
-    avoid_set = {_normalize_name(x) for x in avoid if x and x.strip()}
-
-    players: List[Dict[str, Any]] = []
+    team_fixture_vectors: Optional[Mapping[int, Sequence[float]]] = None,
+    projected_points: Optional[Mapping[int, float]] = None,
+    projection_model: str = DEFAULT_MODEL,
+) -> List[Dict[str, Any]]:
+    """Eligible elements as optimizer player dicts, with projections for the horizon."""
+    avoid_set = {_normalize_name(x) for x in (avoid or []) if x and x.strip()}
+
+    eligible: List[Any] = []
     for e in elements:
         pos = position_short(int(e.get("element_type", 0) or 0))
         if pos is None:
@@ -68,10 +126,23 @@ def optimize_squad_ilp(
         nm = player_name(e)
         if _normalize_name(nm) in avoid_set:
             continue
+        eligible.append((e, pos, nm))
+
+    # one vectorised projection pass over the eligible pool
+    projections = project_points_batch(
+        columns_from_elements((e for e, _, _ in eligible), get_model(projection_model).fields),
+        horizon_gameweeks=horizon_gameweeks,
+        team_multipliers=team_fixture_multiplier,
+        team_fixture_vectors=team_fixture_vectors,
+        model=projection_model,
+    )
 
+    players: List[Dict[str, Any]] = []
+    for (e, pos, nm), proj in zip(eligible, projections):
+        if projected_points is not None:
+            # precomputed projections (e.g. `ProjectionMatrix.by_element`) take precedence
+            proj = projected_points.get(int(e.get("id")), proj)
         team_id = int(e.get("team") or 0)
-        mult = (team_fixture_multiplier or {}).get(team_id, 1.0)
-        proj = player_projection_points(e, horizon_gameweeks=horizon_gameweeks, fixture_multiplier=mult)
         cost = player_cost_millions(e)
         players.append(
             {
@@ -88,85 +159,757 @@ def optimize_squad_ilp(
                 "status": status_label(e),
             }
         )
+    return players
 
-    if not players:
-        raise ValueError("No eligible players available for optimization.")
-
-    # Decision vars
-    x: Dict[int, pulp.LpVariable] = {p["id"]: pulp.LpVariable(f"x_{p['id']}", 0, 1, cat="Binary") for p in players}
-
-    model = pulp.LpProblem("fpl_squad_optimization", pulp.LpMaximize)
 
+def objective_weight(p: Dict[str, Any], *, risk_profile: str = "template", differential_weight: float = 0.12) -> float:
+    """A player's coefficient in the squad objective."""
     risk = (risk_profile or "template").strip().lower()
-    if risk not in {"template", "differential"}:
-        risk = "template"
-
-    # Objective: maximize projected points (+ optional differential bonus)
     # Differential bonus gently prefers lower ownership but won't dominate points.
     if risk == "differential":
         # low_own ranges ~0..1 ; scale bonus relative to projected points magnitude
-        model += pulp.lpSum(
-            (p["projected_points"] * (1.0 + float(differential_weight) * (1.0 - (p["selected_by_percent"] / 100.0))))
-            * x[p["id"]]
-            for p in players
-        )
-    else:
-        model += pulp.lpSum(p["projected_points"] * x[p["id"]] for p in players)
+        return p["projected_points"] * (1.0 + differential_weight * (1.0 - (p["selected_by_percent"] / 100.0)))
+    return p["projected_points"]
 
-    # Squad size
-    model += pulp.lpSum(x[p["id"]] for p in players) == 15
 
-    # Budget
-    model += pulp.lpSum(p["cost"] * x[p["id"]] for p in players) <= float(budget)
+@dataclass(frozen=True)
+class PruneReport:
+    total: int
+    kept: int
 
-    # Position constraints: 2 GK, 5 DEF, 5 MID, 3 FWD
-    def _pos_sum(pos: str) -> pulp.LpAffineExpression:
-        return pulp.lpSum(x[p["id"]] for p in players if p["position"] == pos)
+    @property
+    def ratio(self) -> float:
+        """Share of the pool removed before the solve."""
+        return 1.0 - self.kept / self.total if self.total else 0.0
 
-    model += _pos_sum("GK") == 2
-    model += _pos_sum("DEF") == 5
-    model += _pos_sum("MID") == 5
-    model += _pos_sum("FWD") == 3
 
-    # Max players per team
-    by_team: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
-    for p in players:
-        by_team[p["team_id"]].append(p)
-    for team_id, ps in by_team.items():
-        model += pulp.lpSum(x[p["id"]] for p in ps) <= int(max_from_team)
+def prune_dominated_players(
+    players: Sequence[Dict[str, Any]],
+    *,
+    max_from_team: int = 3,
+    keep: Iterable[int] = (),
+    risk_profile: str = "template",
+    differential_weight: float = 0.12,
+    spare: int = 0,
+) -> Tuple[List[Dict[str, Any]], PruneReport]:
+    """
+    Drop players that no optimal squad can contain.
+
+    `q` dominates `p` when both play the same position, `q` costs no more and has a strictly
+    higher objective weight. If `p`'s dominators come from enough distinct clubs, any squad
+    holding `p` leaves at least one dominator that is unpicked and whose club is not at
+    `max_from_team`, so swapping it in keeps the squad feasible and scores more. At most
+    quota - 1 dominators can share `p`'s position in the squad and the other 14 picks fill at
+    most 14 // max_from_team clubs, so quota + 14 // max_from_team clubs are enough.
+
+    The argument covers the joint XI/captain objective too (the dominator takes `p`'s role).
+    Each of `spare` extra clubs adds one more distinct better squad, so `spare=k - 1` keeps
+    everything that can appear in the top k. Players in `keep` are never pruned.
+    """
+    keep_ids = {int(i) for i in keep}
+    weight = np.array(
+        [objective_weight(p, risk_profile=risk_profile, differential_weight=differential_weight) for p in players],
+        dtype=float,
+    )
+    cost = np.array([p["cost"] for p in players], dtype=float)
+    team_codes, team = np.unique([p["team_id"] for p in players], return_inverse=True)
+    position = np.array([p["position"] for p in players])
+    blocked_clubs = 14 // max(int(max_from_team), 1) + max(int(spare), 0)
+
+    pruned = np.zeros(len(players), dtype=bool)
+    for pos, quota in SQUAD_QUOTAS.items():
+        idx = np.flatnonzero(position == pos)
+        if idx.size == 0:
+            continue
+        # dominates[i, j]: player j dominates player i
+        dominates = (cost[idx][None, :] <= cost[idx][:, None] + 1e-9) & (weight[idx][None, :] > weight[idx][:, None])
+        clubs = np.zeros((idx.size, team_codes.size), dtype=bool)
+        for col in range(team_codes.size):
+            clubs[:, col] = dominates[:, team[idx] == col].any(axis=1)
+        pruned[idx] = clubs.sum(axis=1) >= quota + blocked_clubs
+
+    kept = [p for p, drop in zip(players, pruned) if not drop or p["id"] in keep_ids]
+    return kept, PruneReport(total=len(players), kept=len(kept))
+
+
+class SquadOptimizer:
+    """
+    The 15-man squad ILP built once for a player pool, kept alive for what-if queries.
+
+    With `bench_weight` set (the default) the model is joint: starting XI, formation and
+    captain are decision variables too, and the objective counts XI points, the captain's
+    double and bench points at `bench_weight` (0 to 1). `bench_weight=None` keeps the original
+    "maximize all 15, then pick XI/captain heuristically" behaviour.
+
+    Mutators only touch a bound, a right-hand side or a named constraint, so a re-solve skips
+    rebuilding ~800 variables and every constraint; each solve after the first is warm-started
+    from the previous optimum.
+
+    `solver` picks the backend: "bnb" is the in-process branch and bound in `squad_search`
+    (no CBC subprocess, no model file round trip), "cbc" the PuLP model, and "auto" (default)
+    tries "bnb" and falls back to CBC for what it does not cover (Hamming cuts from
+    `exclude_squad`, many must-include alternatives, or `AUTO_NODE_LIMIT` nodes). "bnb" on
+    its own always searches to optimality, which is usually milliseconds but can take tens of
+    seconds on an unlucky pool; bound it with `time_limit_seconds` / `mip_gap` if that matters.
+
+    `time_limit_seconds` and `mip_gap` (relative) make solves anytime: when either stops the
+    search early the best squad found so far is returned, and `stats` on the result reports
+    the backend, nodes, LP iterations, wall time, proven bound and remaining gap.
+
+        opt = SquadOptimizer(players, budget=100.0)
+        base = opt.solve()
+        opt.force([salah_id])
+        opt.set_budget(99.5)
+        what_if = opt.solve()
+    """
+
+    def __init__(
+        self,
+        players: Sequence[Dict[str, Any]],
+        *,
+        budget: float = 100.0,
+        max_from_team: int = 3,
+        risk_profile: str = "template",
+        differential_weight: float = 0.12,
+        bench_weight: Optional[float] = 0.1,
+        solver: str = "auto",
+        time_limit_seconds: Optional[float] = None,
+        mip_gap: Optional[float] = None,
+    ):
+        if not players:
+            raise ValueError("No eligible players available for optimization.")
+        if solver not in SOLVERS:
+            raise ValueError(f"Unknown solver {solver!r}; expected one of {', '.join(SOLVERS)}.")
+        if bench_weight is not None and not 0.0 <= float(bench_weight) <= 1.0:
+            raise ValueError("bench_weight must be between 0 and 1.")
+        # own copies: `set_projections` must not write into the caller's (possibly shared) dicts
+        self.players: List[Dict[str, Any]] = [dict(p) for p in players]
+        self.by_id: Dict[int, Dict[str, Any]] = {p["id"]: p for p in self.players}
+        self.risk_profile = risk_profile
+        self.differential_weight = float(differential_weight)
+        self.budget = float(budget)
+        self.max_from_team = int(max_from_team)
+        self.bench_weight = None if bench_weight is None else float(bench_weight)
+        self.solver = solver
+        self.time_limit_seconds = None if time_limit_seconds is None else float(time_limit_seconds)
+        self.mip_gap = None if mip_gap is None else float(mip_gap)
+
+        # Decision vars
+        self.x: Dict[int, pulp.LpVariable] = {
+            p["id"]: pulp.LpVariable(f"x_{p['id']}", 0, 1, cat="Binary") for p in self.players
+        }
+        # Joint model only: starters, captain and one binary per allowed formation
+        self.y: Dict[int, pulp.LpVariable] = {}
+        self.c: Dict[int, pulp.LpVariable] = {}
+        self.formation: Dict[Tuple[int, int, int], pulp.LpVariable] = {}
+        if self.bench_weight is not None:
+            for p in self.players:
+                self.y[p["id"]] = pulp.LpVariable(f"y_{p['id']}", 0, 1, cat="Binary")
+                self.c[p["id"]] = pulp.LpVariable(f"c_{p['id']}", 0, 1, cat="Binary")
+            for d, m, f in ALLOWED_FORMATIONS:
+                self.formation[(d, m, f)] = pulp.LpVariable(f"formation_{d}{m}{f}", 0, 1, cat="Binary")
+
+        self.model = pulp.LpProblem("fpl_squad_optimization", pulp.LpMaximize)
+        self.model += self._objective()
+        x = self.x
+
+        # Squad size
+        self.model += pulp.lpSum(x[p["id"]] for p in self.players) == 15, "squad_size"
+
+        # Budget
+        self._budget = pulp.lpSum(p["cost"] * x[p["id"]] for p in self.players) <= self.budget
+        self.model += self._budget, "budget"
+
+        # Position constraints: 2 GK, 5 DEF, 5 MID, 3 FWD
+        for pos, count in SQUAD_QUOTAS.items():
+            self.model += pulp.lpSum(x[p["id"]] for p in self.players if p["position"] == pos) == count, f"pos_{pos}"
+
+        # Max players per team
+        by_team: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+        for p in self.players:
+            by_team[p["team_id"]].append(p)
+        self._team_caps: List[pulp.LpConstraint] = []
+        for team_id, ps in by_team.items():
+            cap = pulp.lpSum(x[p["id"]] for p in ps) <= self.max_from_team
+            self.model += cap, f"team_{team_id}"
+            self._team_caps.append(cap)
+
+        if self.bench_weight is not None:
+            self._add_lineup_constraints()
+
+        # "at least one of" groups; released groups are relaxed to >= 0 rather than removed
+        self._groups: Dict[Tuple[int, ...], pulp.LpConstraint] = {}
+        self._active_groups: set = set()
+        self._cuts = 0
+        self._last_solution: Optional[Dict[str, float]] = None
+
+    def _add_lineup_constraints(self) -> None:
+        y, c = self.y, self.c
+        for p in self.players:
+            self.model += y[p["id"]] <= self.x[p["id"]], f"starter_owned_{p['id']}"
+            self.model += c[p["id"]] <= y[p["id"]], f"captain_starts_{p['id']}"
+        self.model += pulp.lpSum(c.values()) == 1, "one_captain"
+        self.model += pulp.lpSum(self.formation.values()) == 1, "one_formation"
+
+        # XI: 1 GK plus the chosen formation's DEF/MID/FWD counts
+        slots = {"GK": lambda d, m, f: 1, "DEF": lambda d, m, f: d, "MID": lambda d, m, f: m, "FWD": lambda d, m, f: f}
+        for pos, count in slots.items():
+            self.model += (
+                pulp.lpSum(y[p["id"]] for p in self.players if p["position"] == pos)
+                == pulp.lpSum(count(*k) * v for k, v in self.formation.items()),
+                f"xi_{pos}",
+            )
+
+    def _weight(self, p: Dict[str, Any]) -> float:
+        return objective_weight(p, risk_profile=self.risk_profile, differential_weight=self.differential_weight)
+
+    def _objective(self) -> pulp.LpAffineExpression:
+        # Objective: maximize projected points (+ optional differential bonus)
+        if self.bench_weight is None:
+            return pulp.lpSum(self._weight(p) * self.x[p["id"]] for p in self.players)
+        # XI counts fully, the captain once more, bench players at `bench_weight`
+        return pulp.lpSum(
+            self._weight(p)
+            * (self.y[p["id"]] + self.c[p["id"]] + self.bench_weight * (self.x[p["id"]] - self.y[p["id"]]))
+            for p in self.players
+        )
 
+    # --- what-if mutators -------------------------------------------------------------------
+
+    def set_budget(self, budget: float) -> None:
+        self.budget = float(budget)
+        self._budget.changeRHS(self.budget)
+
+    def set_max_from_team(self, max_from_team: int) -> None:
+        self.max_from_team = int(max_from_team)
+        for cap in self._team_caps:
+            cap.changeRHS(self.max_from_team)
+
+    def _check(self, player_ids: Iterable[int]) -> List[int]:
+        ids = [int(i) for i in player_ids]
+        unknown = [i for i in ids if i not in self.x]
+        if unknown:
+            raise ValueError(f"Players not in the optimizer pool: {unknown}")
+        return ids
+
+    def force(self, player_ids: Iterable[int], *, any_of: bool = False) -> None:
+        """Require each of `player_ids` (or, with `any_of`, at least one of them) in the squad."""
+        ids = self._check(player_ids)
+        if not any_of:
+            for i in ids:
+                self.x[i].lowBound = 1
+            return
+        group = tuple(sorted(ids))
+        self._active_groups.add(group)
+        if group in self._groups:
+            self._groups[group].changeRHS(1)
+            return
+        con = pulp.lpSum(self.x[i] for i in group) >= 1
+        self.model += con, "force_" + "_".join(str(i) for i in group)
+        self._groups[group] = con
+
+    def exclude(self, player_ids: Iterable[int]) -> None:
+        for i in self._check(player_ids):
+            self.x[i].upBound = 0
+
+    def exclude_where(self, predicate: Callable[[Dict[str, Any]], bool]) -> List[int]:
+        """Exclude every pool player matching `predicate(player)` (e.g. one club's defenders)."""
+        ids = [p["id"] for p in self.players if predicate(p)]
+        self.exclude(ids)
+        return ids
+
+    def exclude_squad(self, player_ids: Iterable[int], *, min_difference: int = 1) -> None:
+        """Cut off every squad sharing more than 15 - `min_difference` players with `player_ids`."""
+        ids = self._check(player_ids)
+        self._cuts += 1
+        self.model += pulp.lpSum(self.x[i] for i in ids) <= len(ids) - int(min_difference), f"cut_{self._cuts}"
+
+    def release(self, player_ids: Optional[Iterable[int]] = None) -> None:
+        """Drop force / exclude rules for `player_ids` (all rules when None)."""
+        ids = set(self.x) if player_ids is None else set(self._check(player_ids))
+        for i in ids:
+            self.x[i].lowBound = 0
+            self.x[i].upBound = 1
+        for group, con in self._groups.items():
+            if ids.intersection(group):
+                con.changeRHS(0)
+                self._active_groups.discard(group)
+
+    def set_projections(self, projected_points: Mapping[int, float]) -> None:
+        """Replace projections (e.g. another horizon or model) and rebuild only the objective."""
+        for k, p in enumerate(self.players):
+            if p["id"] in projected_points:
+                # new dicts, so squads returned by earlier solves keep the projections they were solved with
+                updated = {**p, "projected_points": float(projected_points[p["id"]])}
+                self.players[k] = self.by_id[p["id"]] = updated
+        self.model.setObjective(self._objective())
+
+    # --- solving ----------------------------------------------------------------------------
+
+    def solve(self, *, warm_start: bool = True) -> OptimizedSquad:
+        started = time.perf_counter()
+        deadline = None if self.time_limit_seconds is None else started + self.time_limit_seconds
+        if self.solver != "cbc":
+            result = self._solve_in_process(started, deadline)
+            if result is not None:
+                return result
+            if self.solver == "bnb":
+                raise ValueError("The in-process solver does not cover this model; use solver='cbc' or 'auto'.")
+        return self._solve_cbc(started, deadline, warm_start=warm_start)
+
+    def _solve_in_process(self, started: float, deadline: Optional[float]) -> Optional[OptimizedSquad]:
+        """Exact `search_squad` solve; None when the model needs CBC."""
+        if self._cuts:
+            return None
+        choices = list(itertools.product(*sorted(self._active_groups)))
+        if len(choices) > MAX_GROUP_COMBINATIONS:
+            return None
+        pool = [p for p in self.players if self.x[p["id"]].upBound != 0]
+        forced = [p["id"] for p in pool if self.x[p["id"]].lowBound == 1]
+        weights = {p["id"]: self._weight(p) for p in pool}
+
+        best = None
+        bound, nodes, timed_out = -np.inf, 0, False
+        for choice in choices:
+            try:
+                found = search_squad(
+                    pool,
+                    weights,
+                    budget=self.budget,
+                    max_from_team=self.max_from_team,
+                    quotas=SQUAD_QUOTAS,
+                    formations=None if self.bench_weight is None else ALLOWED_FORMATIONS,
+                    bench_weight=self.bench_weight if self.bench_weight is not None else 0.0,
+                    forced=set(forced).union(choice),
+                    node_limit=AUTO_NODE_LIMIT if self.solver == "auto" else BNB_NODE_LIMIT,
+                    deadline=deadline,
+                    gap=self.mip_gap or 0.0,
+                )
+            except NodeLimitReached:
+                if self.solver == "bnb":  # only the time limit stops an explicit "bnb" search
+                    raise ValueError("Optimization failed: time limit reached before any feasible squad.") from None
+                return None
+            if found is None:
+                continue
+            bound, nodes = max(bound, found.bound), nodes + found.nodes
+            timed_out = timed_out or found.timed_out
+            if best is None or found.objective > best.objective + 1e-9:
+                best = found
+        if best is None:
+            raise ValueError("Optimization failed: Infeasible")
+
+        # remember the optimum so a later CBC solve can warm-start from it
+        picked, starting, skipper = set(best.squad), set(best.starters), best.captain
+        self._last_solution = {v.name: 0.0 for v in self.model.variables()}
+        for i in picked:
+            self._last_solution[self.x[i].name] = 1.0
+        for i in starting:
+            self._last_solution[self.y[i].name] = 1.0
+        if skipper is not None:
+            self._last_solution[self.c[skipper].name] = 1.0
+
+        gap = _relative_gap(best.objective, bound)
+        status = "time_limit" if timed_out else ("gap_limit" if gap > 1e-9 else "optimal")
+        if status == "optimal":
+            bound, gap = best.objective, 0.0  # pruned-node bounds only differ by rounding
+        stats = SolverStats(
+            backend="bnb",
+            status=status,
+            wall_seconds=time.perf_counter() - started,
+            nodes=nodes,
+            best_bound=bound,
+            gap=gap,
+        )
+        return self._result([p for p in self.players if p["id"] in picked], starting, skipper, best.objective, stats)
+
+    def _solve_cbc(self, started: float, deadline: Optional[float], *, warm_start: bool) -> OptimizedSquad:
+        use_warm_start = warm_start and self._last_solution is not None
+        if use_warm_start:
+            for var in self.model.variables():
+                if var.name in self._last_solution:
+                    # keep the start within current bounds (a previous pick may since be excluded)
+                    lo = var.lowBound if var.lowBound is not None else 0
+                    hi = var.upBound if var.upBound is not None else 1
+                    var.setInitialValue(max(lo, min(self._last_solution[var.name], hi)))
+
+        # CBC needs a positive limit; after an in-process attempt, give it whatever is left
+        time_limit = None if deadline is None else max(1.0, deadline - time.perf_counter())
+        fd, log_path = tempfile.mkstemp(suffix=".log", prefix="fpl_cbc_")
+        os.close(fd)
+        try:
+            status = self.model.solve(
+                pulp.PULP_CBC_CMD(
+                    msg=False,
+                    warmStart=use_warm_start,
+                    timeLimit=time_limit,
+                    gapRel=self.mip_gap,
+                    logPath=log_path,
+                )
+            )
+            with open(log_path, encoding="utf-8", errors="replace") as fh:
+                log = _parse_cbc_log(fh.read())
+        finally:
+            os.remove(log_path)
+        # PuLP reports "Optimal" for any integer solution, including a time-limited incumbent
+        if pulp.LpStatus.get(status) != "Optimal":
+            raise ValueError(f"Optimization failed: {pulp.LpStatus.get(status)}")
+
+        self._last_solution = {v.name: round(v.varValue or 0.0) for v in self.model.variables()}
+        squad = [p for p in self.players if pulp.value(self.x[p["id"]]) >= 0.9]
+        starting = {i for i, var in self.y.items() if (pulp.value(var) or 0.0) >= 0.9}
+        skipper = next((i for i, var in self.c.items() if (pulp.value(var) or 0.0) >= 0.9), None)
+        objective = float(pulp.value(self.model.objective) or 0.0)
+
+        if log["result"].startswith("Stopped on time"):
+            status_name = "time_limit"
+        elif "gap tolerance" in log["result"]:
+            status_name = "gap_limit"
+        else:
+            status_name = "optimal"
+        bound = log.get("bound", objective if status_name == "optimal" else None)
+        stats = SolverStats(
+            backend="cbc",
+            status=status_name,
+            wall_seconds=time.perf_counter() - started,
+            nodes=log.get("nodes"),
+            lp_iterations=log.get("iterations"),
+            best_bound=bound,
+            gap=None if bound is None else _relative_gap(objective, bound),
+        )
+        return self._result(squad, starting, skipper, objective, stats)
+
+    def _result(
+        self,
+        squad: Sequence[Dict[str, Any]],
+        starting: Iterable[int],
+        captain_id: Optional[int],
+        objective: float,
+        stats: Optional[SolverStats] = None,
+    ) -> OptimizedSquad:
+        if len(squad) != 15:
+            raise ValueError(f"Optimization returned {len(squad)} players, expected 15.")
+
+        total_cost = round(sum(p["cost"] for p in squad), 1)
+        total_proj = float(sum(p["projected_points"] for p in squad))
+
+        lineup_points = None
+        if self.bench_weight is None:
+            starting_11, bench = pick_starting_11_and_bench(squad)
+            captain, vice = pick_captains(starting_11)
+        else:
+            starting_11, bench, captain, vice = self._read_lineup(squad, set(starting), captain_id)
+            lineup_points = float(sum(p["projected_points"] for p in starting_11) + captain["projected_points"])
+
+        return OptimizedSquad(
+            squad=sorted(squad, key=lambda p: (p["position"], -p["projected_points"], p["cost"])),
+            starting_11=starting_11,
+            bench=bench,
+            captain=captain,
+            vice_captain=vice,
+            total_cost=total_cost,
+            total_projected_points=total_proj,
+            lineup_projected_points=lineup_points,
+            objective=objective,
+            stats=stats,
+        )
+
+    def _read_lineup(
+        self, squad: Sequence[Dict[str, Any]], starting: Set[int], captain_id: Optional[int]
+    ) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any], Dict[str, Any]]:
+        order = {"GK": 0, "DEF": 1, "MID": 2, "FWD": 3}
+        starters = [p for p in squad if p["id"] in starting]
+        starters.sort(key=lambda p: (order[p["position"]], -p["projected_points"]))
+        if len(starters) != 11:
+            raise ValueError(f"Optimization returned {len(starters)} starters, expected 11.")
+        captain = next(p for p in starters if p["id"] == captain_id)
+        vice = max((p for p in starters if p["id"] != captain["id"]), key=lambda p: p["projected_points"])
+
+        starting_ids = {p["id"] for p in starters}
+        bench_gk = [p for p in squad if p["position"] == "GK" and p["id"] not in starting_ids]
+        bench_outfield = [p for p in squad if p["position"] != "GK" and p["id"] not in starting_ids]
+        bench_outfield.sort(key=lambda p: p["projected_points"], reverse=True)
+        return starters, bench_gk + bench_outfield, captain, vice
+
+
+def _relative_gap(objective: float, bound: float) -> float:
+    return max(0.0, float(bound) - float(objective)) / max(abs(float(objective)), 1e-9)
+
+
+_CBC_LOG_FIELDS = {
+    "Upper bound": ("bound", float),  # maximization
+    "Enumerated nodes": ("nodes", int),
+    "Total iterations": ("iterations", int),
+}
+
+
+def _parse_cbc_log(text: str) -> Dict[str, Any]:
+    """Result line, proven bound, node and LP iteration counts from a CBC log."""
+    out: Dict[str, Any] = {"result": ""}
+    for line in text.splitlines():
+        if line.startswith("Result - "):
+            out["result"] = line[len("Result - ") :].strip()
+            continue
+        m = re.match(r"([A-Za-z ]+):\s+(-?[\d.eE+]+)\s*$", line)
+        if m and m.group(1) in _CBC_LOG_FIELDS:
+            key, cast = _CBC_LOG_FIELDS[m.group(1)]
+            out[key] = cast(float(m.group(2)))
+    return out
+
+
+def resolve_must_include(players: Sequence[Dict[str, Any]], names: Optional[Sequence[str]]) -> List[List[int]]:
+    """Pool ids per must-include name; the solver forces at least one id of each group."""
+    must_set = {_normalize_name(x) for x in (names or []) if x and x.strip()}
     # Must include (best-effort by name match; if multiple share name, include any one)
-    if must_set:
-        for wanted in must_set:
-            candidates = [p for p in players if _normalize_name(p["name"]) == wanted]
-            if not candidates:
-                raise ValueError(f"Must-include player not found/eligible: '{wanted}'")
-            model += pulp.lpSum(x[p["id"]] for p in candidates) >= 1
-
-    # Solve
-    status = model.solve(pulp.PULP_CBC_CMD(msg=False))
-    if pulp.LpStatus.get(status) != "Optimal":
-        raise ValueError(f"Optimization failed: {pulp.LpStatus.get(status)}")
-
-    squad = [p for p in players if pulp.value(x[p["id"]]) >= 0.9]
-    if len(squad) != 15:
-        raise ValueError(f"Optimization returned {len(squad)} players, expected 15.")
-
-    total_cost = round(sum(p["cost"] for p in squad), 1)
-    total_proj = float(sum(p["projected_points"] for p in squad))
-
-    starting_11, bench = pick_starting_11_and_bench(squad)
-    captain, vice = pick_captains(starting_11)
-
-    return OptimizedSquad(
-        squad=sorted(squad, key=lambda p: (p["position"], -p["projected_points"], p["cost"])),
-        starting_11=starting_11,
-        bench=bench,
-        captain=captain,
-        vice_captain=vice,
-        total_cost=total_cost,
-        total_projected_points=total_proj,
+    groups: List[List[int]] = []
+    for wanted in must_set:
+        candidates = [p["id"] for p in players if _normalize_name(p["name"]) == wanted]
+        if not candidates:
+            raise ValueError(f"Must-include player not found/eligible: '{wanted}'")
+        groups.append(candidates)
+    return groups
+
+
+def _prepare_pool(
+    elements: Iterable[Dict[str, Any]],
+    *,
+    horizon_gameweeks: int,
+    max_from_team: int,
+    must_include: Optional[Sequence[str]],
+    avoid: Optional[Sequence[str]],
+    team_fixture_multiplier: Optional[Dict[int, float]],
+    allow_flagged_players: bool,
+    risk_profile: str,
+    differential_weight: float,
+    team_fixture_vectors: Optional[Mapping[int, Sequence[float]]],
+    projected_points: Optional[Mapping[int, float]],
+    projection_model: str,
+    prune_dominated: bool,
+    prune_spare: int = 0,
+) -> Tuple[List[Dict[str, Any]], List[List[int]], Optional[PruneReport]]:
+    """Player pool, must-include id groups and pruning report shared by the solve entry points."""
+    players = build_player_pool(
+        elements,
+        horizon_gameweeks=horizon_gameweeks,
+        avoid=avoid,
+        team_fixture_multiplier=team_fixture_multiplier,
+        allow_flagged_players=allow_flagged_players,
+        team_fixture_vectors=team_fixture_vectors,
+        projected_points=projected_points,
+        projection_model=projection_model,
+    )
+    groups = resolve_must_include(players, must_include)
+
+    report = None
+    if prune_dominated:
+        players, report = prune_dominated_players(
+            players,
+            max_from_team=max_from_team,
+            keep=[i for g in groups for i in g],
+            risk_profile=risk_profile,
+            differential_weight=differential_weight,
+            spare=prune_spare,
+        )
+    return players, groups, report
+
+
+def optimize_squad_ilp(
+    elements: Iterable[Dict[str, Any]],
+    *,
+    horizon_gameweeks: int,
+    budget: float = 100.0,
+    max_from_team: int = 3,
+    must_include: Optional[Sequence[str]] = None,
+    avoid: Optional[Sequence[str]] = None,
+    team_fixture_multiplier: Optional[Dict[int, float]] = None,
+    allow_flagged_players: bool = False,
+    risk_profile: str = "template",
+    differential_weight: float = 0.12,
+    team_fixture_vectors: Optional[Mapping[int, Sequence[float]]] = None,
+    projected_points: Optional[Mapping[int, float]] = None,
+    projection_model: str = DEFAULT_MODEL,
+    bench_weight: Optional[float] = 0.1,
+    prune_dominated: bool = True,
+    solver: str = "auto",
+    time_limit_seconds: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+) -> OptimizedSquad:
+    """
+    One-shot solve; see `SquadOptimizer` for repeated what-if queries on the same pool.
+    With `prune_dominated`, players that cannot be in any optimal squad are removed first
+    (see `prune_dominated_players`); the result's `pruning` reports how many.
+    `time_limit_seconds` / `mip_gap` return the best squad found within those limits.
+    """
+    players, groups, report = _prepare_pool(
+        elements,
+        horizon_gameweeks=horizon_gameweeks,
+        max_from_team=max_from_team,
+        must_include=must_include,
+        avoid=avoid,
+        team_fixture_multiplier=team_fixture_multiplier,
+        allow_flagged_players=allow_flagged_players,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        team_fixture_vectors=team_fixture_vectors,
+        projected_points=projected_points,
+        projection_model=projection_model,
+        prune_dominated=prune_dominated,
+    )
+    optimizer = SquadOptimizer(
+        players,
+        budget=budget,
+        max_from_team=max_from_team,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        bench_weight=bench_weight,
+        solver=solver,
+        time_limit_seconds=time_limit_seconds,
+        mip_gap=mip_gap,
+    )
+    for candidates in groups:
+        optimizer.force(candidates, any_of=True)
+
+    result = optimizer.solve()
+    return replace(result, pruning=report) if report is not None else result
+
+
+def top_k_squads(
+    players: Sequence[Dict[str, Any]],
+    *,
+    k: int,
+    min_difference: int = 1,
+    must_include_groups: Sequence[Sequence[int]] = (),
+    max_workers: Optional[int] = None,
+    **optimizer_kwargs: Any,
+) -> List[OptimizedSquad]:
+    """
+    The `k` best squads over `players`, each differing from every better one in at least
+    `min_difference` players, ranked by objective with `gap_to_best` filled in.
+
+    Lawler/Murty partitioning: once a squad s_1..s_15 is accepted, the rest of its branch
+    splits into 15 disjoint sub-branches (s_1..s_{j-1} forced, s_j excluded). Sub-branches are
+    independent models, so each batch is solved on a thread pool (CBC runs out of process).
+    A branch optimum that ends up closer than `min_difference` to a later accepted squad is
+    re-solved with Hamming cuts before it can be accepted.
+    """
+    if int(k) < 1:
+        raise ValueError("k must be >= 1.")
+    if not 1 <= int(min_difference) <= 15:
+        raise ValueError("min_difference must be between 1 and 15.")
+
+    def solve_branch(
+        forced: Tuple[int, ...], excluded: Tuple[int, ...], cuts: Sequence[Tuple[int, ...]]
+    ) -> Optional[OptimizedSquad]:
+        optimizer = SquadOptimizer(players, **optimizer_kwargs)
+        for group in must_include_groups:
+            optimizer.force(group, any_of=True)
+        optimizer.force(forced)
+        optimizer.exclude(excluded)
+        for cut in cuts:
+            optimizer.exclude_squad(cut, min_difference=min_difference)
+        try:
+            return optimizer.solve(warm_start=False)
+        except ValueError:
+            return None  # branch is infeasible
+
+    def ids_of(result: OptimizedSquad) -> Tuple[int, ...]:
+        return tuple(sorted(p["id"] for p in result.squad))
+
+    accepted: List[OptimizedSquad] = []
+    seq = itertools.count()
+    heap: List[Tuple[float, int, OptimizedSquad, Tuple[int, ...], Tuple[int, ...]]] = []
+    root = solve_branch((), (), ())
+    if root is None:
+        raise ValueError("Optimization failed: no feasible squad.")
+    heapq.heappush(heap, (-(root.objective or 0.0), next(seq), root, (), ()))
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while heap and len(accepted) < int(k):
+            _, _, result, forced, excluded = heapq.heappop(heap)
+            squad_ids = ids_of(result)
+            cuts = [ids_of(a) for a in accepted]
+            if any(15 - len(set(squad_ids) & set(c)) < int(min_difference) for c in cuts):
+                again = solve_branch(forced, excluded, cuts)
+                if again is not None:
+                    heapq.heappush(heap, (-(again.objective or 0.0), next(seq), again, forced, excluded))
+                continue
+
+            accepted.append(result)
+            if len(accepted) == int(k):
+                break
+            cuts.append(squad_ids)
+            free = [i for i in squad_ids if i not in forced]
+            branches = [(forced + tuple(free[:j]), excluded + (free[j],)) for j in range(len(free))]
+            futures = [pool.submit(solve_branch, f, e, cuts) for f, e in branches]
+            for (f, e), fut in zip(branches, futures):
+                child = fut.result()
+                if child is not None:
+                    heapq.heappush(heap, (-(child.objective or 0.0), next(seq), child, f, e))
+
+    best = accepted[0].objective or 0.0
+    return [replace(r, gap_to_best=best - (r.objective or 0.0)) for r in accepted]
+
+
+def optimize_squad_ilp_top_k(
+    elements: Iterable[Dict[str, Any]],
+    *,
+    k: int,
+    min_difference: int = 1,
+    horizon_gameweeks: int,
+    budget: float = 100.0,
+    max_from_team: int = 3,
+    must_include: Optional[Sequence[str]] = None,
+    avoid: Optional[Sequence[str]] = None,
+    team_fixture_multiplier: Optional[Dict[int, float]] = None,
+    allow_flagged_players: bool = False,
+    risk_profile: str = "template",
+    differential_weight: float = 0.12,
+    team_fixture_vectors: Optional[Mapping[int, Sequence[float]]] = None,
+    projected_points: Optional[Mapping[int, float]] = None,
+    projection_model: str = DEFAULT_MODEL,
+    bench_weight: Optional[float] = 0.1,
+    prune_dominated: bool = True,
+    max_workers: Optional[int] = None,
+    solver: str = "auto",
+    time_limit_seconds: Optional[float] = None,
+    mip_gap: Optional[float] = None,
+) -> List[OptimizedSquad]:
+    """
+    `optimize_squad_ilp` returning the `k` best mutually diverse squads (see `top_k_squads`).
+    Dominance pruning is exact for plain top-k only, so it is skipped when `min_difference` > 1.
+    `time_limit_seconds` and `mip_gap` apply to each branch solve, not to the whole search.
+    """
+    players, groups, report = _prepare_pool(
+        elements,
+        horizon_gameweeks=horizon_gameweeks,
+        max_from_team=max_from_team,
+        must_include=must_include,
+        avoid=avoid,
+        team_fixture_multiplier=team_fixture_multiplier,
+        allow_flagged_players=allow_flagged_players,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        team_fixture_vectors=team_fixture_vectors,
+        projected_points=projected_points,
+        projection_model=projection_model,
+        prune_dominated=prune_dominated and int(min_difference) == 1,
+        prune_spare=int(k) - 1,
+    )
+    results = top_k_squads(
+        players,
+        k=k,
+        min_difference=min_difference,
+        must_include_groups=groups,
+        max_workers=max_workers,
+        budget=budget,
+        max_from_team=max_from_team,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        bench_weight=bench_weight,
+        solver=solver,
+        time_limit_seconds=time_limit_seconds,
+        mip_gap=mip_gap,
     )
+    return [replace(r, pruning=report) for r in results]
 
 
 def pick_starting_11_and_bench(squad: Sequence[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
@@ -0,0 +1,278 @@
+from __future__ import annotations
+
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import pulp
+
+from fantasy_premier_league_optimization.fpl.fixtures import infer_next_event
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL
+from fantasy_premier_league_optimization.fpl.optimizer import ALLOWED_FORMATIONS, build_player_pool
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot
+
+
+SQUAD_SHAPE: Mapping[str, int] = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+MAX_FREE_TRANSFERS = 5
+
+
+@dataclass(frozen=True)
+class GameweekPlan:
+    event: int
+    transfers_in: List[Dict[str, Any]]
+    transfers_out: List[Dict[str, Any]]
+    free_transfers: int  # available before this gameweek's transfers
+    hits: int  # paid transfers (each costs `hit_cost`)
+    squad: List[Dict[str, Any]]
+    starting_11: List[Dict[str, Any]]
+    bench: List[Dict[str, Any]]
+    captain: Dict[str, Any]
+    bank: float
+    projected_points: float  # XI + captain bonus, before hits
+
+
+@dataclass(frozen=True)
+class TransferPlan:
+    gameweeks: List[GameweekPlan]
+    total_projected_points: float  # net of hits
+    total_hits: int
+    candidate_pool_size: int
+
+
+def prune_candidates(
+    players: Sequence[Dict[str, Any]],
+    points: Mapping[int, Sequence[float]],
+    *,
+    keep: Sequence[int],
+    per_position: int,
+) -> List[Dict[str, Any]]:
+    """
+    Keep the current squad plus, per position, the best `per_position` players by horizon
+    points and the best `per_position` by points per £m. Nobody outside that set can be in
+    an optimal plan unless it is pathologically budget-bound.
+    """
+    keep_ids = set(int(i) for i in keep)
+    by_pos: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for p in players:
+        by_pos[p["position"]].append(p)
+
+    chosen = set(keep_ids)
+    for ps in by_pos.values():
+        total = {p["id"]: float(sum(points.get(p["id"], ()))) for p in ps}
+        by_points = sorted(ps, key=lambda p: total[p["id"]], reverse=True)
+        by_value = sorted(ps, key=lambda p: total[p["id"]] / max(p["cost"], 3.5), reverse=True)
+        chosen.update(p["id"] for p in by_points[:per_position])
+        chosen.update(p["id"] for p in by_value[:per_position])
+    return [p for p in players if p["id"] in chosen]
+
+
+def plan_transfers(
+    players: Sequence[Dict[str, Any]],
+    points: Mapping[int, Sequence[float]],
+    *,
+    events: Sequence[int],
+    current_squad: Sequence[int],
+    bank: float,
+    free_transfers: int = 1,
+    max_from_team: int = 3,
+    bench_weight: float = 0.1,
+    hit_cost: float = 4.0,
+    transfer_penalty: float = 0.5,
+    candidates_per_position: Optional[int] = 20,
+    max_transfers_per_gameweek: Optional[int] = None,
+    selling_prices: Optional[Mapping[int, float]] = None,
+    time_limit_seconds: Optional[int] = None,
+) -> TransferPlan:
+    """
+    Multi-gameweek ILP: starting from `current_squad` and `bank` (£m), choose transfers,
+    starting XI and captain for every gameweek in `events`, maximizing projected points
+    (`points[id][t]` per gameweek, bench counted at `bench_weight`) minus `hit_cost` per
+    transfer beyond the rolling free-transfer allowance (+1 per gameweek, capped at 5).
+    Every transfer also costs `transfer_penalty` in the objective (not in the reported
+    points) so the plan does not churn players for marginal projected gains.
+
+    Players are bought at `cost` and sold at `selling_prices` (default: `cost`).
+    """
+    events = [int(e) for e in events]
+    if not events:
+        raise ValueError("events must be non-empty.")
+    current = [int(i) for i in current_squad]
+    pool_by_id = {p["id"]: p for p in players}
+    missing = [i for i in current if i not in pool_by_id]
+    if missing:
+        raise ValueError(f"Current squad players not in the player pool: {missing}")
+    if len(set(current)) != 15:
+        raise ValueError("current_squad must list 15 distinct players.")
+
+    pool = list(players)
+    if candidates_per_position:
+        pool = prune_candidates(pool, points, keep=current, per_position=int(candidates_per_position))
+    ids = [p["id"] for p in pool]
+    by_id = {p["id"]: p for p in pool}
+    sell = {i: float((selling_prices or {}).get(i, by_id[i]["cost"])) for i in ids}
+    T = range(len(events))
+
+    def pts(i: int, t: int) -> float:
+        series = points.get(i, ())
+        return float(series[t]) if t < len(series) else 0.0
+
+    model = pulp.LpProblem("fpl_transfer_plan", pulp.LpMaximize)
+    squad = {(i, t): pulp.LpVariable(f"squad_{i}_{t}", cat="Binary") for i in ids for t in T}
+    lineup = {(i, t): pulp.LpVariable(f"xi_{i}_{t}", cat="Binary") for i in ids for t in T}
+    captain = {(i, t): pulp.LpVariable(f"cap_{i}_{t}", cat="Binary") for i in ids for t in T}
+    buy = {(i, t): pulp.LpVariable(f"in_{i}_{t}", cat="Binary") for i in ids for t in T}
+    sold = {(i, t): pulp.LpVariable(f"out_{i}_{t}", cat="Binary") for i in ids for t in T}
+    money = {t: pulp.LpVariable(f"bank_{t}", lowBound=0) for t in T}
+    ft = {t: pulp.LpVariable(f"ft_{t}", 1, MAX_FREE_TRANSFERS, cat="Integer") for t in T}
+    paid = {t: pulp.LpVariable(f"hits_{t}", 0, 15, cat="Integer") for t in T}
+    carry = {t: pulp.LpVariable(f"carry_{t}", 0, MAX_FREE_TRANSFERS, cat="Integer") for t in T}
+    took_hit = {t: pulp.LpVariable(f"took_hit_{t}", cat="Binary") for t in T}
+    # one binary per allowed formation and gameweek, as in `SquadOptimizer`
+    formation = {
+        (k, t): pulp.LpVariable(f"formation_{d}{m}{f}_{t}", cat="Binary")
+        for k, (d, m, f) in enumerate(ALLOWED_FORMATIONS)
+        for t in T
+    }
+    slots = {"GK": lambda d, m, f: 1, "DEF": lambda d, m, f: d, "MID": lambda d, m, f: m, "FWD": lambda d, m, f: f}
+
+    model += (
+        pulp.lpSum(
+            pts(i, t) * (lineup[i, t] + captain[i, t] + float(bench_weight) * (squad[i, t] - lineup[i, t]))
+            for i in ids
+            for t in T
+        )
+        - float(hit_cost) * pulp.lpSum(paid[t] for t in T)
+        - float(transfer_penalty) * pulp.lpSum(buy.values())
+        # tie-breaker so unused free transfers are reported as rolled over
+        + 1e-3 * pulp.lpSum(ft.values())
+    )
+
+    start = set(current)
+    model += ft[0] == max(1, min(MAX_FREE_TRANSFERS, int(free_transfers)))
+    for t in T:
+        n_transfers = pulp.lpSum(buy[i, t] for i in ids)
+        for i in ids:
+            before = (1 if i in start else 0) if t == 0 else squad[i, t - 1]
+            model += squad[i, t] == before + buy[i, t] - sold[i, t]
+            model += lineup[i, t] <= squad[i, t]
+            model += captain[i, t] <= lineup[i, t]
+            if t == 0:
+                # can't sell what we don't own / buy what we already own
+                if i in start:
+                    model += buy[i, t] == 0
+                else:
+                    model += sold[i, t] == 0
+
+        previous_bank = float(bank) if t == 0 else money[t - 1]
+        model += money[t] == previous_bank + pulp.lpSum(sell[i] * sold[i, t] - by_id[i]["cost"] * buy[i, t] for i in ids)
+
+        for pos, count in SQUAD_SHAPE.items():
+            members = [i for i in ids if by_id[i]["position"] == pos]
+            model += pulp.lpSum(squad[i, t] for i in members) == count
+            model += pulp.lpSum(lineup[i, t] for i in members) == pulp.lpSum(
+                slots[pos](*shape) * formation[k, t] for k, shape in enumerate(ALLOWED_FORMATIONS)
+            )
+        model += pulp.lpSum(formation[k, t] for k in range(len(ALLOWED_FORMATIONS))) == 1
+        model += pulp.lpSum(captain[i, t] for i in ids) == 1
+
+        teams: Dict[int, List[int]] = defaultdict(list)
+        for i in ids:
+            teams[by_id[i]["team_id"]].append(i)
+        for members in teams.values():
+            model += pulp.lpSum(squad[i, t] for i in members) <= int(max_from_team)
+
+        # Free transfers: hits cover transfers beyond ft; unused ft roll over (+1, capped at 5).
+        # A gameweek that takes hits has used every free transfer, so nothing carries.
+        model += paid[t] >= n_transfers - ft[t]
+        model += paid[t] <= 15 * took_hit[t]
+        model += carry[t] <= MAX_FREE_TRANSFERS * (1 - took_hit[t])
+        model += carry[t] == ft[t] - n_transfers + paid[t]
+        if t + 1 < len(events):
+            model += ft[t + 1] <= carry[t] + 1
+        if max_transfers_per_gameweek is not None:
+            model += n_transfers <= int(max_transfers_per_gameweek)
+
+    solver = pulp.PULP_CBC_CMD(msg=False, timeLimit=time_limit_seconds)
+    status = model.solve(solver)
+    if pulp.LpStatus.get(status) != "Optimal":
+        raise ValueError(f"Transfer planning failed: {pulp.LpStatus.get(status)}")
+
+    def on(var: pulp.LpVariable) -> bool:
+        return (pulp.value(var) or 0.0) >= 0.5
+
+    gameweeks: List[GameweekPlan] = []
+    total = 0.0
+    total_hits = 0
+    for t, event in enumerate(events):
+        with_points = {i: {**by_id[i], "projected_points": pts(i, t)} for i in ids}
+        members = [with_points[i] for i in ids if on(squad[i, t])]
+        xi = [with_points[i] for i in ids if on(lineup[i, t])]
+        cap = next(with_points[i] for i in ids if on(captain[i, t]))
+        bench = sorted(
+            (p for p in members if not on(lineup[p["id"], t])),
+            key=lambda p: (p["position"] != "GK", -p["projected_points"]),
+        )
+        hits = int(round(pulp.value(paid[t]) or 0.0))
+        gw_points = float(sum(p["projected_points"] for p in xi) + cap["projected_points"])
+        total += gw_points - float(hit_cost) * hits
+        total_hits += hits
+        gameweeks.append(
+            GameweekPlan(
+                event=event,
+                transfers_in=[with_points[i] for i in ids if on(buy[i, t])],
+                transfers_out=[with_points[i] for i in ids if on(sold[i, t])],
+                free_transfers=int(round(pulp.value(ft[t]) or 0.0)),
+                hits=hits,
+                squad=sorted(members, key=lambda p: (p["position"], -p["projected_points"])),
+                starting_11=sorted(xi, key=lambda p: (p["position"], -p["projected_points"])),
+                bench=bench,
+                captain=cap,
+                bank=round(float(pulp.value(money[t]) or 0.0), 1),
+                projected_points=gw_points,
+            )
+        )
+
+    return TransferPlan(
+        gameweeks=gameweeks,
+        total_projected_points=total,
+        total_hits=total_hits,
+        candidate_pool_size=len(ids),
+    )
+
+
+def plan_transfers_for_snapshot(
+    current_squad: Sequence[int],
+    *,
+    bank: float,
+    free_transfers: int = 1,
+    horizon_gameweeks: int = 5,
+    projection_model: str = DEFAULT_MODEL,
+    allow_flagged_players: bool = False,
+    force_refresh: bool = False,
+    **kwargs: Any,
+) -> TransferPlan:
+    """`plan_transfers` from the snapshot's next unplayed gameweek over its cached projection matrix."""
+    snap = load_bootstrap_snapshot(force_refresh=force_refresh)
+    matrix = load_projection_matrix(
+        model=projection_model, from_event=infer_next_event(snap.events), force_refresh=force_refresh, snap=snap
+    )
+    horizon = max(1, min(int(horizon_gameweeks), len(matrix.events)))
+    points = {int(i): row[:horizon].tolist() for i, row in zip(matrix.element_ids, matrix.points)}
+
+    # Flagged players stay eligible only if already owned (they can be benched or sold).
+    owned = {int(i) for i in current_squad}
+    pool = [
+        p
+        for p in build_player_pool(snap.elements, horizon_gameweeks=horizon, allow_flagged_players=True)
+        if allow_flagged_players or p["status"] == "available" or p["id"] in owned
+    ]
+    return plan_transfers(
+        pool,
+        points,
+        events=[int(e) for e in matrix.events[:horizon]],
+        current_squad=current_squad,
+        bank=bank,
+        free_transfers=free_transfers,
+        **kwargs,
+    )
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Mapping, Optional
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.api import CacheConfig, _default_cache_dir
+from fantasy_premier_league_optimization.fpl.fixtures import FixtureIndex, infer_next_event
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL, get_model
+from fantasy_premier_league_optimization.fpl.scoring import _team_lookup, columns_from_elements
+from fantasy_premier_league_optimization.fpl.snapshot import (
+    BootstrapSnapshot,
+    load_bootstrap_snapshot,
+    load_fixture_index,
+)
+
+
+# Bump whenever the projection formula changes so stale on-disk matrices are ignored.
+PROJECTION_MODEL_VERSION = 1
+
+PROJECTIONS_DIRNAME = "projections"
+
+
+@dataclass(frozen=True)
+class ProjectionRates:
+    """One model's per-player components for a snapshot: P = base_one_gw x availability x fixtures."""
+
+    key: str
+    model: str
+    element_ids: np.ndarray
+    team_ids: np.ndarray
+    base_one_gw: np.ndarray
+    availability: np.ndarray
+
+    def flat(self, horizon_gameweeks: int, team_multipliers: Optional[Mapping[int, float]] = None) -> Dict[int, float]:
+        """Horizon x averaged team multiplier projections (same shape as `project_points_batch`)."""
+        mult = _team_lookup(self.team_ids, team_multipliers or {}, 1.0)
+        points = self.base_one_gw * horizon_gameweeks * mult * self.availability
+        return {int(i): float(p) for i, p in zip(self.element_ids, points)}
+
+
+def compute_projection_rates(
+    elements: Iterable[Mapping[str, Any]],
+    *,
+    model: str = DEFAULT_MODEL,
+    key: str = "",
+) -> ProjectionRates:
+    spec = get_model(model)
+    columns = columns_from_elements(elements, tuple(dict.fromkeys(("id", "team", *spec.fields))))
+    base_one_gw, availability = spec.components(columns)
+    return ProjectionRates(
+        key=key,
+        model=spec.name,
+        element_ids=columns["id"].astype(np.int64),
+        team_ids=columns["team"].astype(np.int64),
+        base_one_gw=base_one_gw,
+        availability=availability,
+    )
+
+
+@dataclass(frozen=True)
+class ProjectionMatrix:
+    """
+    P[player, gameweek]: projected points per remaining gameweek of the season
+    (0 in a blank, both fixtures in a double). Rows follow `element_ids`, columns `events`.
+    """
+
+    key: str
+    element_ids: np.ndarray
+    events: np.ndarray
+    points: np.ndarray
+
+    def totals(self, horizon_gameweeks: int) -> np.ndarray:
+        """Per-player projection over the first `horizon_gameweeks` columns."""
+        return self.points[:, : max(0, int(horizon_gameweeks))].sum(axis=1)
+
+    def by_element(self, horizon_gameweeks: int) -> Dict[int, float]:
+        return {int(i): float(p) for i, p in zip(self.element_ids, self.totals(horizon_gameweeks))}
+
+    def rows(self, element_ids: Iterable[int]) -> np.ndarray:
+        """Sub-matrix for `element_ids` (unknown ids get a zero row)."""
+        position = {int(i): r for r, i in enumerate(self.element_ids)}
+        ids = [int(i) for i in element_ids]
+        out = np.zeros((len(ids), len(self.events)))
+        for r, element_id in enumerate(ids):
+            if element_id in position:
+                out[r] = self.points[position[element_id]]
+        return out
+
+
+def build_projection_matrix(
+    elements: Iterable[Mapping[str, Any]],
+    index: FixtureIndex,
+    *,
+    from_event: int,
+    to_event: Optional[int] = None,
+    key: str = "",
+    model: str = DEFAULT_MODEL,
+    rates: Optional[ProjectionRates] = None,
+) -> ProjectionMatrix:
+    """Columns run from `from_event` to `to_event` inclusive (default: last fixture's gameweek)."""
+    rates = rates or compute_projection_rates(elements, model=model)
+    last = index.max_event if to_event is None else int(to_event)
+    vectors = index.fixture_vectors(from_event=from_event, horizon_events=max(0, last - from_event + 1))
+
+    team_rows = np.array([index.team_row.get(int(t), -1) for t in rates.team_ids], dtype=np.int64)
+    per_event = np.zeros((len(team_rows), len(vectors.events)))
+    known = team_rows >= 0
+    per_event[known] = vectors.multiplier[team_rows[known]]
+    return ProjectionMatrix(
+        key=key,
+        element_ids=rates.element_ids,
+        events=vectors.events,
+        points=(rates.base_one_gw * rates.availability)[:, None] * per_event,
+    )
+
+
+def _write_matrix(path: Path, matrix: ProjectionMatrix) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        np.savez(
+            f,
+            element_ids=matrix.element_ids,
+            events=matrix.events,
+            points=matrix.points,
+            __meta__=np.asarray(json.dumps({"key": matrix.key, "version": PROJECTION_MODEL_VERSION})),
+        )
+    os.replace(tmp, path)
+
+
+def _read_matrix(path: Path, key: str) -> Optional[ProjectionMatrix]:
+    try:
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(str(npz["__meta__"]))
+            if meta.get("key") != key or meta.get("version") != PROJECTION_MODEL_VERSION:
+                return None
+            return ProjectionMatrix(
+                key=key,
+                element_ids=npz["element_ids"],
+                events=npz["events"],
+                points=npz["points"],
+            )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+_LOCK = threading.Lock()
+_MEMO: Dict[str, ProjectionMatrix] = {}
+_RATES: Dict[str, ProjectionRates] = {}
+
+
+def _model_tag(model: str) -> str:
+    spec = get_model(model)
+    return f"{spec.name}@{spec.version}"
+
+
+def projection_key(snapshot_key: str, fixtures_key: str, from_event: int, model: str = DEFAULT_MODEL) -> str:
+    raw = f"{snapshot_key}:{fixtures_key}:{int(from_event)}:{_model_tag(model)}:v{PROJECTION_MODEL_VERSION}"
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def load_projection_rates(
+    *,
+    model: str = DEFAULT_MODEL,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+    snap: Optional[BootstrapSnapshot] = None,
+) -> ProjectionRates:
+    """`compute_projection_rates` for the current (or given) snapshot, memoized per (snapshot, model)."""
+    if snap is None:
+        snap = load_bootstrap_snapshot(force_refresh=force_refresh, cache=cache)
+    key = f"{snap.key}:{_model_tag(model)}"
+    with _LOCK:
+        rates = _RATES.get(key)
+        if rates is None:
+            rates = compute_projection_rates(snap.elements, model=model, key=key)
+            _RATES[key] = rates
+        return rates
+
+
+def load_projection_matrix(
+    *,
+    model: str = DEFAULT_MODEL,
+    from_event: Optional[int] = None,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+    snap: Optional[BootstrapSnapshot] = None,
+    index: Optional[FixtureIndex] = None,
+) -> ProjectionMatrix:
+    """
+    Projection matrix from `from_event` (default: the next gameweek to be played) to the end of the season,
+    memoized in-process and on disk under `<cache_dir>/projections/`, keyed by the bootstrap
+    and fixtures content hashes, the projection model and `PROJECTION_MODEL_VERSION`. Any
+    horizon is a column slice. Callers holding the snapshot (and its `FixtureIndex`) pass
+    them in, so `bootstrap-static` is resolved once per call.
+    """
+    if snap is None:
+        snap = load_bootstrap_snapshot(force_refresh=force_refresh, cache=cache)
+    if index is None:
+        index = load_fixture_index(force_refresh=force_refresh, cache=cache, snap=snap)
+    rates = load_projection_rates(model=model, cache=cache, snap=snap)
+    if from_event is None:
+        from_event = infer_next_event(snap.events) or 1
+    key = projection_key(snap.key, index.key, from_event, model)
+
+    with _LOCK:
+        matrix = _MEMO.get(key)
+        if matrix is not None:
+            return matrix
+
+        cache_dir = (cache or CacheConfig(cache_dir=_default_cache_dir())).cache_dir
+        path = cache_dir / PROJECTIONS_DIRNAME / f"{key}.npz"
+        matrix = _read_matrix(path, key) if path.exists() else None
+        if matrix is None:
+            last_event = max([int(e.get("id") or 0) for e in snap.events] + [index.max_event])
+            matrix = build_projection_matrix(
+                snap.elements, index, from_event=int(from_event), to_event=last_event, key=key, rates=rates
+            )
+            try:
+                _write_matrix(path, matrix)
+            except OSError:
+                pass  # read-only cache dir (e.g. replay bundles): keep the in-process copy
+        _MEMO[key] = matrix
+        return matrix
+
+
+def clear_projection_memo() -> None:
+    with _LOCK:
+        _MEMO.clear()
+        _RATES.clear()
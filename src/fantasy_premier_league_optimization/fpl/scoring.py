@@ -1,6 +1,14 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL, get_model
+
+
+# Element fields read by the projection engine.
+PROJECTION_FIELDS: Sequence[str] = ("team", "ep_next", "points_per_game", "form", "minutes")
 
 
 def _to_float(x: Any, default: float = 0.0) -> float:
@@ -10,11 +18,76 @@ def _to_float(x: Any, default: float = 0.0) -> float:
         return default
 
 
+def _float_column(values: Sequence[Any]) -> np.ndarray:
+    raw = np.asarray(values, dtype=object)
+    try:
+        # FPL ships most stats as numeric strings; a single cast handles the common case
+        out = raw.astype(np.float64)
+    except (TypeError, ValueError):
+        out = np.fromiter((_to_float(v) for v in raw), dtype=np.float64, count=len(raw))
+    return np.nan_to_num(out, nan=0.0)
+
+
+def columns_from_elements(
+    elements: Iterable[Mapping[str, Any]],
+    fields: Sequence[str] = PROJECTION_FIELDS,
+) -> Dict[str, np.ndarray]:
+    """Column-major float arrays of `fields` for element dicts (missing / bad values -> 0)."""
+    rows = list(elements)
+    return {f: _float_column([e.get(f) for e in rows]) for f in fields}
+
+
+def _team_lookup(team_ids: np.ndarray, values: Mapping[int, Any], default: Any, width: int = 0) -> np.ndarray:
+    # dense table indexed by team id, so per-player lookups are one fancy-index
+    size = int(max([0, *values.keys(), *(team_ids.tolist() or [0])])) + 1
+    table = np.full((size, width) if width else size, default, dtype=np.float64)
+    for team_id, v in values.items():
+        table[int(team_id)] = v
+    return table[team_ids]
+
+
+def projection_components(
+    columns: Mapping[str, Any],
+    model: str = DEFAULT_MODEL,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-player `(one-gameweek base rate, availability weight)` arrays of a registered model."""
+    return get_model(model).components(columns)
+
+
+def project_points_batch(
+    columns: Mapping[str, Any],
+    *,
+    horizon_gameweeks: int,
+    team_multipliers: Optional[Mapping[int, float]] = None,
+    team_fixture_vectors: Optional[Mapping[int, Sequence[float]]] = None,
+    model: str = DEFAULT_MODEL,
+) -> np.ndarray:
+    """
+    `player_projection_points` for a whole player pool at once.
+
+    `columns` holds the fields of `model` (see `fpl.models`; `PROJECTION_FIELDS` for the
+    default heuristic) as arrays (`columns_from_elements`, or the cached `ElementColumns`).
+    Per-team vectors override `horizon_gameweeks x multiplier` for the teams they cover.
+    Returns one projection per row.
+    """
+    base_one_gw, availability = projection_components(columns, model)
+    team_ids = np.nan_to_num(np.asarray(columns["team"], dtype=np.float64)).astype(np.int64)
+    mult = _team_lookup(team_ids, team_multipliers or {}, 1.0)
+    points = base_one_gw * horizon_gameweeks * mult * availability
+
+    if team_fixture_vectors:
+        totals = {t: float(sum(v)) for t, v in team_fixture_vectors.items()}
+        covered = _team_lookup(team_ids, {t: 1.0 for t in totals}, 0.0) > 0
+        points = np.where(covered, base_one_gw * _team_lookup(team_ids, totals, 0.0) * availability, points)
+    return points
+
+
 def player_projection_points(
     element: Dict[str, Any],
     *,
     horizon_gameweeks: int,
     fixture_multiplier: float = 1.0,
+    fixture_vector: Optional[Sequence[float]] = None,
 ) -> float:
     """
     Simple proxy for projected points:
@@ -22,17 +95,18 @@ def player_projection_points(
       - Blend with `form` and `points_per_game`
       - Apply a team fixture multiplier (easier fixtures => slightly higher)
       - Scale by horizon_gameweeks (roughly)
-    """
-    ep_next = _to_float(element.get("ep_next"), 0.0)
-    ppg = _to_float(element.get("points_per_game"), 0.0)
-    form = _to_float(element.get("form"), 0.0)
-
-    # Reliability proxy: minutes share (downweight low-minute players)
-    minutes = _to_float(element.get("minutes"), 0.0)
-    availability = 0.65 + min(0.35, minutes / 1800.0)  # after ~20 matches, near full weight
 
-    base_one_gw = max(ep_next, 0.55 * ppg + 0.45 * form)
-    return float(base_one_gw * horizon_gameweeks * fixture_multiplier * availability)
+    `fixture_vector` (per-gameweek multipliers from `FixtureIndex.fixture_vectors`: 0 for a
+    blank, ~2 for a double) replaces `horizon_gameweeks * fixture_multiplier` when given.
+    """
+    team_id = int(_to_float(element.get("team"), 0.0))
+    points = project_points_batch(
+        columns_from_elements([element]),
+        horizon_gameweeks=horizon_gameweeks,
+        team_multipliers={team_id: fixture_multiplier},
+        team_fixture_vectors={team_id: fixture_vector} if fixture_vector is not None else None,
+    )
+    return float(points[0])
 
 
 def player_cost_millions(element: Dict[str, Any]) -> float:
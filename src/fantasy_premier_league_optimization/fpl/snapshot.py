@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+from fantasy_premier_league_optimization.fpl.api import CacheConfig, ensure_cached
+from fantasy_premier_league_optimization.fpl.cache_index import read_payload_bytes
+from fantasy_premier_league_optimization.fpl.fixtures import FixtureIndex
+
+
+def _freeze(value: Any) -> Any:
+    """Recursively turn dicts/lists into read-only mappings/tuples."""
+    if isinstance(value, dict):
+        return MappingProxyType({k: _freeze(v) for k, v in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+
+@dataclass(frozen=True)
+class BootstrapSnapshot:
+    """
+    Parse-once, read-only view of `bootstrap-static`, shared by every tool in the process.
+    """
+
+    key: str  # sha1 of the cached payload
+    sections: Mapping[str, Any]
+    teams: Mapping[int, Mapping[str, Any]]
+    element_types: Mapping[int, Mapping[str, Any]]
+    players: Mapping[int, Mapping[str, Any]]  # element id -> element
+
+    @classmethod
+    def from_payload(cls, payload: Dict[str, Any], *, key: str) -> "BootstrapSnapshot":
+        sections = _freeze(payload)
+        return cls(
+            key=key,
+            sections=sections,
+            teams=MappingProxyType({t["id"]: t for t in sections.get("teams", ())}),
+            element_types=MappingProxyType({t["id"]: t for t in sections.get("element_types", ())}),
+            players=MappingProxyType({e["id"]: e for e in sections.get("elements", ())}),
+        )
+
+    @property
+    def elements(self) -> Tuple[Mapping[str, Any], ...]:
+        return self.sections.get("elements", ())
+
+    @property
+    def events(self) -> Tuple[Mapping[str, Any], ...]:
+        return self.sections.get("events", ())
+
+    def get(self, section: str, default: Any = None) -> Any:
+        # Same access pattern as the raw bootstrap dict (`boot.get("elements", [])`).
+        return self.sections.get(section, default)
+
+
+@dataclass
+class _Entry:
+    stat_key: Tuple[int, int]
+    snapshot: BootstrapSnapshot
+
+
+_LOCK = threading.Lock()
+_ENTRIES: Dict[str, _Entry] = {}
+_STATS: Dict[str, int] = {"hits": 0, "misses": 0}
+
+
+def _stat_key(path: Path) -> Tuple[int, int]:
+    st = path.stat()
+    return st.st_mtime_ns, st.st_size
+
+
+def load_bootstrap_snapshot(
+    *,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+) -> BootstrapSnapshot:
+    """
+    Return the shared snapshot for the current `bootstrap-static` cache file.
+
+    The file is only re-read when its mtime/size changes, and only re-parsed when its
+    content hash changes (a 304 revalidation touches the mtime but keeps the snapshot).
+    """
+    path = ensure_cached("bootstrap-static/", cache=cache, force_refresh=force_refresh)
+    stat_key = _stat_key(path)
+    with _LOCK:
+        entry = _ENTRIES.get(str(path))
+        if entry is not None and entry.stat_key == stat_key:
+            _STATS["hits"] += 1
+            return entry.snapshot
+
+        raw = read_payload_bytes(path)
+        digest = hashlib.sha1(raw).hexdigest()
+        if entry is not None and entry.snapshot.key == digest:
+            entry.stat_key = stat_key
+            _STATS["hits"] += 1
+            return entry.snapshot
+
+        snapshot = BootstrapSnapshot.from_payload(json.loads(raw), key=digest)
+        _ENTRIES[str(path)] = _Entry(stat_key=stat_key, snapshot=snapshot)
+        _STATS["misses"] += 1
+        return snapshot
+
+
+@dataclass
+class _FixtureEntry:
+    stat_key: Tuple[int, int]
+    key: Tuple[str, str]  # (fixtures sha1, bootstrap snapshot key)
+    index: FixtureIndex
+
+
+_FIXTURE_ENTRIES: Dict[str, _FixtureEntry] = {}
+
+
+def load_fixture_index(
+    *,
+    force_refresh: bool = False,
+    cache: Optional[CacheConfig] = None,
+    snap: Optional[BootstrapSnapshot] = None,
+) -> FixtureIndex:
+    """
+    Shared `FixtureIndex` (team x gameweek fixture matrix) for the current `fixtures` and
+    `bootstrap-static` cache files; rebuilt only when either payload's content changes.
+    Pass an already resolved `snap` to skip resolving `bootstrap-static` again.
+    """
+    if snap is None:
+        snap = load_bootstrap_snapshot(force_refresh=force_refresh, cache=cache)
+    path = ensure_cached("fixtures/", cache=cache, force_refresh=force_refresh)
+    stat_key = _stat_key(path)
+    with _LOCK:
+        entry = _FIXTURE_ENTRIES.get(str(path))
+        if entry is not None and entry.stat_key == stat_key and entry.key[1] == snap.key:
+            _STATS["hits"] += 1
+            return entry.index
+
+        raw = read_payload_bytes(path)
+        key = (hashlib.sha1(raw).hexdigest(), snap.key)
+        if entry is not None and entry.key == key:
+            entry.stat_key = stat_key
+            _STATS["hits"] += 1
+            return entry.index
+
+        index = FixtureIndex(
+            json.loads(raw),
+            team_ids=snap.teams.keys(),
+            key=hashlib.sha1(":".join(key).encode("utf-8")).hexdigest(),
+        )
+        _FIXTURE_ENTRIES[str(path)] = _FixtureEntry(stat_key=stat_key, key=key, index=index)
+        _STATS["misses"] += 1
+        return index
+
+
+def snapshot_stats() -> Dict[str, int]:
+    with _LOCK:
+        return dict(_STATS, entries=len(_ENTRIES) + len(_FIXTURE_ENTRIES))
+
+
+def clear_snapshot_cache() -> None:
+    with _LOCK:
+        _ENTRIES.clear()
+        _FIXTURE_ENTRIES.clear()
+        _STATS.update(hits=0, misses=0)
@@ -0,0 +1,344 @@
+from __future__ import annotations
+
+import math
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    squad: Tuple[int, ...]
+    starters: Tuple[int, ...]  # empty without a lineup objective
+    captain: Optional[int]
+    objective: float
+    nodes: int
+    bound: float  # proven upper bound on the objective
+    timed_out: bool = False  # stopped at the deadline; `squad` is the incumbent
+
+
+class NodeLimitReached(Exception):
+    pass
+
+
+class _Deadline(Exception):
+    pass
+
+
+_CHUNK = 8  # bounds evaluated per numpy call while scanning a position's candidates
+
+
+def _maxplus(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """out[c] = max over c1 <= c of a[c1] + b[c - c1] (max-plus convolution over the budget)."""
+    n = a.size
+    padded = np.concatenate([np.full(n - 1, -np.inf), b])
+    return (sliding_window_view(padded, n)[:, ::-1] + a[None, :]).max(axis=1)
+
+
+class _Position:
+    """One position's candidates in search order (best first) and its suffix DP tables."""
+
+    def __init__(self, members: List[Dict[str, Any]], quota: int, capacity: int):
+        self.members = members
+        self.quota = quota
+        self.capacity = capacity
+        self.weight = np.array([m["weight"] for m in members], dtype=float)
+        self.penalty = np.array([m["penalty"] for m in members], dtype=float)
+        self.cost = np.array([m["tenths"] for m in members], dtype=np.int64)
+        # forced members at or after each index
+        self.forced_after = np.concatenate([np.cumsum([m["forced"] for m in members][::-1])[::-1], [0]])
+        self._tables: Dict[int, np.ndarray] = {}
+
+    def table(self, starters: int, bench_weight: float) -> np.ndarray:
+        """
+        S[j, need, c]: best value of `need` more picks from members[j:] costing <= c shifted
+        tenths. Picks ranked below `starters` score in full, the rest at `bench_weight`,
+        and every pick pays its club's cap multiplier (`penalty`).
+        """
+        if starters in self._tables:
+            return self._tables[starters]
+        n, q, C = len(self.members), self.quota, self.capacity
+        S = np.full((n + 1, q + 1, C + 1), -np.inf)
+        S[n, 0] = 0.0
+        ranks = q - np.arange(1, q + 1)  # rank of the next pick when `need` = 1..q
+        mult = np.where(ranks < starters, 1.0, bench_weight)
+        for j in range(n - 1, -1, -1):
+            S[j] = S[j + 1]
+            cost = int(self.cost[j])
+            if self.members[j]["forced"]:
+                S[j, :] = -np.inf  # cannot be skipped
+            if cost > C:
+                continue
+            take = (mult * self.weight[j] - self.penalty[j])[:, None] + S[j + 1, :-1, : C + 1 - cost]
+            np.maximum(S[j, 1:, cost:], take, out=S[j, 1:, cost:])
+        self._tables[starters] = S
+        return S
+
+
+def club_cap_multipliers(
+    weight: np.ndarray,
+    cost: np.ndarray,
+    team: np.ndarray,
+    groups: Sequence[Tuple[np.ndarray, int]],
+    *,
+    budget: float,
+    max_from_team: int,
+    iterations: int = 60,
+) -> np.ndarray:
+    """
+    Lagrange multipliers for the club caps (one per team code), by subgradient descent on
+    the relaxation that prices both the budget and the caps and keeps only the position
+    quotas (each position then takes its top-q adjusted weights). Any non-negative values
+    keep the search bounds valid; good ones make them nearly as tight as the LP.
+    """
+    n_teams = int(team.max()) + 1 if team.size else 0
+    lam, mu = 0.0, np.zeros(n_teams)
+    best_value, best_mu = np.inf, mu
+    for k in range(iterations):
+        adjusted = weight - lam * cost - mu[team]
+        picked = np.zeros(weight.size, dtype=bool)
+        value = lam * budget + max_from_team * mu.sum()
+        for idx, quota in groups:
+            top = idx[np.argpartition(-adjusted[idx], quota - 1)[:quota]]
+            picked[top] = True
+            value += adjusted[top].sum()
+        if value < best_value:
+            best_value, best_mu = value, mu.copy()
+        step = 1.0 / (k + 1)
+        lam = max(0.0, lam - step * 0.05 * (budget - cost[picked].sum()))
+        mu = np.maximum(0.0, mu - step * (max_from_team - np.bincount(team[picked], minlength=n_teams)))
+    return best_mu
+
+
+def search_squad(
+    players: Sequence[Dict[str, Any]],
+    weights: Mapping[int, float],
+    *,
+    budget: float,
+    max_from_team: int,
+    quotas: Mapping[str, int],
+    formations: Optional[Sequence[Tuple[int, int, int]]] = None,
+    bench_weight: float = 0.1,
+    forced: Iterable[int] = (),
+    node_limit: Optional[int] = 200_000,
+    deadline: Optional[float] = None,
+    gap: float = 0.0,
+) -> Optional[SearchResult]:
+    """
+    Exact in-process branch and bound for the squad model: position quotas, budget, club
+    caps and forced players, maximizing `weights` (with `formations`, the joint objective:
+    XI in full, captain twice, bench at `bench_weight`). Returns None when infeasible and
+    raises `NodeLimitReached` after `node_limit` nodes.
+
+    `deadline` (a `time.perf_counter()` value) stops the search early and returns the
+    incumbent with `timed_out` set (or raises `NodeLimitReached` if there is none yet);
+    `gap` prunes nodes that cannot beat the incumbent by more than that relative margin.
+    `bound` is the proven upper bound either way.
+
+    Costs are integer tenths. Each position is searched best-first, so a pick's rank fixes
+    whether it starts and the captain is the best starter. Bounds combine per-position
+    suffix knapsack tables by max-plus convolution over the budget; club caps enter them
+    through Lagrange multipliers (`club_cap_multipliers`) and are enforced by the search.
+    """
+    forced_ids = {int(i) for i in forced}
+    order = list(quotas)
+    pool = [p for p in players if p["position"] in quotas]
+    position = np.array([order.index(p["position"]) for p in pool], dtype=np.int64)
+    if any((position == k).sum() < quotas[pos] for k, pos in enumerate(order)):
+        return None
+    weight = np.array([float(weights[p["id"]]) for p in pool])
+    _, team = np.unique([p["team_id"] for p in pool], return_inverse=True)
+    mu = club_cap_multipliers(
+        weight,
+        np.array([float(p["cost"]) for p in pool]),
+        team,
+        [(np.flatnonzero(position == k), quotas[pos]) for k, pos in enumerate(order)],
+        budget=float(budget),
+        max_from_team=int(max_from_team),
+    )
+
+    by_pos: List[List[Dict[str, Any]]] = [[] for _ in order]
+    for k, p in enumerate(pool):
+        by_pos[position[k]].append(
+            {
+                "id": p["id"],
+                "team": int(team[k]),
+                "position": int(position[k]),
+                "weight": float(weight[k]),
+                "penalty": float(mu[team[k]]),
+                "tenths": int(round(float(p["cost"]) * 10)),
+                "forced": p["id"] in forced_ids,
+            }
+        )
+
+    # Shift each position's costs by its cheapest member so tables only span the slack.
+    C = int(math.floor(float(budget) * 10 + 1e-6))
+    for members, pos in zip(by_pos, order):
+        members.sort(key=lambda m: (-m["weight"], m["tenths"], m["id"]))
+        floor = min(m["tenths"] for m in members)
+        for m in members:
+            m["tenths"] -= floor
+        C -= quotas[pos] * floor
+    if C < 0 or len(forced_ids) > sum(quotas.values()):
+        return None
+    positions = [_Position(members, quotas[pos], C) for members, pos in zip(by_pos, order)]
+    last = len(positions) - 1
+
+    captain = formations is not None
+    mult_bench = float(bench_weight) if captain else 1.0
+    if captain:
+        slots = {"GK": lambda d, m, f: 1, "DEF": lambda d, m, f: d, "MID": lambda d, m, f: m, "FWD": lambda d, m, f: f}
+        plans = [tuple(slots[pos](*f) for pos in order) for f in formations]
+    else:
+        plans = [tuple(quotas[pos] for pos in order)]
+    # best weight in any later position: the most a later captain can add
+    later_top = [max([pos.weight[0] for pos in positions[p + 1 :]], default=-np.inf) for p in range(len(positions))]
+
+    # Picks pay their club's multiplier in the tables; unused cap room is credited back.
+    reserve = float(max_from_team) * float(mu.sum())
+    rest_cache: Dict[Tuple[int, ...], np.ndarray] = {}
+
+    def rest_after(p: int, starters: Tuple[int, ...]) -> np.ndarray:
+        """Best value of full positions p+1.. for every budget (club caps relaxed)."""
+        key = starters[p + 1 :]
+        if key not in rest_cache:
+            if p == last:
+                rest_cache[key] = np.zeros(C + 1)
+            elif p + 1 == last:
+                rest_cache[key] = positions[last].table(starters[last], mult_bench)[0, positions[last].quota]
+            else:
+                full = positions[p + 1].table(starters[p + 1], mult_bench)[0, positions[p + 1].quota]
+                rest_cache[key] = _maxplus(full, rest_after(p + 1, starters))
+        return rest_cache[key]
+
+    prepared = []
+    for starters in plans:
+        first = positions[0].table(starters[0], mult_bench)[0, positions[0].quota]
+        root = float(np.max(first + rest_after(0, starters)[::-1])) + reserve
+        if captain:
+            root += max(later_top[0], positions[0].weight[0])
+        prepared.append((root, starters))
+    prepared.sort(key=lambda item: -item[0])
+
+    best_value = cutoff = loose = -np.inf
+    best: Optional[Tuple[Tuple[int, ...], Tuple[int, ...], Optional[int]]] = None
+    nodes = 0
+    teams = np.zeros(int(team.max()) + 1, dtype=np.int64)
+    chosen: List[Dict[str, Any]] = []
+    cap_limit = int(max_from_team)
+
+    timed_out = False
+    for plan, (root, starters) in enumerate(prepared):
+        if not np.isfinite(root):
+            continue
+        if root <= cutoff:
+            loose = max(loose, root)
+            continue
+        tables = [pos.table(s, mult_bench) for pos, s in zip(positions, starters)]
+        rests = [rest_after(p, starters) for p in range(len(positions))]
+
+        def bounds(p: int, j: int, need: int, c: int, cap_bonus: float) -> np.ndarray:
+            """Remainder bounds when position p's search continues at j, j+1, ... (one chunk)."""
+            stop = min(j + _CHUNK, len(positions[p].members))
+            out = (tables[p][j:stop, need, : c + 1] + rests[p][c::-1]).max(axis=1)
+            if captain:
+                out += np.maximum(cap_bonus, np.maximum(positions[p].weight[j:stop], later_top[p]))
+            return out
+
+        def dfs(p: int, j: int, need: int, c: int, value: float, cap_bonus: float, room: float) -> None:
+            # Including members[j] recurses; skipping it is the next loop iteration, so the
+            # recursion depth stays at most 15.
+            nonlocal best_value, best, nodes, cutoff, loose
+            while need == 0:
+                if positions[p].forced_after[j]:
+                    return
+                if p == last:
+                    total = value + (cap_bonus if captain else 0.0)
+                    if total > best_value + 1e-9:
+                        best_value = total
+                        cutoff = total + 1e-9 + gap * abs(total)
+                        best = _snapshot(chosen, starters if captain else None)
+                    return
+                p, j, need = p + 1, 0, positions[p + 1].quota
+
+            pos = positions[p]
+            chunk, start = None, j
+            while j < len(pos.members):
+                nodes += 1
+                if node_limit is not None and nodes > node_limit:
+                    raise NodeLimitReached()
+                if deadline is not None and time.perf_counter() > deadline:
+                    raise _Deadline()
+                if len(pos.members) - j < need or pos.forced_after[j] > need:
+                    return
+                if chunk is None or j - start >= chunk.size:
+                    chunk, start = bounds(p, j, need, c, cap_bonus), j
+                bound = value + room + chunk[j - start]
+                if bound <= cutoff:
+                    loose = max(loose, bound)
+                    return
+
+                m = pos.members[j]
+                cost = int(pos.cost[j])
+                if cost <= c and teams[m["team"]] < cap_limit:
+                    starts = pos.quota - need < starters[p]
+                    teams[m["team"]] += 1
+                    chosen.append(m)
+                    dfs(
+                        p,
+                        j + 1,
+                        need - 1,
+                        c - cost,
+                        value + m["weight"] * (1.0 if starts else mult_bench),
+                        max(cap_bonus, m["weight"]) if starts else cap_bonus,
+                        room - m["penalty"],
+                    )
+                    chosen.pop()
+                    teams[m["team"]] -= 1
+                if m["forced"]:
+                    return
+                j += 1
+
+        try:
+            dfs(0, 0, positions[0].quota, C, 0.0, -np.inf, reserve)
+        except _Deadline:
+            # this plan and every later one are unfinished; their roots still bound them
+            timed_out = True
+            loose = max([loose] + [r for r, _ in prepared[plan:] if np.isfinite(r)])
+            break
+
+    if best is None:
+        if timed_out:
+            raise NodeLimitReached("time limit reached without a feasible squad")
+        return None
+    squad, lineup, skipper = best
+    return SearchResult(
+        squad=squad,
+        starters=lineup,
+        captain=skipper,
+        objective=float(best_value),
+        nodes=nodes,
+        bound=float(max(best_value, loose)),
+        timed_out=timed_out,
+    )
+
+
+def _snapshot(
+    chosen: Sequence[Dict[str, Any]], starters: Optional[Sequence[int]]
+) -> Tuple[Tuple[int, ...], Tuple[int, ...], Optional[int]]:
+    """(squad, XI, captain) ids; picks are in search order, so each position's first
+    `starters[k]` picks start and the best of them captains."""
+    squad = tuple(m["id"] for m in chosen)
+    if starters is None:
+        return squad, (), None
+    seen: Dict[int, int] = {}
+    xi = []
+    for m in chosen:
+        rank = seen.get(m["position"], 0)
+        seen[m["position"]] = rank + 1
+        if rank < starters[m["position"]]:
+            xi.append(m)
+    return squad, tuple(m["id"] for m in xi), max(xi, key=lambda m: m["weight"])["id"]
@@ -0,0 +1,359 @@
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, replace
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pulp
+
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL
+from fantasy_premier_league_optimization.fpl.optimizer import (
+    OptimizedSquad,
+    SquadOptimizer,
+    _prepare_pool,
+    objective_weight,
+    prune_dominated_players,
+    top_k_squads,
+)
+from fantasy_premier_league_optimization.fpl.scoring import columns_from_elements
+
+
+# Element fields read by `sample_points` (on top of the optimizer's player dicts).
+SAMPLING_FIELDS: Sequence[str] = ("id", "points_per_game", "form", "total_points", "chance_of_playing_next_round")
+
+OBJECTIVES: Sequence[str] = ("mean", "cvar")
+
+# Variance / mean of a player's points in a gameweek they feature in; FPL returns are overdispersed
+# (blanks and hauls), roughly 2-3x a Poisson's.
+POINTS_DISPERSION = 2.5
+MIN_PLAY_PROBABILITY = 0.05
+
+# Scenarios are drawn in fixed blocks, block b from the b-th stream spawned off `seed`, so the
+# first n scenarios are the same whatever `n_samples` is.
+_BLOCK = 1000
+
+
+@dataclass(frozen=True)
+class PointSamples:
+    """Sampled horizon points: `points[s, j]` is scenario s for player `element_ids[j]`."""
+
+    element_ids: np.ndarray
+    points: np.ndarray  # float32, (samples, players)
+    seed: int
+    appearances: Optional[np.ndarray] = None  # uint8, gameweeks featured in (same shape)
+
+    @property
+    def n_samples(self) -> int:
+        return int(self.points.shape[0])
+
+    def mean(self) -> Dict[int, float]:
+        return {int(i): float(m) for i, m in zip(self.element_ids, self.points.mean(axis=0, dtype=np.float64))}
+
+    def columns(self, element_ids: Iterable[int], *, appearances: bool = False) -> np.ndarray:
+        """(samples, len(element_ids)) slice of points (or appearances) in the given order."""
+        position = {int(i): j for j, i in enumerate(self.element_ids)}
+        source = self.appearances if appearances else self.points
+        if source is None:
+            raise ValueError("These samples carry no appearances.")
+        return source[:, [position[int(i)] for i in element_ids]]
+
+
+@dataclass(frozen=True)
+class SquadScore:
+    mean: float
+    std: float
+    cvar: float  # mean of the worst `alpha` share of scenarios
+    p10: float
+    median: float
+    p90: float
+
+
+@dataclass(frozen=True)
+class RobustSquad:
+    result: OptimizedSquad
+    score: SquadScore  # XI + captain + bench at the solve's bench weight, over every sample
+    objective: str
+    alpha: float
+
+
+def _play_probability(elements: Sequence[Mapping[str, Any]]) -> Dict[int, float]:
+    """
+    Chance of featuring in a gameweek: appearances (total points / points per game) over the
+    gameweeks played so far (the most appearances anyone has), times the flag's chance.
+    """
+    cols = columns_from_elements(elements, SAMPLING_FIELDS)
+    ppg, total = cols["points_per_game"], cols["total_points"]
+    games = np.where(ppg > 0, total / np.maximum(ppg, 1e-9), 0.0)
+    played = float(np.round(games).max()) if len(games) else 0.0
+    rate = np.clip(games / played, 0.0, 1.0) if played > 0 else np.ones_like(games)
+    # `chance_of_playing_next_round` is null when there is no news
+    flagged = np.array([e.get("chance_of_playing_next_round") is not None for e in elements], dtype=bool)
+    chance = np.where(flagged, cols["chance_of_playing_next_round"], 100.0)
+    prob = np.maximum(rate * chance / 100.0, MIN_PLAY_PROBABILITY)
+    return {int(i): float(p) for i, p in zip(cols["id"], prob)}
+
+
+def sample_points(
+    players: Sequence[Dict[str, Any]],
+    elements: Iterable[Mapping[str, Any]],
+    *,
+    horizon_gameweeks: int,
+    n_samples: int = 10_000,
+    seed: int = 0,
+    dispersion: float = POINTS_DISPERSION,
+) -> PointSamples:
+    """
+    Draw `n_samples` horizon totals for every player in `players` (optimizer dicts).
+
+    Each gameweek a player features with probability `_play_probability` (so appearances are
+    binomial over the horizon) and scores a gamma amount when featuring. The gamma's mean keeps
+    the sample mean equal to `projected_points`; its variance is `dispersion` x mean plus
+    (form - points per game)^2, so streaky players are wider. A sum of appearances' gammas is
+    one gamma with the shape scaled by the appearance count, so a scenario is one uniform
+    (appearances, by inverting the binomial CDF) and one gamma draw per player.
+    """
+    horizon = max(1, int(horizon_gameweeks))
+    stats = {int(e.get("id")): e for e in elements}
+    rows = [stats.get(p["id"], {"id": p["id"]}) for p in players]
+    prob_by_id = _play_probability(list(stats.values()))
+    cols = columns_from_elements(rows, SAMPLING_FIELDS)
+
+    prob = np.array([prob_by_id.get(p["id"], 1.0) for p in players])
+    per_gw = np.maximum(np.array([p["projected_points"] for p in players], dtype=float), 0.0) / horizon
+    when_playing = per_gw / prob
+    variance = float(dispersion) * when_playing + (cols["form"] - cols["points_per_game"]) ** 2
+    active = (when_playing > 0) & (variance > 0)
+    shape = np.where(active, when_playing**2 / np.where(active, variance, 1.0), 0.0)
+    scale = np.where(active, variance / np.where(active, when_playing, 1.0), 0.0).astype(np.float32)
+
+    # P(appearances <= a) for a < horizon, and the gamma shape for each appearance count
+    pmf = np.array([math.comb(horizon, a) * prob**a * (1.0 - prob) ** (horizon - a) for a in range(horizon + 1)])
+    cdf = np.cumsum(pmf, axis=0)[:-1].astype(np.float32)
+    shapes = (np.arange(horizon + 1)[:, None] * shape[None, :]).astype(np.float32)
+    col_index = np.arange(len(players))
+
+    n = int(n_samples)
+    out = np.empty((n, len(players)), dtype=np.float32)
+    featured = np.empty((n, len(players)), dtype=np.uint8)
+    streams = np.random.SeedSequence(int(seed)).spawn(max(1, -(-n // _BLOCK)))
+    for b, stream in enumerate(streams):
+        rng = np.random.default_rng(stream)
+        lo, hi = b * _BLOCK, min(n, (b + 1) * _BLOCK)
+        u = rng.random((_BLOCK, len(players)), dtype=np.float32)[: hi - lo]
+        appearances = (u[None, :, :] > cdf[:, None, :]).sum(axis=0)
+        featured[lo:hi] = appearances
+        out[lo:hi] = rng.standard_gamma(shapes[appearances, col_index], dtype=np.float32) * scale
+    return PointSamples(
+        element_ids=np.array([p["id"] for p in players], dtype=np.int64),
+        points=out,
+        seed=int(seed),
+        appearances=featured,
+    )
+
+
+def _lower_tail_mean(totals: np.ndarray, alpha: float) -> np.ndarray:
+    """CVaR: mean of the worst ceil(alpha * samples) values down axis 0."""
+    n = max(1, int(math.ceil(float(alpha) * totals.shape[0])))
+    return np.partition(totals, n - 1, axis=0)[:n].mean(axis=0)
+
+
+def lineup_weights(squad: OptimizedSquad, element_ids: Sequence[int], *, bench_weight: float = 0.0) -> np.ndarray:
+    """Per-player multipliers of a squad's realized points: XI 1, captain 2, bench `bench_weight`."""
+    position = {int(i): j for j, i in enumerate(element_ids)}
+    w = np.zeros(len(element_ids))
+    for p in squad.bench:
+        w[position[p["id"]]] = float(bench_weight)
+    for p in squad.starting_11:
+        w[position[p["id"]]] = 1.0
+    w[position[squad.captain["id"]]] = 2.0
+    return w
+
+
+def score_squads(
+    squads: Sequence[OptimizedSquad],
+    samples: PointSamples,
+    *,
+    alpha: float = 0.2,
+    bench_weight: float = 0.0,
+) -> List[SquadScore]:
+    """Score every squad (XI + captain + bench at `bench_weight`, no autosubs) across all samples at once."""
+    if not squads:
+        return []
+    weights = np.stack([lineup_weights(s, samples.element_ids, bench_weight=bench_weight) for s in squads], axis=1)
+    totals = samples.points @ weights.astype(np.float32)  # (samples, squads)
+    cvar = _lower_tail_mean(totals, alpha)
+    p10, median, p90 = np.percentile(totals, [10, 50, 90], axis=0)
+    return [
+        SquadScore(
+            mean=float(totals[:, k].mean(dtype=np.float64)),
+            std=float(totals[:, k].std(dtype=np.float64)),
+            cvar=float(cvar[k]),
+            p10=float(p10[k]),
+            median=float(median[k]),
+            p90=float(p90[k]),
+        )
+        for k in range(len(squads))
+    ]
+
+
+def _with_means(players: Sequence[Dict[str, Any]], samples: PointSamples) -> List[Dict[str, Any]]:
+    means = samples.mean()
+    return [{**p, "projected_points": means[p["id"]]} for p in players]
+
+
+def _cvar_optimizer(
+    players: Sequence[Dict[str, Any]],
+    samples: PointSamples,
+    *,
+    alpha: float,
+    cvar_samples: int,
+    **optimizer_kwargs: Any,
+) -> SquadOptimizer:
+    """
+    `SquadOptimizer` whose objective is the CVaR of the squad objective over the first
+    `cvar_samples` scenarios (Rockafellar-Uryasev: max eta - sum(u_s) / (alpha S) with
+    u_s >= eta - score_s, u_s >= 0). The scenario constraints need CBC.
+    """
+    opt = SquadOptimizer(players, **{**optimizer_kwargs, "solver": "cbc"})
+    ids = [p["id"] for p in opt.players]
+    block = samples.columns(ids)[: int(cvar_samples)].astype(np.float64)
+    # carry the risk profile's per-player bonus over to every scenario
+    weight = [
+        objective_weight(p, risk_profile=opt.risk_profile, differential_weight=opt.differential_weight)
+        for p in opt.players
+    ]
+    ratio = np.array([w / p["projected_points"] if p["projected_points"] else 1.0 for w, p in zip(weight, opt.players)])
+    block *= ratio[None, :]
+
+    if opt.bench_weight is None:
+        terms = [opt.x[i] for i in ids]
+    else:
+        bw = opt.bench_weight
+        terms = [opt.y[i] + opt.c[i] + bw * (opt.x[i] - opt.y[i]) for i in ids]
+    eta = pulp.LpVariable("cvar_eta")
+    shortfall = [pulp.LpVariable(f"cvar_u_{s}", lowBound=0) for s in range(block.shape[0])]
+    for s, row in enumerate(block):
+        score = pulp.lpSum(float(v) * t for v, t in zip(row, terms) if v)
+        opt.model += shortfall[s] >= eta - score, f"cvar_scenario_{s}"
+    opt.model.setObjective(eta - pulp.lpSum(shortfall) * (1.0 / (float(alpha) * block.shape[0])))
+    return opt
+
+
+def optimize_robust_squad(
+    players: Sequence[Dict[str, Any]],
+    samples: PointSamples,
+    *,
+    objective: str = "mean",
+    alpha: float = 0.2,
+    cvar_samples: int = 300,
+    candidates: int = 0,
+    must_include_groups: Sequence[Sequence[int]] = (),
+    **optimizer_kwargs: Any,
+) -> RobustSquad:
+    """
+    Best squad under `samples`:
+
+    - "mean": the sample-average objective (a deterministic solve on sample means).
+    - "cvar": the mean of the worst `alpha` share of scenarios, as a MILP over the first
+      `cvar_samples` scenarios.
+    - with `candidates` > 0: the top `candidates` sample-mean squads (`top_k_squads`) scored
+      across every sample, keeping the best by `objective`. Unlike the CVaR MILP this uses
+      every scenario, but it only searches near the mean optimum.
+    """
+    if objective not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {objective!r}; expected one of {', '.join(OBJECTIVES)}.")
+    if not 0.0 < float(alpha) <= 1.0:
+        raise ValueError("alpha must be in (0, 1].")
+    pool = _with_means(players, samples)
+    # score what the solve maximizes: the bench counts at the optimizer's bench weight
+    bench_weight = optimizer_kwargs.get("bench_weight", 0.1) or 0.0
+
+    if int(candidates) > 0:
+        ranked = top_k_squads(pool, k=int(candidates), must_include_groups=must_include_groups, **optimizer_kwargs)
+        scores = score_squads(ranked, samples, alpha=alpha, bench_weight=bench_weight)
+        key = (lambda s: s.mean) if objective == "mean" else (lambda s: s.cvar)
+        best = max(range(len(ranked)), key=lambda k: key(scores[k]))
+        return RobustSquad(result=ranked[best], score=scores[best], objective=objective, alpha=float(alpha))
+
+    if objective == "mean":
+        opt = SquadOptimizer(pool, **optimizer_kwargs)
+    else:
+        opt = _cvar_optimizer(pool, samples, alpha=alpha, cvar_samples=cvar_samples, **optimizer_kwargs)
+    for group in must_include_groups:
+        opt.force(group, any_of=True)
+    result = opt.solve()
+    score = score_squads([result], samples, alpha=alpha, bench_weight=bench_weight)[0]
+    return RobustSquad(result=result, score=score, objective=objective, alpha=float(alpha))
+
+
+def optimize_squad_stochastic(
+    elements: Iterable[Dict[str, Any]],
+    *,
+    horizon_gameweeks: int,
+    n_samples: int = 10_000,
+    seed: int = 0,
+    objective: str = "mean",
+    alpha: float = 0.2,
+    cvar_samples: int = 300,
+    candidates: int = 0,
+    budget: float = 100.0,
+    max_from_team: int = 3,
+    must_include: Optional[Sequence[str]] = None,
+    avoid: Optional[Sequence[str]] = None,
+    team_fixture_multiplier: Optional[Dict[int, float]] = None,
+    allow_flagged_players: bool = False,
+    risk_profile: str = "template",
+    differential_weight: float = 0.12,
+    projected_points: Optional[Mapping[int, float]] = None,
+    projection_model: str = DEFAULT_MODEL,
+    bench_weight: Optional[float] = 0.1,
+) -> RobustSquad:
+    """
+    `optimize_squad_ilp` against sampled points (see `sample_points` and
+    `optimize_robust_squad`). Sampling covers the eligible pool; the solve runs on the
+    players left after dominance pruning on sample means, which is exact for "mean" and a
+    restriction for "cvar" (a dominated player could only help through a fatter tail).
+    """
+    elements = list(elements)
+    players, groups, _ = _prepare_pool(
+        elements,
+        horizon_gameweeks=horizon_gameweeks,
+        max_from_team=max_from_team,
+        must_include=must_include,
+        avoid=avoid,
+        team_fixture_multiplier=team_fixture_multiplier,
+        allow_flagged_players=allow_flagged_players,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        team_fixture_vectors=None,
+        projected_points=projected_points,
+        projection_model=projection_model,
+        prune_dominated=False,
+    )
+    samples = sample_points(players, elements, horizon_gameweeks=horizon_gameweeks, n_samples=n_samples, seed=seed)
+
+    kept, report = prune_dominated_players(
+        _with_means(players, samples),
+        max_from_team=max_from_team,
+        keep=[i for g in groups for i in g],
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        spare=max(int(candidates) - 1, 0),
+    )
+    kept_ids = {p["id"] for p in kept}
+    robust = optimize_robust_squad(
+        [p for p in players if p["id"] in kept_ids],
+        samples,
+        objective=objective,
+        alpha=alpha,
+        cvar_samples=cvar_samples,
+        candidates=candidates,
+        must_include_groups=groups,
+        budget=budget,
+        max_from_team=max_from_team,
+        risk_profile=risk_profile,
+        differential_weight=differential_weight,
+        bench_weight=bench_weight,
+    )
+    return replace(robust, result=replace(robust.result, pruning=report))
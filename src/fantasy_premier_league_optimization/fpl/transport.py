@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from fantasy_premier_league_optimization.fpl.cache_index import read_payload_bytes
+
+
+FPL_BASE_URL = "https://fantasy.premierleague.com/api"
+
+BUNDLE_FORMAT_VERSION = 1
+BUNDLE_MANIFEST = "manifest.json"
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+
+
+def _base_url() -> str:
+    # Override is mainly for tests / mirrors serving the same API layout.
+    return os.getenv("FPL_API_BASE_URL", FPL_BASE_URL).rstrip("/")
+
+
+def _session() -> requests.Session:
+    """
+    Process-wide pooled session: keep-alive connections, gzip negotiation and
+    retries with exponential backoff on transient upstream failures.
+    """
+    global _SESSION
+    with _SESSION_LOCK:
+        if _SESSION is None:
+            retry = Retry(
+                total=3,
+                backoff_factor=0.5,
+                status_forcelist=(429, 500, 502, 503, 504),
+                allowed_methods=frozenset({"GET"}),
+                respect_retry_after_header=True,
+            )
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+            session = requests.Session()
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            session.headers.update({"Accept-Encoding": "gzip, deflate", "Accept": "application/json"})
+            _SESSION = session
+        return _SESSION
+
+
+@dataclass(frozen=True)
+class TransportResponse:
+    status: int  # 200, or 304 when the caller's validators are still current
+    payload: Any = None
+    url: str = ""
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+
+class Transport:
+    """
+    Where `fpl.api` gets payloads from. `cacheable=False` transports are read directly
+    (no TTL / disk cache in front of them).
+    """
+
+    cacheable: bool = True
+
+    def fetch(
+        self,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        validators: Dict[str, str],
+        timeout_seconds: int,
+    ) -> TransportResponse:
+        raise NotImplementedError
+
+    def local_path(self, cache_name: str) -> Optional[Path]:
+        """For non-cacheable transports: the on-disk file that holds `cache_name`."""
+        return None
+
+    def observe(self, cache_name: str, endpoint: str, params: Optional[Dict[str, Any]], path: Path) -> None:
+        """Called with the file that ends up serving every request (fresh hit or download)."""
+
+
+class HttpTransport(Transport):
+    def fetch(
+        self,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        validators: Dict[str, str],
+        timeout_seconds: int,
+    ) -> TransportResponse:
+        url = f"{_base_url()}/{endpoint.lstrip('/')}"
+        headers: Dict[str, str] = {}
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+        resp = _session().get(url, params=params, headers=headers, timeout=timeout_seconds)
+        if resp.status_code == 304:
+            return TransportResponse(status=304, url=url)
+        resp.raise_for_status()
+        return TransportResponse(
+            status=resp.status_code,
+            payload=resp.json(),
+            url=url,
+            etag=resp.headers.get("ETag"),
+            last_modified=resp.headers.get("Last-Modified"),
+        )
+
+
+class ReplayTransport(Transport):
+    """
+    Serve payloads from a directory of `<cache name>.json` files (a recorded bundle, or
+    the checked-in `data/` snapshot). Never touches the network or the TTL cache.
+    """
+
+    cacheable = False
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory).resolve()
+        manifest = self.directory / BUNDLE_MANIFEST
+        if manifest.exists():
+            version = json.loads(manifest.read_text(encoding="utf-8")).get("format_version")
+            if version != BUNDLE_FORMAT_VERSION:
+                raise ValueError(f"Unsupported replay bundle version {version!r} in {manifest}")
+
+    def local_path(self, cache_name: str) -> Optional[Path]:
+        return self.directory / f"{cache_name}.json"
+
+    def fetch(
+        self,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        validators: Dict[str, str],
+        timeout_seconds: int,
+    ) -> TransportResponse:
+        raise FileNotFoundError(f"Endpoint '{endpoint}' is not in replay bundle {self.directory}")
+
+
+class RecordingTransport(Transport):
+    """
+    Delegate to `inner` and copy every payload the run used into a versioned bundle
+    directory that `ReplayTransport` can serve later.
+    """
+
+    def __init__(self, directory: Path, inner: Optional[Transport] = None):
+        self.directory = Path(directory).resolve()
+        self.inner = inner or HttpTransport()
+        self._lock = threading.Lock()
+        self._seen: Dict[str, int] = {}
+
+    def fetch(
+        self,
+        endpoint: str,
+        *,
+        params: Optional[Dict[str, Any]],
+        validators: Dict[str, str],
+        timeout_seconds: int,
+    ) -> TransportResponse:
+        return self.inner.fetch(endpoint, params=params, validators=validators, timeout_seconds=timeout_seconds)
+
+    def observe(self, cache_name: str, endpoint: str, params: Optional[Dict[str, Any]], path: Path) -> None:
+        mtime = path.stat().st_mtime_ns
+        with self._lock:
+            if self._seen.get(cache_name) == mtime:
+                return
+            self.directory.mkdir(parents=True, exist_ok=True)
+            target = self.directory / f"{cache_name}.json"
+            tmp = target.with_name(f".{target.name}.{os.getpid()}.tmp")
+            if path.name.endswith(".gz"):
+                tmp.write_bytes(read_payload_bytes(path))  # bundles always hold plain JSON
+            else:
+                shutil.copyfile(path, tmp)
+            os.replace(tmp, target)
+            self._seen[cache_name] = mtime
+
+            manifest_path = self.directory / BUNDLE_MANIFEST
+            manifest: Dict[str, Any] = {}
+            if manifest_path.exists():
+                manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            manifest.setdefault("format_version", BUNDLE_FORMAT_VERSION)
+            manifest.setdefault("created_at", time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()))
+            manifest.setdefault("entries", {})[cache_name] = {
+                "endpoint": endpoint,
+                "params": params or {},
+                "sha1": hashlib.sha1(target.read_bytes()).hexdigest(),
+                "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            }
+            manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def transport_from_env() -> Transport:
+    """
+    `FPL_TRANSPORT`: `live` (default), `replay:<dir>` or `record:<dir>`.
+    """
+    spec = os.getenv("FPL_TRANSPORT", "live").strip()
+    mode, _, arg = spec.partition(":")
+    mode = mode.lower()
+    if mode in ("", "live", "http"):
+        return HttpTransport()
+    if mode == "replay":
+        return ReplayTransport(Path(arg or "data"))
+    if mode == "record":
+        if not arg:
+            raise ValueError("FPL_TRANSPORT=record:<dir> needs a bundle directory.")
+        return RecordingTransport(Path(arg))
+    raise ValueError(f"Unknown FPL_TRANSPORT mode: {spec!r}")
+
+
+_TRANSPORT: Optional[Transport] = None
+
+
+def get_transport() -> Transport:
+    global _TRANSPORT
+    if _TRANSPORT is None:
+        _TRANSPORT = transport_from_env()
+    return _TRANSPORT
+
+
+def set_transport(transport: Optional[Transport]) -> None:
+    """Install a process-wide transport (None re-reads `FPL_TRANSPORT` on next use)."""
+    global _TRANSPORT
+    _TRANSPORT = transport
+
+
+@contextmanager
+def use_transport(transport: Transport) -> Iterator[Transport]:
+    global _TRANSPORT
+    previous = _TRANSPORT
+    _TRANSPORT = transport
+    try:
+        yield transport
+    finally:
+        _TRANSPORT = previous
@@ -24,6 +24,8 @@ def run():
         # Optional comma-separated players to force-include or avoid (match by "First Last")
         "must_include": sys.argv[3].split(",") if len(sys.argv) > 3 and sys.argv[3] else [],
         "avoid": sys.argv[4].split(",") if len(sys.argv) > 4 and sys.argv[4] else [],
+        # Projection model from fpl.models (heuristic, ep_next, ict_regression)
+        "projection_model": sys.argv[6] if len(sys.argv) > 6 and sys.argv[6] else "heuristic",
         "current_year": str(datetime.now().year),
     }
 
@@ -43,6 +45,7 @@ def train():
         "risk_profile": "differential",
         "must_include": [],
         "avoid": [],
+        "projection_model": "heuristic",
         "current_year": str(datetime.now().year),
     }
     try:
@@ -71,6 +74,7 @@ def test():
         "risk_profile": "differential",
         "must_include": [],
         "avoid": [],
+        "projection_model": "heuristic",
         "current_year": str(datetime.now().year),
     }
 
@@ -80,6 +84,14 @@ def test():
     except Exception as e:
         raise Exception(f"An error occurred while testing the crew: {e}")
 
+def batch():
+    """
+    Solve a grid / list of optimizer scenarios without the crew; see `fpl.batch` for flags.
+    """
+    from fantasy_premier_league_optimization.fpl.batch import main as batch_main
+
+    return batch_main(sys.argv[1:])
+
 def run_with_trigger():
     """
     Run the crew with trigger payload.
@@ -2,6 +2,7 @@ from fantasy_premier_league_optimization.tools.fetch_url_tool import FetchUrlToo
 from fantasy_premier_league_optimization.tools.fpl_fixture_outlook_tool import FPLFixtureOutlookTool
 from fantasy_premier_league_optimization.tools.fpl_generate_report_tool import FPLGenerateReportTool
 from fantasy_premier_league_optimization.tools.fpl_optimize_squad_tool import FPLOptimizeSquadTool
+from fantasy_premier_league_optimization.tools.fpl_plan_transfers_tool import FPLPlanTransfersTool
 from fantasy_premier_league_optimization.tools.fpl_player_watchlist_tool import FPLPlayerWatchlistTool
 
 __all__ = [
@@ -10,5 +11,6 @@ __all__ = [
     "FPLGenerateReportTool",
     "FPLPlayerWatchlistTool",
     "FPLOptimizeSquadTool",
+    "FPLPlanTransfersTool",
 ]
 
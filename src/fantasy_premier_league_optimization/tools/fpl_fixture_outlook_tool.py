@@ -1,49 +1,79 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, Type
+from typing import Any, Dict, List, Type
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from fantasy_premier_league_optimization.fpl.api import bootstrap_static, fixtures, team_mapping
-from fantasy_premier_league_optimization.fpl.fixtures import compute_fixture_outlook, fixture_outlook_markdown
+from fantasy_premier_league_optimization.fpl.fixtures import (
+    compute_fixture_outlook,
+    compute_fixture_sweep,
+    fixture_outlook_markdown,
+    infer_from_event,
+)
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot, load_fixture_index
 
 
 class FPLFixtureOutlookInput(BaseModel):
     horizon_gameweeks: int = Field(5, description="How many upcoming gameweeks to analyze.")
     from_event: int | None = Field(None, description="Start from this event/gameweek (defaults to current-ish).")
     force_refresh: bool = Field(False, description="Force refresh instead of reading cached API payload.")
+    horizons: List[int] | None = Field(
+        None,
+        description="Sweep mode: compute outlooks for all of these horizons at once (e.g. [1,2,...,8]).",
+    )
+    from_events: List[int] | None = Field(
+        None,
+        description="Sweep mode: start events to combine with `horizons` (defaults to the inferred start event).",
+    )
 
 
 class FPLFixtureOutlookTool(BaseTool):
     name: str = "fpl_fixture_outlook"
     description: str = (
         "Fetch official FPL fixtures and compute a team fixture outlook table over the next N gameweeks. "
-        "Returns markdown plus a JSON blob (with per-team multipliers) to be reused by later tasks."
+        "Returns markdown plus a JSON blob (with per-team multipliers) to be reused by later tasks. "
+        "Pass `horizons` (and optionally `from_events`) to get a compact multi-horizon JSON sweep instead."
     )
     args_schema: Type[BaseModel] = FPLFixtureOutlookInput
 
-    def _run(self, horizon_gameweeks: int = 5, from_event: int | None = None, force_refresh: bool = False) -> str:
-        boot = bootstrap_static(force_refresh=force_refresh)
-        fx = fixtures(force_refresh=force_refresh)
-        teams = team_mapping(boot)
+    def _run(
+        self,
+        horizon_gameweeks: int = 5,
+        from_event: int | None = None,
+        force_refresh: bool = False,
+        horizons: List[int] | None = None,
+        from_events: List[int] | None = None,
+    ) -> str:
+        snap = load_bootstrap_snapshot(force_refresh=force_refresh)
+        # shared, memoized team x gameweek matrix: no fixtures decode or rescan per call
+        index = load_fixture_index(force_refresh=force_refresh, snap=snap)
+        teams = snap.teams
 
         # If from_event isn't provided, infer from bootstrap "events" (current or next GW)
         if from_event is None:
-            events = boot.get("events", [])
-            current = next((e for e in events if e.get("is_current")), None)
-            if current and current.get("id"):
-                from_event = int(current["id"])
-            else:
-                nxt = next((e for e in events if e.get("is_next")), None)
-                from_event = int(nxt["id"]) if nxt and nxt.get("id") else None
+            from_event = infer_from_event(snap.events)
+
+        if horizons or from_events:
+            # One pass over the fixtures for the whole grid; compact arrays instead of N markdown tables.
+            sweep = compute_fixture_sweep(
+                teams=teams,
+                fixtures_payload=(),
+                from_events=from_events or [from_event or 1],
+                horizons=horizons or [int(horizon_gameweeks)],
+                index=index,
+            )
+            compact = sweep.to_compact()
+            compact["team_names"] = [teams.get(int(t), {}).get("name", str(t)) for t in compact["team_ids"]]
+            return "```json\n" + json.dumps(compact, separators=(",", ":")) + "\n```\n"
 
         rows, multipliers = compute_fixture_outlook(
             teams=teams,
-            fixtures_payload=fx,
+            fixtures_payload=(),
             from_event=from_event,
             horizon_events=int(horizon_gameweeks),
+            index=index,
         )
         md = fixture_outlook_markdown(rows)
         payload: Dict[str, Any] = {
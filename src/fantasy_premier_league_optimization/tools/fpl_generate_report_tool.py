@@ -2,12 +2,13 @@ from __future__ import annotations
 
 import json
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Type, Union
+from typing import Any, Dict, List, Mapping, Optional, Type, Union
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from fantasy_premier_league_optimization.fpl.api import bootstrap_static, team_mapping
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix
+from fantasy_premier_league_optimization.fpl.snapshot import load_bootstrap_snapshot
 
 # Default paths for artifacts
 DEFAULT_OPTIMIZED_SQUAD_PATH = "artifacts/optimized_squad.json"
@@ -69,10 +70,26 @@ def _load_json_file(path: Path) -> Dict[str, Any]:
         return json.load(f)
 
 
-def _team_name(teams: Dict[int, Dict[str, Any]], team_id: int) -> str:
+def _team_name(teams: Mapping[int, Mapping[str, Any]], team_id: int) -> str:
     return str(teams.get(int(team_id), {}).get("name") or f"team_{team_id}")
 
 
+def _per_gameweek_table(players: List[Dict[str, Any]], horizon: int, *, force_refresh: bool) -> str:
+    """Starting XI projections per upcoming gameweek, from the cached projection matrix."""
+    ids = [int(p["id"]) for p in players if p.get("id") is not None]
+    if not ids or horizon < 1:
+        return ""
+    try:
+        matrix = load_projection_matrix(force_refresh=force_refresh)
+    except Exception:
+        return ""  # report stays usable without fixtures / projections
+    events = [int(e) for e in matrix.events[:horizon]]
+    points = matrix.rows(ids)[:, : len(events)]
+    names = {int(p["id"]): str(p.get("name", "")) for p in players if p.get("id") is not None}
+    rows = [[names[i]] + [f"{v:.2f}" for v in row] for i, row in zip(ids, points)]
+    return _table(rows, ["Player"] + [f"GW{e}" for e in events])
+
+
 def _table(rows: List[List[str]], headers: List[str]) -> str:
     line = "| " + " | ".join(headers) + " |"
     sep = "| " + " | ".join(["---"] * len(headers)) + " |"
@@ -109,8 +126,7 @@ class FPLGenerateReportTool(BaseTool):
         wl_path = (base / wl_path_str).resolve()
 
         squad = _load_json_file(squad_path)
-        boot = bootstrap_static(force_refresh=do_refresh)
-        teams = team_mapping(boot)
+        teams = load_bootstrap_snapshot(force_refresh=do_refresh).teams
 
         starting = squad.get("starting_11", [])
         bench = squad.get("bench", [])
@@ -158,6 +174,7 @@ class FPLGenerateReportTool(BaseTool):
         total_proj = float(squad.get("total_projected_points") or 0.0)
         horizon = int(squad.get("horizon_gameweeks") or 1)
         budget = float(squad.get("budget") or 100.0)
+        per_gw_md = _per_gameweek_table(starting, horizon, force_refresh=do_refresh) or "_Not available._"
 
         report = f"""# FPL Optimized Squad Report (Next GW)
 
@@ -171,6 +188,9 @@ class FPLGenerateReportTool(BaseTool):
 ## Starting XI
 {xi_table}
 
+## Starting XI by gameweek (fixture-adjusted proxy)
+{per_gw_md}
+
 ## Bench (ordered)
 {bench_table}
 
@@ -2,13 +2,21 @@ from __future__ import annotations
 
 import json
 import re
+from dataclasses import asdict
 from typing import Any, Dict, List, Optional, Sequence, Type
 
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from fantasy_premier_league_optimization.fpl.api import bootstrap_static, team_mapping
-from fantasy_premier_league_optimization.fpl.optimizer import optimize_squad_ilp, validate_squad
+from fantasy_premier_league_optimization.fpl.api import bootstrap_sections, iter_bootstrap_elements, team_mapping
+from fantasy_premier_league_optimization.fpl.optimizer import (
+    OPTIMIZER_FIELDS,
+    optimize_squad_ilp,
+    optimize_squad_ilp_top_k,
+    validate_squad,
+)
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL, available_models
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix, load_projection_rates
 
 
 class FPLOptimizeSquadInput(BaseModel):
@@ -23,6 +31,28 @@ class FPLOptimizeSquadInput(BaseModel):
         None,
         description="JSON string that contains {team_multipliers: {team_id: multiplier}} from fixture outlook tool.",
     )
+    projection_model: str = Field(
+        DEFAULT_MODEL,
+        description=f"Projection model to optimize against: one of {', '.join(available_models())}.",
+    )
+    per_gameweek_fixtures: bool = Field(
+        False,
+        description="Price each upcoming gameweek's fixtures separately (blanks score 0, doubles twice) "
+        "instead of one averaged team multiplier.",
+    )
+    bench_weight: float | None = Field(
+        0.1,
+        description="Pick squad, starting XI and captain in one solve, counting bench points at this weight. "
+        "null maximizes all 15 players and picks the XI/captain afterwards.",
+    )
+    alternatives: int = Field(0, description="Also return this many next-best squads to hedge projection error.")
+    min_difference: int = Field(3, description="Players each alternative must differ by from every better squad.")
+    time_limit_seconds: float | None = Field(
+        None, description="Stop the solve after this many seconds and return the best squad found so far."
+    )
+    mip_gap: float | None = Field(
+        None, description="Accept a squad proven within this relative gap of optimal (e.g., 0.01 for 1%)."
+    )
     force_refresh: bool = Field(False, description="Force refresh instead of reading cached API payload.")
 
 
@@ -64,14 +94,27 @@ class FPLOptimizeSquadTool(BaseTool):
         risk_profile: str = "template",
         allow_flagged_players: bool = False,
         team_multipliers_json: Optional[str] = None,
+        projection_model: str = DEFAULT_MODEL,
+        per_gameweek_fixtures: bool = False,
+        bench_weight: Optional[float] = 0.1,
+        alternatives: int = 0,
+        min_difference: int = 3,
+        time_limit_seconds: Optional[float] = None,
+        mip_gap: Optional[float] = None,
         force_refresh: bool = False,
     ) -> str:
-        boot = bootstrap_static(force_refresh=force_refresh)
-        teams = team_mapping(boot)
+        teams = team_mapping(bootstrap_sections("teams", force_refresh=force_refresh))
         multipliers = _extract_team_multipliers(team_multipliers_json)
+        # Model outputs are memoized per snapshot, so switching / A-B-ing models is cheap.
+        if per_gameweek_fixtures:
+            # cached P[player, gameweek] matrix; the horizon is just a column slice
+            matrix = load_projection_matrix(model=projection_model, force_refresh=force_refresh)
+            projected = matrix.by_element(int(horizon_gameweeks))
+        else:
+            rates = load_projection_rates(model=projection_model, force_refresh=force_refresh)
+            projected = rates.flat(int(horizon_gameweeks), multipliers)
 
-        result = optimize_squad_ilp(
-            boot.get("elements", []),
+        options = dict(
             horizon_gameweeks=int(horizon_gameweeks),
             budget=float(budget),
             max_from_team=int(max_from_team),
@@ -80,7 +123,22 @@ class FPLOptimizeSquadTool(BaseTool):
             team_fixture_multiplier=multipliers,
             allow_flagged_players=bool(allow_flagged_players),
             risk_profile=str(risk_profile),
+            projected_points=projected,
+            projection_model=str(projection_model),
+            bench_weight=None if bench_weight is None else float(bench_weight),
+            time_limit_seconds=None if time_limit_seconds is None else float(time_limit_seconds),
+            mip_gap=None if mip_gap is None else float(mip_gap),
         )
+        # the pool is built from a single pass over the streamed elements (optimizer fields only)
+        elements = iter_bootstrap_elements(fields=OPTIMIZER_FIELDS)
+        others = []
+        if int(alternatives) > 0:
+            ranked = optimize_squad_ilp_top_k(
+                elements, k=int(alternatives) + 1, min_difference=int(min_difference), **options
+            )
+            result, others = ranked[0], ranked[1:]
+        else:
+            result = optimize_squad_ilp(elements, **options)
         validate_squad(result.squad, budget=float(budget), max_from_team=int(max_from_team))
 
         def _enrich(p: Dict[str, Any]) -> Dict[str, Any]:
@@ -91,14 +149,40 @@ class FPLOptimizeSquadTool(BaseTool):
             "horizon_gameweeks": int(horizon_gameweeks),
             "budget": float(budget),
             "max_from_team": int(max_from_team),
+            **({"projection_model": projection_model} if projection_model != DEFAULT_MODEL else {}),
             "total_cost": result.total_cost,
             "total_projected_points": result.total_projected_points,
+            **(
+                {"lineup_projected_points": result.lineup_projected_points}
+                if result.lineup_projected_points is not None
+                else {}
+            ),
+            **(
+                {"candidate_pool": {"total": result.pruning.total, "kept": result.pruning.kept}}
+                if result.pruning is not None
+                else {}
+            ),
+            **({"solver": asdict(result.stats)} if result.stats is not None else {}),
             "captain": _enrich(result.captain),
             "vice_captain": _enrich(result.vice_captain),
             "starting_11": [_enrich(p) for p in result.starting_11],
             "bench": [_enrich(p) for p in result.bench],
             "squad": [_enrich(p) for p in result.squad],
         }
+        if others:
+            best_ids = {p["id"] for p in result.squad}
+            payload["alternatives"] = [
+                {
+                    "rank": rank,
+                    "gap_to_best": alt.gap_to_best,
+                    "total_cost": alt.total_cost,
+                    "total_projected_points": alt.total_projected_points,
+                    "captain": alt.captain["name"],
+                    "players_in": [p["name"] for p in alt.squad if p["id"] not in best_ids],
+                    "players_out": [p["name"] for p in result.squad if p["id"] not in {q["id"] for q in alt.squad}],
+                }
+                for rank, alt in enumerate(others, start=2)
+            ]
         return json.dumps(payload, indent=2)
 
 
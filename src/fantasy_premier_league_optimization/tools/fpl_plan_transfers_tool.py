@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, List, Optional, Sequence, Type
+
+from crewai.tools import BaseTool
+from pydantic import BaseModel, Field
+
+from fantasy_premier_league_optimization.fpl.models import DEFAULT_MODEL, available_models
+from fantasy_premier_league_optimization.fpl.planner import plan_transfers_for_snapshot
+
+
+class FPLPlanTransfersInput(BaseModel):
+    current_squad_ids: List[int] = Field(..., description="FPL element ids of the 15 players currently owned.")
+    bank: float = Field(0.0, description="Money in the bank in £m (e.g., 0.5).")
+    free_transfers: int = Field(1, description="Free transfers available for the next gameweek (1-5).")
+    horizon_gameweeks: int = Field(5, description="How many upcoming gameweeks to plan.")
+    projection_model: str = Field(
+        DEFAULT_MODEL,
+        description=f"Projection model: one of {', '.join(available_models())}.",
+    )
+    max_transfers_per_gameweek: int | None = Field(None, description="Optional cap on transfers in any gameweek.")
+    force_refresh: bool = Field(False, description="Force refresh instead of reading cached API payload.")
+
+
+class FPLPlanTransfersTool(BaseTool):
+    name: str = "fpl_plan_transfers"
+    description: str = (
+        "Plan weekly FPL transfers from an existing squad over the next N gameweeks (rolling free transfers, "
+        "-4 hits, budget, max 3 per team). Returns JSON with transfers, XI and captain per gameweek."
+    )
+    args_schema: Type[BaseModel] = FPLPlanTransfersInput
+
+    def _run(
+        self,
+        current_squad_ids: Sequence[int],
+        bank: float = 0.0,
+        free_transfers: int = 1,
+        horizon_gameweeks: int = 5,
+        projection_model: str = DEFAULT_MODEL,
+        max_transfers_per_gameweek: Optional[int] = None,
+        force_refresh: bool = False,
+    ) -> str:
+        plan = plan_transfers_for_snapshot(
+            [int(i) for i in current_squad_ids],
+            bank=float(bank),
+            free_transfers=int(free_transfers),
+            horizon_gameweeks=int(horizon_gameweeks),
+            projection_model=str(projection_model),
+            max_transfers_per_gameweek=max_transfers_per_gameweek,
+            force_refresh=force_refresh,
+        )
+
+        def _names(players: Sequence[Dict[str, Any]]) -> List[str]:
+            return [str(p["name"]) for p in players]
+
+        payload: Dict[str, Any] = {
+            "horizon_gameweeks": len(plan.gameweeks),
+            "total_projected_points": round(plan.total_projected_points, 2),
+            "total_hits": plan.total_hits,
+            "gameweeks": [
+                {
+                    "event": gw.event,
+                    "free_transfers": gw.free_transfers,
+                    "hits": gw.hits,
+                    "transfers_out": _names(gw.transfers_out),
+                    "transfers_in": _names(gw.transfers_in),
+                    "captain": gw.captain["name"],
+                    "starting_11": _names(gw.starting_11),
+                    "bench": _names(gw.bench),
+                    "bank": gw.bank,
+                    "projected_points": round(gw.projected_points, 2),
+                }
+                for gw in plan.gameweeks
+            ],
+        }
+        return json.dumps(payload, indent=2)
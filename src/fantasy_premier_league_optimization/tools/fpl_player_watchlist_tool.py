@@ -1,19 +1,21 @@
 from __future__ import annotations
 
 import json
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Type
 
 import pandas as pd
 from crewai.tools import BaseTool
 from pydantic import BaseModel, Field
 
-from fantasy_premier_league_optimization.fpl.api import bootstrap_static, team_mapping
+from fantasy_premier_league_optimization.fpl.api import bootstrap_sections, iter_bootstrap_elements, team_mapping
 from fantasy_premier_league_optimization.fpl.scoring import (
     player_cost_millions,
     player_name,
     position_short,
+    project_points_batch,
     status_label,
 )
+from fantasy_premier_league_optimization.fpl.projections import load_projection_matrix
 
 
 class FPLPlayerWatchlistInput(BaseModel):
@@ -24,9 +26,84 @@ class FPLPlayerWatchlistInput(BaseModel):
         None,
         description="Optional JSON (from fpl_fixture_outlook) containing {team_multipliers: {team_id: multiplier}}.",
     )
+    projection_horizon: int | None = Field(
+        None,
+        description="If set, Projected_Points covers this many upcoming gameweeks using per-gameweek fixtures.",
+    )
     force_refresh: bool = Field(False, description="Force refresh instead of reading cached API payload.")
 
 
+# Element fields read by `watchlist_rows` (for `iter_bootstrap_elements(fields=...)`).
+WATCHLIST_FIELDS: Sequence[str] = (
+    "id",
+    "element_type",
+    "team",
+    "status",
+    "first_name",
+    "second_name",
+    "web_name",
+    "now_cost",
+    "minutes",
+    "total_points",
+    "form",
+    "points_per_game",
+    "ep_next",
+    "selected_by_percent",
+    "ict_index",
+    "threat",
+    "creativity",
+    "influence",
+)
+
+
+def watchlist_rows(
+    elements: Iterable[Mapping[str, Any]],
+    teams: Mapping[int, Mapping[str, Any]],
+    *,
+    min_minutes: int,
+    allow_flagged_players: bool,
+) -> List[Dict[str, Any]]:
+    """
+    Flatten eligible elements into watchlist rows. Accepts any iterable, including the
+    streaming `iter_bootstrap_elements` generator.
+    """
+    rows: List[Dict[str, Any]] = []
+    for e in elements:
+        pos = position_short(int(e.get("element_type") or 0))
+        if pos is None:
+            continue
+        minutes = int(e.get("minutes") or 0)
+        if minutes < int(min_minutes):
+            continue
+        if not allow_flagged_players and status_label(e) != "available":
+            continue
+        team = teams.get(int(e.get("team") or 0), {}).get("name", "")
+        team_id = int(e.get("team") or 0)
+        rows.append(
+            {
+                "Element_ID": int(e.get("id") or 0),
+                "Name": player_name(e),
+                "Team": team,
+                "Team_ID": team_id,
+                "Position": pos,
+                "Price": player_cost_millions(e),
+                "Total_Points": int(e.get("total_points") or 0),
+                "Form": float(e.get("form") or 0.0),
+                "Points_per_game": float(e.get("points_per_game") or 0.0),
+                "ep_next": float(e.get("ep_next") or 0.0),
+                "Minutes": minutes,
+                "Injury_or_flag_status": status_label(e),
+                "Ownership_%": float(e.get("selected_by_percent") or 0.0),
+                # Official “underlying-ish” proxies
+                "ICT_Index": float(e.get("ict_index") or 0.0),
+                "Threat": float(e.get("threat") or 0.0),
+                "Creativity": float(e.get("creativity") or 0.0),
+                "Influence": float(e.get("influence") or 0.0),
+            }
+        )
+    return rows
+
+
 class FPLPlayerWatchlistTool(BaseTool):
     name: str = "fpl_player_watchlist"
     description: str = (
@@ -63,11 +140,12 @@ class FPLPlayerWatchlistTool(BaseTool):
         min_minutes: int = 180,
         allow_flagged_players: bool = False,
         team_multipliers_json: str | None = None,
+        projection_horizon: int | None = None,
         force_refresh: bool = False,
     ) -> str:
-        boot = bootstrap_static(force_refresh=force_refresh)
-        teams = team_mapping(boot)
-        elements = boot.get("elements", [])
+        teams = team_mapping(bootstrap_sections("teams", force_refresh=force_refresh))
+        # one element at a time, only the fields the rows read (the refresh above already ran)
+        elements = iter_bootstrap_elements(fields=WATCHLIST_FIELDS)
 
         multipliers: Dict[int, float] = {}
         if team_multipliers_json:
@@ -78,44 +156,33 @@ class FPLPlayerWatchlistTool(BaseTool):
             except Exception:
                 multipliers = {}
 
-        rows: List[Dict[str, Any]] = []
-        for e in elements:
-            pos = position_short(int(e.get("element_type") or 0))
-            if pos is None:
-                continue
-            minutes = int(e.get("minutes") or 0)
-            if minutes < int(min_minutes):
-                continue
-            if not allow_flagged_players and status_label(e) != "available":
-                continue
-            team = teams.get(int(e.get("team") or 0), {}).get("name", "")
-            team_id = int(e.get("team") or 0)
-            rows.append(
-                {
-                    "Name": player_name(e),
-                    "Team": team,
-                    "Team_ID": team_id,
-                    "Position": pos,
-                    "Price": player_cost_millions(e),
-                    "Total_Points": int(e.get("total_points") or 0),
-                    "Form": float(e.get("form") or 0.0),
-                    "Points_per_game": float(e.get("points_per_game") or 0.0),
-                    "ep_next": float(e.get("ep_next") or 0.0),
-                    "Minutes": minutes,
-                    "Injury_or_flag_status": status_label(e),
-                    "Ownership_%": float(e.get("selected_by_percent") or 0.0),
-                    # Official “underlying-ish” proxies
-                    "ICT_Index": float(e.get("ict_index") or 0.0),
-                    "Threat": float(e.get("threat") or 0.0),
-                    "Creativity": float(e.get("creativity") or 0.0),
-                    "Influence": float(e.get("influence") or 0.0),
-                }
-            )
+        rows = watchlist_rows(
+            elements,
+            teams,
+            min_minutes=int(min_minutes),
+            allow_flagged_players=bool(allow_flagged_players),
+        )
 
         df = pd.DataFrame(rows)
         if df.empty:
             return "No players found after filtering. Try lowering min_minutes."
 
+        # next-GW projection from the shared engine (same numbers the optimizer uses)
+        df["Projected_Points"] = project_points_batch(
+            {
+                "team": df["Team_ID"].to_numpy(),
+                "ep_next": df["ep_next"].to_numpy(),
+                "points_per_game": df["Points_per_game"].to_numpy(),
+                "form": df["Form"].to_numpy(),
+                "minutes": df["Minutes"].to_numpy(),
+            },
+            horizon_gameweeks=1,
+            team_multipliers=multipliers,
+        ).round(2)
+        if projection_horizon:
+            by_element = load_projection_matrix(force_refresh=force_refresh).by_element(int(projection_horizon))
+            df["Projected_Points"] = df["Element_ID"].map(by_element).fillna(0.0).round(2)
+
         # crude value score: ep_next + form + ppg, adjusted by price
         df["ValueScore"] = (df["ep_next"] + 0.8 * df["Form"] + 0.6 * df["Points_per_game"]) / df["Price"].clip(
             lower=4.0
@@ -153,7 +220,7 @@ class FPLPlayerWatchlistTool(BaseTool):
             ],
         )
 
-        payload = df.drop(columns=["Team_ID"], errors="ignore").to_dict(orient="records")
+        payload = df.drop(columns=["Team_ID", "Element_ID"], errors="ignore").to_dict(orient="records")
         return md + "\n\n```json\n" + json.dumps(payload, indent=2) + "\n```\n"
 
 
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Sequence
+
+import pytest
+
+
+class FakeFPLServer:
+    """
+    Local stand-in for the FPL API: serves `routes` (path -> JSON payload) with ETags,
+    honours If-None-Match and gzip, and records every request it sees.
+    """
+
+    def __init__(self) -> None:
+        self.routes: Dict[str, Any] = {}
+        self.requests: List[Dict[str, Any]] = []
+        self.fail_next: int = 0
+        self.delay_seconds: float = 0.0
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _handler(self) -> type:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args: Any) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                path = self.path.split("?", 1)[0]
+                server.requests.append({"path": self.path, "headers": dict(self.headers)})
+                if server.delay_seconds:
+                    time.sleep(server.delay_seconds)
+                if server.fail_next > 0:
+                    server.fail_next -= 1
+                    self._send(503, b"")
+                    return
+                if path not in server.routes:
+                    self._send(404, b"")
+                    return
+                body = json.dumps(server.routes[path]).encode("utf-8")
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                headers = {"ETag": etag, "Content-Type": "application/json"}
+                if "gzip" in (self.headers.get("Accept-Encoding") or ""):
+                    body = gzip.compress(body)
+                    headers["Content-Encoding"] = "gzip"
+                self._send(200, body, headers)
+
+            def _send(self, status: int, body: bytes, headers: Dict[str, str] | None = None) -> None:
+                self.send_response(status)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+        return Handler
+
+    def start(self) -> "FakeFPLServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def fake_fpl(monkeypatch: pytest.MonkeyPatch):
+    server = FakeFPLServer().start()
+    monkeypatch.setenv("FPL_API_BASE_URL", server.base_url)
+    try:
+        yield server
+    finally:
+        server.stop()
+
+
+POSITIONS = ("GK", "DEF", "MID", "FWD")
+
+
+def build_pool(
+    counts: Sequence[int] = (4, 10, 10, 6),
+    *,
+    teams: int = 10,
+    cost: Callable[[int], float] = lambda i: 4.0 + (i % 5) * 0.5,
+    points: Callable[[int], float] = lambda i: float(i % 7 + 1),
+) -> List[Dict[str, Any]]:
+    """Synthetic optimizer players: ids from 1 in GK, DEF, MID, FWD order, player i in club `i % teams + 1`."""
+    positions = [pos for pos, n in zip(POSITIONS, counts) for _ in range(n)]
+    return [
+        {
+            "id": i,
+            "name": f"P{i}",
+            "team_id": i % teams + 1,
+            "position": pos,
+            "cost": cost(i),
+            "projected_points": points(i),
+            "selected_by_percent": 10.0,
+        }
+        for i, pos in enumerate(positions, start=1)
+    ]
+
+
+def first_squad(players: Sequence[Dict[str, Any]]) -> List[int]:
+    """Ids of the first 2 GK, 5 DEF, 5 MID and 3 FWD in `players`."""
+    left = {"GK": 2, "DEF": 5, "MID": 5, "FWD": 3}
+    owned = []
+    for p in players:
+        if left[p["position"]]:
+            left[p["position"]] -= 1
+            owned.append(p["id"])
+    return owned
+
+
+@pytest.fixture
+def make_pool():
+    return build_pool
+
+
+@pytest.fixture
+def flat_pool() -> List[Dict[str, Any]]:
+    """22 players, each in their own club, all at £5.0m (planner / chip tests set the points)."""
+    return build_pool((3, 7, 7, 5), teams=22, cost=lambda i: 5.0, points=lambda i: 0.0)
+
+
+@pytest.fixture
+def flat_squad(flat_pool) -> List[int]:
+    return first_squad(flat_pool)
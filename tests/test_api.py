@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+
+from fantasy_premier_league_optimization.fpl.api import (
+    CacheConfig,
+    bootstrap_columns,
+    bootstrap_sections,
+    cache_stats,
+    get_json,
+    iter_bootstrap_elements,
+)
+
+
+def test_get_json_revalidates_with_etag_and_touches_cache(fake_fpl, tmp_path):
+    fake_fpl.routes["/bootstrap-static/"] = {"elements": [{"id": 1}]}
+    cache = CacheConfig(cache_dir=tmp_path, ttl_seconds=0)
+
+    assert get_json("bootstrap-static/", cache=cache) == {"elements": [{"id": 1}]}
+    first = fake_fpl.requests[-1]["headers"]
+    assert "gzip" in first.get("Accept-Encoding", "")
+    assert "If-None-Match" not in first
+
+    cache_path = tmp_path / "bootstrap-static.json"
+    os.utime(cache_path, (0, 0))
+    assert get_json("bootstrap-static/", cache=cache) == {"elements": [{"id": 1}]}
+    assert fake_fpl.requests[-1]["headers"].get("If-None-Match")
+    assert cache_path.stat().st_mtime > 0  # 304 restarted the TTL clock
+
+    fake_fpl.routes["/bootstrap-static/"] = {"elements": [{"id": 2}]}
+    assert get_json("bootstrap-static/", cache=cache) == {"elements": [{"id": 2}]}
+
+
+def test_get_json_retries_transient_errors(fake_fpl, tmp_path):
+    fake_fpl.routes["/fixtures/"] = [{"id": 1}]
+    fake_fpl.fail_next = 1
+    cache = CacheConfig(cache_dir=tmp_path)
+
+    assert get_json("fixtures/", cache=cache) == [{"id": 1}]
+    assert len(fake_fpl.requests) == 2
+
+
+def test_bootstrap_columns_compiled_on_refresh(fake_fpl, tmp_path):
+    fake_fpl.routes["/bootstrap-static/"] = {
+        "elements": [
+            {"id": 1, "now_cost": 55, "form": "3.5", "web_name": "Raya", "status": "a"},
+            {"id": 2, "now_cost": 140, "form": None, "web_name": "Haaland", "status": "d"},
+        ]
+    }
+    cache = CacheConfig(cache_dir=tmp_path)
+    get_json("bootstrap-static/", cache=cache)
+    assert (tmp_path / "bootstrap-static.npz").exists()
+
+    cols = bootstrap_columns(cache=cache)
+    assert len(cols) == 2
+    assert cols["now_cost"].tolist() == [55, 140]
+    assert cols["form"][0] == 3.5 and math.isnan(cols["form"][1])
+    assert cols["web_name"].tolist() == ["Raya", "Haaland"]
+    assert cols["status"].tolist() == ["a", "d"]
+
+
+def test_concurrent_stale_refreshes_collapse_into_one_fetch(fake_fpl, tmp_path):
+    fake_fpl.routes["/fixtures/"] = [{"id": 2}]
+    fake_fpl.delay_seconds = 0.2
+    (tmp_path / "fixtures.json").write_text('[{"id": 1}]')
+    os.utime(tmp_path / "fixtures.json", (0, 0))
+    cache = CacheConfig(cache_dir=tmp_path, ttl_seconds=60)
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(get_json("fixtures/", cache=cache))) for _ in range(6)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == [[{"id": 2}]] * 6
+    assert len(fake_fpl.requests) == 1
+
+
+def test_stale_while_revalidate_serves_old_copy(fake_fpl, tmp_path):
+    fake_fpl.routes["/fixtures/"] = [{"id": 2}]
+    path = tmp_path / "fixtures.json"
+    path.write_text('[{"id": 1}]')
+    os.utime(path, (time.time() - 120, time.time() - 120))
+    cache = CacheConfig(cache_dir=tmp_path, ttl_seconds=60, stale_while_revalidate_seconds=3600)
+
+    assert get_json("fixtures/", cache=cache) == [{"id": 1}]
+    deadline = time.time() + 5
+    while time.time() < deadline and get_json("fixtures/", cache=cache) != [{"id": 2}]:
+        time.sleep(0.05)
+    assert get_json("fixtures/", cache=cache) == [{"id": 2}]
+
+
+def test_cache_keys_include_params_and_lru_evicts_past_size_cap(fake_fpl, tmp_path):
+    for i in range(1, 5):
+        fake_fpl.routes[f"/element-summary/{i}/"] = {"history": [i] * 400}
+    fake_fpl.routes["/fixtures/"] = [{"id": 1}]
+    cache = CacheConfig(cache_dir=tmp_path, max_bytes=2500, compress=False, endpoint_ttls={"fixtures": 0})
+
+    get_json("fixtures/", cache=cache, params={"event": 1})
+    get_json("fixtures/", cache=cache, params={"event": 2})
+    assert len([p for p in tmp_path.glob("fixtures__q*.json") if ".meta" not in p.name]) == 2
+
+    for i in range(1, 5):
+        get_json(f"element-summary/{i}/", cache=cache)
+    get_json("element-summary/4/", cache=cache)  # hit
+    stats = cache_stats(cache)
+    assert stats["evictions"] > 0 and stats["total_bytes"] <= 2500
+    assert stats["hits"] == 1
+    assert (tmp_path / "element-summary__4.json").exists()
+    assert not (tmp_path / "element-summary__1.json").exists()
+    assert (tmp_path / "element-summary__1.json.lock").exists()  # may be flock-held by another process
+    assert cache.ttl_for("fixtures/") == 0 and cache.ttl_for("element-summary/1/") == cache.ttl_seconds
+
+
+def test_fresh_hits_reuse_the_index_connection_and_batch_writes(fake_fpl, tmp_path, monkeypatch):
+    from fantasy_premier_league_optimization.fpl import cache_index
+
+    fake_fpl.routes["/fixtures/"] = [{"id": 1}]
+    cache = CacheConfig(cache_dir=tmp_path, ttl_seconds=3600)
+    get_json("fixtures/", cache=cache)
+
+    opened, writes = [], []
+    write = cache_index.CacheIndex._write_touches
+    monkeypatch.setattr(cache_index.sqlite3, "connect", lambda *a, **k: opened.append(a))
+    monkeypatch.setattr(cache_index.CacheIndex, "_write_touches", lambda *a: writes.append(a[2]) or write(*a))
+    for _ in range(20):
+        get_json("fixtures/", cache=cache)
+    assert not opened and len(writes) == 1  # only the first touch in the interval is written
+    monkeypatch.undo()
+    assert cache_stats(cache)["hits"] == 20
+
+
+def test_pending_touches_are_written_at_exit(tmp_path):
+    import subprocess
+    import sys
+    import textwrap
+
+    from fantasy_premier_league_optimization.fpl.cache_index import CacheIndex
+
+    script = textwrap.dedent(
+        f"""
+        from pathlib import Path
+        from fantasy_premier_league_optimization.fpl.cache_index import CacheIndex
+
+        index, path = CacheIndex(Path({str(tmp_path)!r})), Path({str(tmp_path / "fixtures.json")!r})
+        path.write_text("[]")
+        index.record("fixtures", path, endpoint="fixtures/", params=None, max_bytes=None)
+        for _ in range(3):
+            index.touch("fixtures", path, endpoint="fixtures/", params=None, counter="hits")
+        """
+    )
+    subprocess.run([sys.executable, "-c", script], check=True)
+    stats = CacheIndex(tmp_path).stats()
+    assert stats["hits"] == 3 and stats["by_endpoint"]["fixtures"]["hits"] == 3
+
+
+def test_bootstrap_elements_stream_from_the_cache(fake_fpl, tmp_path):
+    elements = [{"id": i, "web_name": f"P{i}", "now_cost": 50 + i, "news": "x" * 50} for i in range(1, 4)]
+    fake_fpl.routes["/bootstrap-static/"] = {"events": [{"id": 1}], "elements": elements, "teams": [{"id": 1}]}
+    cache = CacheConfig(cache_dir=tmp_path, compress=True)
+
+    stream = iter_bootstrap_elements(fields=("id", "now_cost"), cache=cache)
+    assert not fake_fpl.requests  # nothing fetched until the generator is consumed
+    assert next(stream) == {"id": 1, "now_cost": 51}
+    assert list(stream) == [{"id": 2, "now_cost": 52}, {"id": 3, "now_cost": 53}]
+    assert list(iter_bootstrap_elements(cache=cache)) == elements
+    assert bootstrap_sections("teams", cache=cache) == {"teams": [{"id": 1}]}
+    assert len(fake_fpl.requests) == 1  # later reads are cache hits
+
+
+def test_compressed_cache_round_trips(fake_fpl, tmp_path):
+    fake_fpl.routes["/bootstrap-static/"] = {"elements": [{"id": 1, "now_cost": 40}]}
+    cache = CacheConfig(cache_dir=tmp_path, compress=True)
+    assert get_json("bootstrap-static/", cache=cache) == {"elements": [{"id": 1, "now_cost": 40}]}
+    assert (tmp_path / "bootstrap-static.json.gz").exists()
+    assert get_json("bootstrap-static/", cache=cache) == {"elements": [{"id": 1, "now_cost": 40}]}
+    assert bootstrap_columns(cache=cache)["now_cost"].tolist() == [40]
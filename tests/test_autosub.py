@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.autosub import autosub_points, enumerate_lineups, plan_bench_order
+from fantasy_premier_league_optimization.fpl.optimizer import ALLOWED_FORMATIONS
+
+POSITIONS = ["GK"] * 2 + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+
+
+def test_autosubs_follow_gk_and_formation_rules():
+    lineups = enumerate_lineups(POSITIONS, np.arange(15, 0, -1))
+    starters = {2, 3, 4, 7, 8, 9, 10, 11, 12, 13}
+    row = next(
+        c
+        for c in range(len(lineups.gk))
+        if lineups.gk[c] == 0 and set(lineups.outfield[c]) == starters and tuple(lineups.bench[c]) == (14, 5, 6)
+    )
+    one = type(lineups)(**{f: getattr(lineups, f)[[row]] for f in lineups.__dataclass_fields__})
+
+    played = np.ones((3, 15), dtype=bool)
+    played[0, [0, 12]] = False  # GK and a FWD miss: bench GK and the bench FWD come on
+    played[1, 2] = False  # a DEF misses: the FWD would leave 2 DEF, so the first bench DEF comes on
+    played[2, [0, 1, 7]] = False  # both GKs miss; a MID is replaced by the FWD
+    points = np.full((3, 15), 2.0, dtype=np.float32)
+    points[:, 1], points[:, 14] = 3.0, 5.0
+    assert autosub_points(one, points, played)[0].tolist() == [8.0, 2.0, 5.0]
+
+
+def test_plan_bench_order_beats_projection_order(make_pool):
+    squad = make_pool((2, 5, 5, 3), points=lambda i: float(i % 6 + 2))
+    elements = [
+        {
+            "id": i,
+            "points_per_game": str(i % 6 + 2),
+            "form": "3.0",
+            "total_points": 40,
+            "chance_of_playing_next_round": 25 if i in (4, 9, 13) else None,
+        }
+        for i in range(1, 16)
+    ]
+    plan = plan_bench_order(squad, elements, n_samples=1500, seed=5)
+    again = plan_bench_order(squad, elements, n_samples=1500, seed=5)
+
+    assert plan == again and plan.candidates == len(enumerate_lineups(POSITIONS, [0.0] * 15).gk)
+    assert plan.expected_points >= plan.baseline_expected_points - 1e-6
+    assert {p["id"] for p in plan.starting_11 + plan.bench} == set(range(1, 16))
+    assert plan.bench[0]["position"] == "GK" and plan.captain in plan.starting_11
+    formation = tuple(sum(p["position"] == pos for p in plan.starting_11) for pos in ("DEF", "MID", "FWD"))
+    assert formation in ALLOWED_FORMATIONS and plan.vice_captain != plan.captain
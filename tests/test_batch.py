@@ -0,0 +1,20 @@
+from fantasy_premier_league_optimization.fpl.batch import BatchPool, Scenario, scenario_grid, solve_scenario
+from fantasy_premier_league_optimization.fpl.optimizer import validate_squad
+
+
+def test_scenario_grid_collapses_template_weights():
+    grid = scenario_grid(horizons=[1, 3], risk_profiles=["template", "differential"], differential_weights=[0.1, 0.3])
+    assert len(grid) == 2 * (1 + 2)
+    assert {s.differential_weight for s in grid if s.risk_profile == "template"} == {Scenario.differential_weight}
+
+
+def test_solve_scenario_uses_horizon_points(make_pool):
+    players = make_pool(points=lambda i: 0.0)
+    points = {h: {p["id"]: float(p["id"] % 7 + 1) * h for p in players} for h in (1, 2)}
+    pool = BatchPool(players=players, points=points, must_include_groups=[[2]])
+
+    one = solve_scenario(pool, Scenario(horizon_gameweeks=1, budget=80.0))
+    two = solve_scenario(pool, Scenario(horizon_gameweeks=2, budget=80.0))
+    validate_squad(one["squad"], budget=80.0, max_from_team=3)
+    assert 2 in {p["id"] for p in one["squad"]}
+    assert abs(two["total_projected_points"] - 2 * one["total_projected_points"]) < 1e-9
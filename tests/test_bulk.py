@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import json
+
+from fantasy_premier_league_optimization.fpl.api import CacheConfig
+from fantasy_premier_league_optimization.fpl.bulk import fetch_element_summaries
+
+
+def test_bulk_fetch_caches_and_resumes(fake_fpl, tmp_path):
+    for i in range(1, 31):
+        fake_fpl.routes[f"/element-summary/{i}/"] = {"history": [{"element": i}]}
+    cache = CacheConfig(cache_dir=tmp_path / "cache")
+    progress = tmp_path / "progress.json"
+
+    res = fetch_element_summaries(range(1, 31), cache=cache, concurrency=4, rate_per_second=500, progress_path=progress)
+    assert res.fetched == 30 and not res.failed
+    assert res.payloads[7] == {"history": [{"element": 7}]}
+    assert not progress.exists()
+
+    # Expired cache, but an interrupted run had already completed ids 1..10.
+    stale = CacheConfig(cache_dir=tmp_path / "cache", ttl_seconds=0)
+    progress.write_text(json.dumps({"completed": list(range(1, 11))}))
+    before = len(fake_fpl.requests)
+    res = fetch_element_summaries(range(1, 31), cache=stale, rate_per_second=500, progress_path=progress)
+    assert res.from_cache == 10 and res.fetched == 20
+    assert len(fake_fpl.requests) - before == 20
@@ -0,0 +1,47 @@
+from __future__ import annotations
+
+import numpy as np
+
+from fantasy_premier_league_optimization.fpl.chips import Chip, available_chips, lineup_points, plan_chips
+
+
+def test_available_chips_drops_played_and_expired():
+    meta = [
+        {"id": 1, "name": "wildcard", "start_event": 2, "stop_event": 19},
+        {"id": 2, "name": "wildcard", "start_event": 20, "stop_event": 38},
+        {"id": 7, "name": "bboost", "start_event": 20, "stop_event": 38},
+        {"id": 8, "name": "3xc", "start_event": 20, "stop_event": 38},
+    ]
+    chips = available_chips(meta, from_event=22, played=[("3xc", 21), ("wildcard", 4)])
+    assert [c.id for c in chips] == [2, 7]
+
+
+def test_lineup_points_picks_best_formation_and_captain():
+    positions = ["GK", "GK"] + ["DEF"] * 5 + ["MID"] * 5 + ["FWD"] * 3
+    points = np.array([[2, 1], [1, 3]] + [[1, 1]] * 5 + [[5, 1]] * 5 + [[0, 9]] * 3, dtype=float)
+    xi, captain, bench = lineup_points(points, positions)
+    # GW1: 3-5-2 with both blank forwards on 0 -> 2 + 3 + 25 + 0; GW2: 3-4-3
+    assert xi.tolist() == [30.0, 3 + 3 + 4 + 27]
+    assert captain.tolist() == [5.0, 9.0]
+    assert bench.tolist() == [points[:, 0].sum() - 30.0, points[:, 1].sum() - 37.0]
+
+
+def test_plan_chips_one_per_gameweek_in_windows(flat_pool, flat_squad):
+    players, owned = flat_pool, flat_squad
+    points = {p["id"]: [2.0, 2.0, 2.0, 2.0] for p in players}
+    for i in owned:  # gameweek 2 is a double for the owned squad: bench boost there
+        points[i][1] = 6.0
+    points[owned[5]][2] = 20.0  # triple captain in gameweek 3
+    points[21][3] = 15.0  # an unowned forward hauls in gameweek 4: free hit
+    chips = [
+        Chip(id=3, name="freehit", start_event=1, stop_event=4),
+        Chip(id=4, name="bboost", start_event=1, stop_event=4),
+        Chip(id=5, name="3xc", start_event=1, stop_event=4),
+    ]
+    plan = plan_chips(
+        players, points, events=[1, 2, 3, 4], chips=chips, current_squad=owned, bank=0.0, max_workers=1
+    )
+    assert [(o.event, o.chip.name) for o in plan.plays] == [(2, "bboost"), (3, "3xc"), (4, "freehit")]
+    assert plan.plays[-1].squad is not None and 21 in plan.plays[-1].squad
+    # free hit: the hauler starts and captains in place of a 2-point forward / captain
+    assert abs(plan.total_gain - (4 * 6.0 + 20.0 + (15.0 - 2.0) * 2)) < 1e-6
@@ -0,0 +1,120 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+
+import pytest
+
+from fantasy_premier_league_optimization.fpl.fixtures import (
+    FixtureIndex,
+    _fixture_team_difficulty,
+    compute_fixture_outlook,
+    compute_fixture_sweep,
+    upcoming_fixtures_for_team,
+)
+from fantasy_premier_league_optimization.fpl.scoring import player_projection_points
+
+
+DATA = Path(__file__).resolve().parents[1] / "data" / "cache"
+
+
+def _reference(teams, fixtures_payload, from_event, horizon):
+    # per-team rescan, as the outlook used to be computed
+    out = {}
+    for team_id in teams:
+        upcoming = upcoming_fixtures_for_team(fixtures_payload, team_id, from_event=from_event, horizon_events=horizon)
+        diffs = [int(d) for d in (_fixture_team_difficulty(fx, team_id) for fx in upcoming) if d is not None]
+        events = [fx["event"] for fx in upcoming]
+        avg = sum(diffs) / max(1, len(diffs))
+        mult = max(0.80, min(1.20, 1.15 - (avg - 1.0) * 0.075)) if upcoming else 1.0
+        out[team_id] = (
+            round(avg, 2) if upcoming else 99.0,
+            sum(d <= 2 for d in diffs),
+            sum(d >= 4 for d in diffs),
+            len(set(events)) < len(events),
+            mult,
+        )
+    return out
+
+
+@pytest.fixture(scope="module")
+def season():
+    boot = json.loads((DATA / "bootstrap-static.json").read_text(encoding="utf-8"))
+    fixtures_payload = json.loads((DATA / "fixtures.json").read_text(encoding="utf-8"))
+    teams = {t["id"]: t for t in boot["teams"]}
+    return teams, fixtures_payload
+
+
+def test_index_matches_per_team_scan(season):
+    teams, fixtures_payload = season
+    index = FixtureIndex(fixtures_payload, team_ids=teams.keys())
+    for from_event in (None, 1, 22, 36, 40):
+        for horizon in (1, 5, 38):
+            rows, mult = compute_fixture_outlook(
+                teams=teams,
+                fixtures_payload=fixtures_payload,
+                from_event=from_event,
+                horizon_events=horizon,
+                index=index,
+            )
+            by_name = {r.team: r for r in rows}
+            for team_id, (score, good, bad, dgw, m) in _reference(teams, fixtures_payload, from_event, horizon).items():
+                row = by_name[teams[team_id]["name"]]
+                assert (row.fixture_difficulty_score, row.number_of_good_fixtures, row.number_of_bad_fixtures) == (
+                    score,
+                    good,
+                    bad,
+                )
+                assert ("DGW" in row.special_notes) == dgw
+                assert mult[team_id] == pytest.approx(m)
+
+
+def test_double_gameweek_detected():
+    teams = {1: {"name": "A"}, 2: {"name": "B"}, 3: {"name": "C"}}
+    fixtures_payload = [
+        {"event": 3, "team_h": 1, "team_a": 2, "team_h_difficulty": 2, "team_a_difficulty": 4},
+        {"event": 3, "team_h": 3, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 3},
+        {"event": None, "team_h": 2, "team_a": 3, "team_h_difficulty": 2, "team_a_difficulty": 2},
+    ]
+    rows, mult = compute_fixture_outlook(teams=teams, fixtures_payload=fixtures_payload, from_event=3, horizon_events=1)
+    by_name = {r.team: r for r in rows}
+    assert by_name["A"].special_notes == "Potential DGW in horizon"
+    assert by_name["A"].fixture_difficulty_score == 2.5
+    assert by_name["B"].special_notes == ""
+    assert mult[1] > mult[2]
+
+
+def test_sweep_matches_single_windows(season):
+    teams, fixtures_payload = season
+    sweep = compute_fixture_sweep(
+        teams=teams, fixtures_payload=fixtures_payload, from_events=[1, 21, 37], horizons=range(1, 9)
+    )
+    assert sweep.multiplier.shape == (3, 8, len(teams))
+    for from_event in (1, 21, 37):
+        for horizon in range(1, 9):
+            _, mult = compute_fixture_outlook(
+                teams=teams, fixtures_payload=fixtures_payload, from_event=from_event, horizon_events=horizon
+            )
+            assert sweep.multipliers(from_event, horizon) == pytest.approx(mult)
+    compact = sweep.to_compact()
+    assert compact["horizons"] == list(range(1, 9))
+    assert len(compact["score"][2][7]) == len(teams)
+
+
+def test_fixture_vectors_price_blanks_and_doubles():
+    fixtures_payload = [
+        {"event": 1, "team_h": 1, "team_a": 2, "team_h_difficulty": 3, "team_a_difficulty": 3},
+        {"event": 2, "team_h": 1, "team_a": 3, "team_h_difficulty": 1, "team_a_difficulty": 5},
+        {"event": 2, "team_h": 2, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 5},
+        {"event": 3, "team_h": 2, "team_a": 3, "team_h_difficulty": 3, "team_a_difficulty": 3},
+    ]
+    vectors = FixtureIndex(fixtures_payload, team_ids=[1, 2, 3]).fixture_vectors(from_event=1, horizon_events=3)
+    assert vectors.fixture_count.tolist() == [[1, 2, 0], [1, 1, 1], [0, 1, 1]]
+    assert vectors.for_team(1).tolist() == pytest.approx([1.0, 1.15 + 0.85, 0.0])
+    assert vectors.difficulty[0, 1].tolist() == [1.0, 5.0]
+
+    element = {"ep_next": "2.0", "points_per_game": "0", "form": "0", "minutes": 1800}
+    flat = player_projection_points(element, horizon_gameweeks=3)
+    # single + double + blank sums to three fixtures' worth, same as three flat gameweeks
+    assert player_projection_points(element, horizon_gameweeks=3, fixture_vector=vectors.for_team(1)) == pytest.approx(flat)
+    assert player_projection_points(element, horizon_gameweeks=3, fixture_vector=[0.0, 0.0, 0.0]) == 0.0
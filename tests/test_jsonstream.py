@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+import io
+import json
+
+from fantasy_premier_league_optimization.fpl.jsonstream import JsonStream, iter_section_items, read_sections
+
+
+DOC = {
+    "events": [{"id": 1, "name": "GW 1"}],
+    "element_stats": [{"label": "x", "values": [1.5, -2e3, None, True]}],
+    "elements": [{"id": i, "web_name": f"P{i}", "form": "1.0", "now_cost": 40 + i} for i in range(50)],
+    "teams": [{"id": 1, "name": "Arsenal é"}],
+    "total_players": 123456789,
+}
+
+
+def test_streams_section_items_across_chunk_boundaries(tmp_path):
+    path = tmp_path / "bootstrap-static.json"
+    path.write_text(json.dumps(DOC, ensure_ascii=False), encoding="utf-8")
+
+    assert list(iter_section_items(path, "elements")) == DOC["elements"]
+    assert list(iter_section_items(path, "elements", fields=["id", "now_cost"]))[3] == {"id": 3, "now_cost": 43}
+    assert read_sections(path, ["teams", "total_players"]) == {"teams": DOC["teams"], "total_players": 123456789}
+
+    stream = JsonStream(io.StringIO(json.dumps(DOC)), chunk_size=7)
+    seen = {}
+    for key in stream.members():
+        if key == "total_players":
+            seen[key] = stream.value()
+        elif key == "elements":
+            seen[key] = sum(1 for _ in stream.items())
+    assert seen == {"elements": 50, "total_players": 123456789}
@@ -36,3 +36,154 @@ def test_validate_squad_rejects_too_many_from_team():
         assert True
 
 
+def test_squad_optimizer_mutate_and_resolve(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    opt = SquadOptimizer(make_pool(), budget=100.0)
+    base = opt.solve()
+    validate_squad(base.squad, budget=100.0, max_from_team=3)
+    picked = {p["id"] for p in base.squad}
+    left_out = next(p["id"] for p in make_pool() if p["id"] not in picked and p["position"] == "MID")
+
+    opt.force([left_out])
+    opt.exclude([next(iter(picked))])
+    forced = opt.solve()
+    assert left_out in {p["id"] for p in forced.squad}
+    assert forced.total_projected_points <= base.total_projected_points
+
+    opt.release()
+    opt.set_budget(70.0)
+    tight = opt.solve()
+    assert tight.total_cost <= 70.0
+    opt.set_budget(100.0)
+    assert opt.solve().total_projected_points == base.total_projected_points
+
+
+def test_set_projections_resolves_without_touching_caller_pool(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    pool = make_pool()
+    opt = SquadOptimizer(pool, budget=80.0)
+    base = opt.solve()
+    swapped = {p["id"]: float(30 - p["id"]) for p in pool}
+    opt.set_projections(swapped)
+    again = opt.solve()
+
+    fresh = SquadOptimizer([{**p, "projected_points": swapped[p["id"]]} for p in pool], budget=80.0).solve()
+    assert abs(again.objective - fresh.objective) < 1e-6
+    assert [p["projected_points"] for p in pool] == [p["projected_points"] for p in make_pool()]
+    assert all(p["projected_points"] == float(p["id"] % 7 + 1) for p in base.squad)
+
+
+def test_joint_lineup_model_beats_two_stage_lineup(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import ALLOWED_FORMATIONS, SquadOptimizer
+
+    legacy = SquadOptimizer(make_pool(), budget=80.0, bench_weight=None).solve()
+    joint = SquadOptimizer(make_pool(), budget=80.0, bench_weight=0.1).solve()
+    validate_squad(joint.squad, budget=80.0, max_from_team=3)
+
+    counts = {pos: sum(p["position"] == pos for p in joint.starting_11) for pos in ("GK", "DEF", "MID", "FWD")}
+    assert counts["GK"] == 1 and (counts["DEF"], counts["MID"], counts["FWD"]) in ALLOWED_FORMATIONS
+    assert joint.captain in joint.starting_11 and joint.bench[0]["position"] == "GK"
+    legacy_lineup = sum(p["projected_points"] for p in legacy.starting_11) + legacy.captain["projected_points"]
+    assert joint.lineup_projected_points >= legacy_lineup - 1e-9
+
+
+def test_bench_weight_must_be_a_fraction(make_pool):
+    import pytest
+
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    for bad in (-0.1, 1.5):
+        with pytest.raises(ValueError, match="bench_weight"):
+            SquadOptimizer(make_pool(), bench_weight=bad)
+
+
+def test_prune_dominated_players_keeps_optimum(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer, prune_dominated_players
+
+    pool = make_pool() + [
+        {**p, "id": 100 + p["id"], "cost": p["cost"] + 0.5, "projected_points": p["projected_points"] - 0.5}
+        for p in make_pool()
+    ]
+    kept, report = prune_dominated_players(pool, max_from_team=3, keep=[101])
+    assert report.total == len(pool) and report.kept == len(kept) < len(pool)
+    assert 101 in {p["id"] for p in kept}
+    full = SquadOptimizer(pool, budget=80.0).solve()
+    reduced = SquadOptimizer(kept, budget=80.0).solve()
+    assert abs(full.lineup_projected_points - reduced.lineup_projected_points) < 1e-9
+
+
+def test_top_k_squads_ranked_and_diverse(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer, top_k_squads
+
+    best = SquadOptimizer(make_pool(), budget=80.0).solve()
+    results = top_k_squads(make_pool(), k=3, min_difference=2, budget=80.0)
+    assert len(results) == 3
+    assert results[0].objective == best.objective and results[0].gap_to_best == 0.0
+    assert [r.gap_to_best for r in results] == sorted(r.gap_to_best for r in results)
+    squads = [{p["id"] for p in r.squad} for r in results]
+    assert all(15 - len(a & b) >= 2 for i, a in enumerate(squads) for b in squads[i + 1 :])
+
+
+def test_in_process_solver_matches_cbc(make_pool):
+    import random
+
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    rng = random.Random(7)
+    pool = [
+        {**p, "projected_points": rng.uniform(0, 10), "cost": rng.choice([4.0, 4.5, 5.5, 7.0, 9.5])}
+        for p in make_pool()
+    ]
+    for bench_weight in (None, 0.1):
+        results = {}
+        for solver in ("bnb", "cbc"):
+            opt = SquadOptimizer(pool, budget=75.0, bench_weight=bench_weight, solver=solver)
+            opt.force([3])
+            opt.exclude([5])
+            results[solver] = opt.solve()
+        assert abs(results["bnb"].objective - results["cbc"].objective) < 1e-6
+        assert 3 in {p["id"] for p in results["bnb"].squad} and 5 not in {p["id"] for p in results["bnb"].squad}
+        validate_squad(results["bnb"].squad, budget=75.0, max_from_team=3)
+
+
+def test_bnb_matches_cbc_on_random_pools():
+    import random
+
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    positions = ["GK"] * 8 + ["DEF"] * 18 + ["MID"] * 20 + ["FWD"] * 14
+    for seed in range(12):
+        rng = random.Random(seed)
+        pool = []
+        for i, pos in enumerate(positions, start=1):
+            cost = rng.randint(8, 26) / 2
+            pool.append(
+                {
+                    "id": i,
+                    "name": f"P{i}",
+                    "team_id": rng.randint(1, 8),
+                    "position": pos,
+                    "cost": cost,
+                    "projected_points": round(cost * rng.uniform(0.3, 1.2), 1),
+                    "selected_by_percent": 10.0,
+                }
+            )
+        budget = float(rng.randint(100, 120))
+        bnb = SquadOptimizer(pool, budget=budget, solver="bnb").solve()
+        cbc = SquadOptimizer(pool, budget=budget, solver="cbc").solve()
+        assert bnb.stats.backend == "bnb" and abs(bnb.objective - cbc.objective) < 1e-6, seed
+
+
+def test_gap_limited_solve_reports_bound_and_stats(make_pool):
+    from fantasy_premier_league_optimization.fpl.optimizer import SquadOptimizer
+
+    exact = SquadOptimizer(make_pool(), budget=80.0).solve()
+    assert exact.stats.status == "optimal" and exact.stats.gap == 0.0
+    for solver in ("bnb", "cbc"):
+        loose = SquadOptimizer(make_pool(), budget=80.0, solver=solver, mip_gap=0.05).solve()
+        stats = loose.stats
+        assert stats.backend == solver and stats.status in ("optimal", "gap_limit") and stats.wall_seconds > 0
+        assert loose.objective <= exact.objective + 1e-9 <= stats.best_bound + 1e-6
+        assert stats.gap <= 0.05 + 1e-9
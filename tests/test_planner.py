@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from fantasy_premier_league_optimization.fpl import projections
+from fantasy_premier_league_optimization.fpl.planner import plan_transfers, plan_transfers_for_snapshot
+from fantasy_premier_league_optimization.fpl.snapshot import clear_snapshot_cache
+
+
+def test_plan_rolls_free_transfer_then_uses_it(flat_pool, flat_squad):
+    players, owned = flat_pool, flat_squad
+    points = {p["id"]: [2.0, 2.0, 2.0] for p in players}
+    # unowned midfielders (ids 16, 17) explode from GW2
+    points[16] = [0.0, 10.0, 10.0]
+    points[17] = [0.0, 10.0, 10.0]
+
+    plan = plan_transfers(
+        players, points, events=[1, 2, 3], current_squad=owned, bank=0.0, free_transfers=1, candidates_per_position=None
+    )
+    assert [g.free_transfers for g in plan.gameweeks][:2] == [1, 2]
+    assert plan.total_hits == 0
+    assert {p["id"] for p in plan.gameweeks[1].transfers_in} == {16, 17}
+    assert not plan.gameweeks[0].transfers_in
+    assert plan.gameweeks[1].captain["id"] in {16, 17}
+
+
+def test_plan_takes_hit_when_worth_it_and_respects_bank(flat_pool, flat_squad):
+    players, owned = flat_pool, flat_squad
+    points = {p["id"]: [1.0] for p in players}
+    points[16] = [20.0]
+    points[17] = [20.0]
+    plan = plan_transfers(players, points, events=[5], current_squad=owned, bank=0.0, free_transfers=1)
+    gw = plan.gameweeks[0]
+    assert gw.hits == 1 and len(gw.transfers_in) == 2
+    assert plan.total_projected_points == pytest.approx(gw.projected_points - 4.0)
+
+    players[15]["cost"] = 9.0  # can't afford id 16 any more
+    plan = plan_transfers(players, points, events=[5], current_squad=owned, bank=0.0, free_transfers=1)
+    assert {p["id"] for p in plan.gameweeks[0].transfers_in} == {17}
+
+
+def test_plan_lineups_use_allowed_formations(flat_pool, flat_squad):
+    players, owned = flat_pool, flat_squad
+    value = {"GK": 2.0, "DEF": 4.0, "MID": 10.0, "FWD": 1.0}
+    points = {p["id"]: [value[p["position"]]] for p in players}
+    # per-position bounds alone would start 4-5-1
+    plan = plan_transfers(players, points, events=[1], current_squad=owned, bank=0.0, max_transfers_per_gameweek=0)
+    xi = plan.gameweeks[0].starting_11
+    assert tuple(sum(p["position"] == pos for p in xi) for pos in ("DEF", "MID", "FWD")) == (3, 5, 2)
+
+
+def test_snapshot_plan_skips_a_finished_current_gameweek(tmp_path, monkeypatch, flat_pool, flat_squad):
+    types = {"GK": 1, "DEF": 2, "MID": 3, "FWD": 4}
+    elements = [
+        {"id": p["id"], "web_name": p["name"], "team": p["team_id"] % 10 + 1, "element_type": types[p["position"]],
+         "now_cost": 50, "status": "a", "points_per_game": "3.0", "form": "3.0", "minutes": 900}
+        for p in flat_pool
+    ]
+    events = [{"id": 21, "is_current": True, "finished": True}, {"id": 22, "is_next": True}, {"id": 23}]
+    fixtures = [
+        {"event": e, "team_h": t, "team_a": t + 1, "team_h_difficulty": 3, "team_a_difficulty": 3}
+        for e in (21, 22, 23)
+        for t in range(1, 11, 2)
+    ]
+    bootstrap = {"teams": [{"id": t, "name": f"T{t}"} for t in range(1, 11)], "events": events, "elements": elements}
+    (tmp_path / "bootstrap-static.json").write_text(json.dumps(bootstrap))
+    (tmp_path / "fixtures.json").write_text(json.dumps(fixtures))
+    monkeypatch.setenv("FPL_CACHE_DIR", str(tmp_path))
+    clear_snapshot_cache()
+    projections.clear_projection_memo()
+
+    plan = plan_transfers_for_snapshot(flat_squad, bank=0.0, horizon_gameweeks=5)
+    assert [g.event for g in plan.gameweeks] == [22, 23]
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from fantasy_premier_league_optimization.fpl import projections
+from fantasy_premier_league_optimization.fpl.api import CacheConfig
+from fantasy_premier_league_optimization.fpl.snapshot import clear_snapshot_cache
+
+
+BOOTSTRAP = {
+    "teams": [{"id": 1, "name": "A"}, {"id": 2, "name": "B"}],
+    "events": [{"id": 1, "is_current": True}, {"id": 2}, {"id": 3}],
+    "elements": [
+        {"id": 10, "team": 1, "ep_next": "4.0", "points_per_game": "3.0", "form": "2.0", "minutes": 1800},
+        {"id": 20, "team": 2, "ep_next": "1.0", "points_per_game": "2.0", "form": "2.0", "minutes": 0},
+    ],
+}
+FIXTURES = [
+    {"event": 1, "team_h": 1, "team_a": 2, "team_h_difficulty": 1, "team_a_difficulty": 5},
+    {"event": 2, "team_h": 2, "team_a": 1, "team_h_difficulty": 3, "team_a_difficulty": 3},
+    {"event": 2, "team_h": 1, "team_a": 2, "team_h_difficulty": 3, "team_a_difficulty": 3},
+]
+
+
+@pytest.fixture
+def season_cache(tmp_path):
+    (tmp_path / "bootstrap-static.json").write_text(json.dumps(BOOTSTRAP))
+    (tmp_path / "fixtures.json").write_text(json.dumps(FIXTURES))
+    clear_snapshot_cache()
+    projections.clear_projection_memo()
+    return CacheConfig(cache_dir=tmp_path)
+
+
+def test_matrix_prices_each_gameweek(season_cache):
+    matrix = projections.load_projection_matrix(cache=season_cache)
+    assert matrix.events.tolist() == [1, 2, 3]
+    # team 1: easy single, double of neutral fixtures, blank
+    assert matrix.rows([10])[0].tolist() == pytest.approx([4.0 * 1.15, 4.0 * 2.0, 0.0])
+    assert matrix.rows([20])[0].tolist() == pytest.approx([2.0 * 0.65 * 0.85, 2.0 * 0.65 * 2.0, 0.0])
+    assert matrix.by_element(1) == pytest.approx({10: 4.6, 20: 1.105})
+    assert matrix.rows([999]).tolist() == [[0.0, 0.0, 0.0]]
+
+
+def test_matrix_is_memoized_on_disk_by_content(season_cache, monkeypatch):
+    first = projections.load_projection_matrix(cache=season_cache)
+    assert len(list((season_cache.cache_dir / "projections").glob("*.npz"))) == 1
+
+    projections.clear_projection_memo()
+    monkeypatch.setattr(projections, "build_projection_matrix", lambda *a, **k: pytest.fail("recomputed"))
+    again = projections.load_projection_matrix(cache=season_cache)
+    assert again.key == first.key and (again.points == first.points).all()
+
+    monkeypatch.setattr(projections, "PROJECTION_MODEL_VERSION", projections.PROJECTION_MODEL_VERSION + 1)
+    projections.clear_projection_memo()
+    with pytest.raises(pytest.fail.Exception):
+        projections.load_projection_matrix(cache=season_cache)
+
+
+def test_model_outputs_are_memoized_per_snapshot(season_cache):
+    heuristic = projections.load_projection_rates(cache=season_cache)
+    assert projections.load_projection_rates(cache=season_cache) is heuristic
+    ep_next = projections.load_projection_rates(model="ep_next", cache=season_cache)
+    assert ep_next is not heuristic
+    assert ep_next.flat(2) == pytest.approx({10: 8.0, 20: 2.0})
+    matrix = projections.load_projection_matrix(model="ep_next", cache=season_cache)
+    assert matrix.key != projections.load_projection_matrix(cache=season_cache).key
+
+
+def test_matrix_starts_after_a_finished_current_gameweek(season_cache):
+    events = [{"id": 1, "is_current": True, "finished": True}, {"id": 2, "is_next": True}, {"id": 3}]
+    (season_cache.cache_dir / "bootstrap-static.json").write_text(json.dumps({**BOOTSTRAP, "events": events}))
+    matrix = projections.load_projection_matrix(cache=season_cache)
+    assert matrix.events.tolist() == [2, 3]
+    assert matrix.rows([10])[0].tolist() == pytest.approx([4.0 * 2.0, 0.0])
+
+
+def test_matrix_resolves_bootstrap_once(season_cache, monkeypatch):
+    from fantasy_premier_league_optimization.fpl import snapshot
+
+    calls = []
+    ensure = snapshot.ensure_cached
+    monkeypatch.setattr(snapshot, "ensure_cached", lambda endpoint, **k: calls.append(endpoint) or ensure(endpoint, **k))
+    matrix = projections.load_projection_matrix(cache=season_cache)
+    assert calls.count("bootstrap-static/") == 1 and calls.count("fixtures/") == 1
+
+    snap = snapshot.load_bootstrap_snapshot(cache=season_cache)
+    calls.clear()
+    index = snapshot.load_fixture_index(cache=season_cache, snap=snap)
+    assert calls == ["fixtures/"]
+    assert projections.load_projection_matrix(cache=season_cache, snap=snap, index=index) is matrix
+    assert calls == ["fixtures/"]
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import numpy as np
+import pytest
+
+from fantasy_premier_league_optimization.fpl.models import available_models, get_model
+from fantasy_premier_league_optimization.fpl.scoring import (
+    columns_from_elements,
+    player_projection_points,
+    project_points_batch,
+)
+
+
+ELEMENTS = [
+    {"team": 1, "ep_next": "5.5", "points_per_game": "4.0", "form": "6.0", "minutes": 1500},
+    {"team": 2, "ep_next": None, "points_per_game": "3.1", "form": "", "minutes": 90},
+    {"team": 3, "ep_next": "2.0", "points_per_game": "n/a", "form": "1.0", "minutes": 4000},
+    {"ep_next": "1.0"},
+]
+
+
+def test_batch_matches_scalar_wrapper():
+    multipliers = {1: 1.1, 2: 0.9}
+    batch = project_points_batch(columns_from_elements(ELEMENTS), horizon_gameweeks=4, team_multipliers=multipliers)
+    scalar = [
+        player_projection_points(e, horizon_gameweeks=4, fixture_multiplier=multipliers.get(e.get("team"), 1.0))
+        for e in ELEMENTS
+    ]
+    assert batch.tolist() == pytest.approx(scalar)
+    assert batch[0] == pytest.approx(max(5.5, 0.55 * 4.0 + 0.45 * 6.0) * 4 * 1.1 * (0.65 + min(0.35, 1500 / 1800)))
+
+
+def test_fixture_vectors_override_only_covered_teams():
+    cols = columns_from_elements(ELEMENTS)
+    flat = project_points_batch(cols, horizon_gameweeks=2)
+    vec = project_points_batch(cols, horizon_gameweeks=2, team_fixture_vectors={1: [0.0, 0.0], 3: [2.0, 2.0]})
+    assert vec[0] == 0.0
+    assert vec[1] == flat[1]
+    assert vec[2] == pytest.approx(flat[2] * 2)
+    assert np.isfinite(vec).all()
+
+
+def test_model_registry():
+    cols = columns_from_elements(
+        ELEMENTS + [{"team": 1, "element_type": 3, "minutes": 900, "total_points": 50, "ict_index": "60"}],
+        ("team", "element_type", "ep_next", "points_per_game", "form", "minutes", "total_points", "ict_index",
+         "influence", "creativity", "threat"),
+    )
+    assert set(available_models()) >= {"heuristic", "ep_next", "ict_regression"}
+    assert project_points_batch(cols, horizon_gameweeks=2, model="ep_next")[:3].tolist() == [11.0, 0.0, 4.0]
+    ict = project_points_batch(cols, horizon_gameweeks=1, model="ict_regression")
+    assert np.isfinite(ict).all() and (ict >= 0).all()
+    with pytest.raises(ValueError):
+        get_model("nope")
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from fantasy_premier_league_optimization.fpl.api import CacheConfig
+from fantasy_premier_league_optimization.fpl.snapshot import (
+    clear_snapshot_cache,
+    load_bootstrap_snapshot,
+    snapshot_stats,
+)
+
+
+def test_snapshot_is_parsed_once_and_reloaded_on_change(tmp_path):
+    clear_snapshot_cache()
+    path = tmp_path / "bootstrap-static.json"
+    path.write_text(json.dumps({"teams": [{"id": 1, "name": "ARS"}], "elements": [{"id": 7, "team": 1}]}))
+    cache = CacheConfig(cache_dir=tmp_path)
+
+    first = load_bootstrap_snapshot(cache=cache)
+    assert load_bootstrap_snapshot(cache=cache) is first
+    assert first.teams[1]["name"] == "ARS"
+    assert first.players[7]["team"] == 1
+    with pytest.raises(TypeError):
+        first.players[7]["team"] = 2  # type: ignore[index]
+
+    # Touch without content change (e.g. 304 revalidation) keeps the same snapshot.
+    os.utime(path, None)
+    assert load_bootstrap_snapshot(cache=cache) is first
+
+    path.write_text(json.dumps({"teams": [], "elements": [{"id": 8, "team": 2}]}))
+    second = load_bootstrap_snapshot(cache=cache)
+    assert second is not first and set(second.players) == {8}
+    assert snapshot_stats()["hits"] == 2 and snapshot_stats()["misses"] == 2
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from fantasy_premier_league_optimization.fpl.api import CacheConfig, get_json
+from fantasy_premier_league_optimization.fpl.transport import (
+    RecordingTransport,
+    ReplayTransport,
+    use_transport,
+)
+
+
+def test_record_then_replay_offline(fake_fpl, tmp_path):
+    fake_fpl.routes["/bootstrap-static/"] = {"events": [{"id": 1}]}
+    fake_fpl.routes["/fixtures/"] = [{"id": 10}]
+    bundle = tmp_path / "bundle"
+    cache = CacheConfig(cache_dir=tmp_path / "cache")
+
+    with use_transport(RecordingTransport(bundle)):
+        get_json("bootstrap-static/", cache=cache)
+        get_json("fixtures/", cache=cache)
+        get_json("fixtures/", cache=cache)  # fresh cache hit, recorded once
+
+    manifest = json.loads((bundle / "manifest.json").read_text())
+    assert set(manifest["entries"]) == {"bootstrap-static", "fixtures"}
+
+    served = len(fake_fpl.requests)
+    with use_transport(ReplayTransport(bundle)):
+        assert get_json("fixtures/", cache=cache, force_refresh=True) == [{"id": 10}]
+        with pytest.raises(FileNotFoundError):
+            get_json("element-summary/1/", cache=cache)
+    assert len(fake_fpl.requests) == served